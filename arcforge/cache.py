@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# -----------------------------------------------------------------------------
+# Cache LRU com expiração (TTL) e limite de memória
+# Estrutura genérica compartilhada pelo cache de respostas HTTP, pelo cache de
+# compressão e pelo motor de templates. Fica fora de arcforge.core para poder
+# ser usada sem carregar a camada de banco de dados.
+# -----------------------------------------------------------------------------
+
+
+class LRUCache:
+    """
+    Dicionário limitado e seguro entre threads.
+
+    max_entries: número máximo de entradas (None = sem limite).
+    max_bytes: soma máxima dos tamanhos das entradas (None = sem limite).
+    ttl: validade padrão (s) de cada entrada (None = não expira).
+    sizeof: função que calcula o tamanho de um valor (padrão: len).
+
+    Ao ultrapassar um dos limites, as entradas usadas há mais tempo são
+    descartadas. Entradas expiradas são removidas no acesso.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = None, ttl: float = None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+
+        self._data = OrderedDict()  # chave -> (valor, expira_em, tamanho)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None, size: int = None):
+        """Armazena o valor; retorna False se ele sozinho exceder max_bytes."""
+        ttl = self.ttl if ttl is None else ttl
+        size = self.sizeof(value) if size is None and self.max_bytes is not None else (size or 0)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
+        return True
+
+    def delete(self, key) -> bool:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def invalidate(self, predicate) -> int:
+        """Remove as entradas cuja chave atende predicate(chave); retorna quantas."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def purge_expired(self) -> int:
+        """Remove todas as entradas expiradas; retorna quantas."""
+        now = time.monotonic()
+        return self.invalidate(lambda key: (self._data[key][1] or now + 1) <= now)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _remove(self, key):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
@@ -4,8 +4,18 @@ from .controller import *
 from .handler import *
 from .response import *
 from .server import *
+from .async_server import *
+from .prefork import *
+from .pool import *
 from .router import * 
 from .request import *
+from .multipart import *
+from .static import *
+from .compression import *
+from .cache import *
+from .coalesce import *
+from .middleware import *
+from .metrics import *
 from .session import *
 from .router import * 
 from .validator import *
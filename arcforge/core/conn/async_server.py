@@ -0,0 +1,592 @@
+import asyncio
+import http.client
+import inspect
+import io
+import logging
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+
+from arcforge.core.conn.handler import RequestHandler
+from arcforge.core.conn.middleware import Pipeline
+from arcforge.core.conn.multipart import MultipartError
+from arcforge.core.conn.request import Request, PayloadTooLarge, BadRequest
+from arcforge.core.conn.response import Response, HttpStatus, FileResponse, StreamingResponse
+from arcforge.core.conn.router import Router
+
+
+# -----------------------------------------------------------------------------
+# Motor assíncrono
+# Executa o mesmo pipeline Router/Request/Response do RequestHandler, porém
+# sobre um event loop do asyncio: cada conexão custa uma corrotina e não uma
+# thread do sistema operacional.
+# -----------------------------------------------------------------------------
+
+
+class HttpParseError(Exception):
+    """Erro de protocolo detectado ao interpretar a requisição."""
+
+    def __init__(self, status: HttpStatus, message: str = None):
+        self.status = status
+        self.message = message or status.message
+        super().__init__(self.message)
+
+
+class HttpParser:
+    """
+    Parser HTTP/1.1 mínimo sobre um asyncio.StreamReader.
+    Suporta corpo com Content-Length ou Transfer-Encoding: chunked.
+
+    read_request lê apenas a linha de requisição e os headers; o corpo é lido
+    em seguida por read_body, o que permite responder "100 Continue" (ou
+    recusar o corpo) antes de o cliente enviá-lo.
+
+    idle_timeout: espera máxima (s) pelos headers da próxima requisição;
+    esgotada, read_request levanta asyncio.TimeoutError.
+    read_timeout: tempo máximo (s) sem receber dados durante a leitura do
+    corpo; um envio lento, mas contínuo, não é interrompido.
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, reader: asyncio.StreamReader, max_body_size: int = None,
+                 idle_timeout: float = None, read_timeout: float = None):
+        self.reader = reader
+        self.max_body_size = max_body_size
+        self.idle_timeout = idle_timeout
+        self.read_timeout = read_timeout
+        # Instante (perf_counter) em que os headers da última requisição chegaram
+        self.started = None
+
+    async def read_request(self):
+        """
+        Lê a linha de requisição e os headers da próxima requisição da conexão.
+        Retorna (método, alvo, versão, headers) ou None se o cliente encerrou.
+        """
+        try:
+            head = await asyncio.wait_for(self.reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None
+            raise HttpParseError(HttpStatus.BAD_REQUEST, "Requisição incompleta")
+        except asyncio.LimitOverrunError:
+            raise HttpParseError(HttpStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        self.started = time.perf_counter()
+
+        # Linhas em branco antes da linha de requisição são permitidas (RFC 9112)
+        head = head.lstrip(b"\r\n")
+        request_line, _, raw_headers = head.partition(b"\r\n")
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise HttpParseError(HttpStatus.BAD_REQUEST, "Linha de requisição inválida")
+        if not version.startswith("HTTP/1."):
+            raise HttpParseError(HttpStatus.HTTP_VERSION_NOT_SUPPORTED)
+
+        try:
+            headers = http.client.parse_headers(io.BytesIO(raw_headers))
+        except http.client.HTTPException:
+            raise HttpParseError(HttpStatus.BAD_REQUEST, "Headers inválidos")
+
+        return method, target, version, headers
+
+    def body_length(self, headers):
+        """
+        Tamanho declarado do corpo (None para chunked), validado sem ler nada
+        do socket: Content-Length inválido gera 400 e acima do limite, 413.
+        """
+        transfer_encoding = headers.get("Transfer-Encoding")
+        if transfer_encoding:
+            if transfer_encoding.strip().lower() != "chunked":
+                raise HttpParseError(HttpStatus.NOT_IMPLEMENTED, "Transfer-Encoding não suportado")
+            return None
+
+        try:
+            length = int(headers.get("Content-Length", 0))
+        except ValueError:
+            raise HttpParseError(HttpStatus.BAD_REQUEST, "Content-Length inválido")
+        if length < 0:
+            raise HttpParseError(HttpStatus.BAD_REQUEST, "Content-Length inválido")
+        self._check_size(length)
+        return length
+
+    async def read_body(self, headers) -> bytes:
+        """Lê o corpo da requisição cujos headers foram devolvidos por read_request."""
+        return b"".join([piece async for piece in self.iter_body(headers)])
+
+    async def spool_body(self, headers, memory_threshold: int):
+        """
+        Lê o corpo para um arquivo temporário que só vai para o disco acima de
+        memory_threshold bytes. Retorna o arquivo posicionado no início.
+        """
+        body = tempfile.SpooledTemporaryFile(max_size=memory_threshold)
+        try:
+            async for piece in self.iter_body(headers):
+                body.write(piece)
+        except BaseException:
+            body.close()
+            raise
+        body.seek(0)
+        return body
+
+    async def iter_body(self, headers):
+        """
+        Itera o corpo em blocos de até CHUNK_SIZE bytes. Um corpo chunked é
+        decodificado e, ao final, os headers passam a descrevê-lo com Content-Length.
+        """
+        length = self.body_length(headers)
+        if length is not None:
+            async for piece in self._iter_exactly(length):
+                yield piece
+            return
+
+        total = 0
+        while True:
+            size_line = await self._read_line()
+            try:
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise HttpParseError(HttpStatus.BAD_REQUEST, "Chunk inválido")
+            if size == 0:
+                break
+            total += size
+            self._check_size(total)
+            async for piece in self._iter_exactly(size):
+                yield piece
+            await self._read_exactly(2)  # CRLF ao fim de cada chunk
+
+        # Descarta trailers até a linha em branco final
+        while (await self._read_line()) not in (b"\r\n", b"\n", b""):
+            pass
+        # O corpo já foi decodificado: a Request passa a vê-lo como Content-Length
+        del headers["Transfer-Encoding"]
+        del headers["Content-Length"]
+        headers["Content-Length"] = str(total)
+
+    async def _receive(self, operation):
+        """Aguarda uma leitura do corpo por até read_timeout segundos."""
+        try:
+            return await asyncio.wait_for(operation, self.read_timeout)
+        except asyncio.TimeoutError:
+            raise HttpParseError(HttpStatus.REQUEST_TIMEOUT, "Tempo esgotado aguardando o corpo da requisição")
+
+    async def _read_line(self) -> bytes:
+        return await self._receive(self.reader.readline())
+
+    async def _read_exactly(self, size: int) -> bytes:
+        return b"".join([piece async for piece in self._iter_exactly(size)])
+
+    async def _iter_exactly(self, size: int):
+        """Lê size bytes em blocos; o prazo vale para cada bloco, não para o total."""
+        remaining = size
+        while remaining:
+            piece = await self._receive(self.reader.read(min(remaining, self.CHUNK_SIZE)))
+            if not piece:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(piece)
+            yield piece
+
+    def _check_size(self, size: int):
+        if self.max_body_size is not None and size > self.max_body_size:
+            raise HttpParseError(HttpStatus.PAYLOAD_TOO_LARGE)
+
+
+class StreamBody:
+    """
+    Corpo da requisição ainda no socket, exposto à Request como um arquivo
+    somente leitura. Nada é lido antes de o handler pedir: Request.stream e o
+    parser de multipart consomem o corpo aos poucos, como no motor com threads
+    (o enquadramento Content-Length/chunked também fica a cargo da Request).
+
+    As leituras são síncronas e feitas por threads do executor, que aguardam
+    o event loop receber os dados; no próprio event loop elas travariam o
+    loop e por isso são recusadas.
+    """
+
+    def __init__(self, parser: HttpParser, loop: asyncio.AbstractEventLoop):
+        self.parser = parser
+        self.loop = loop
+        # Uma leitura falhou (prazo, conexão encerrada): a conexão não pode ser reaproveitada
+        self.failed = False
+        self._loop_thread = threading.get_ident()
+
+    def read(self, size: int = -1) -> bytes:
+        """Lê size bytes (menos apenas no fim da conexão)."""
+        return self._call(self._read(size))
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._call(self.parser._receive(self.parser.reader.readline()))
+
+    async def _read(self, size: int) -> bytes:
+        if size < 0:
+            return await self.parser._receive(self.parser.reader.read())
+        # Como em HttpParser, o prazo vale para cada recebimento, não para o total
+        parts = []
+        remaining = size
+        while remaining:
+            part = await self.parser._receive(self.parser.reader.read(remaining))
+            if not part:
+                break
+            parts.append(part)
+            remaining -= len(part)
+        return b"".join(parts)
+
+    def _call(self, operation):
+        if threading.get_ident() == self._loop_thread or self.failed:
+            operation.close()
+            if self.failed:
+                raise ConnectionError("A leitura do corpo da requisição já falhou")
+            raise RuntimeError("O corpo da requisição não pode ser lido de forma síncrona no event loop")
+        try:
+            return asyncio.run_coroutine_threadsafe(operation, self.loop).result()
+        except BaseException:
+            self.failed = True
+            raise
+
+    def close(self):
+        pass
+
+
+class AsyncRequestProxy:
+    """
+    Expõe os atributos de BaseHTTPRequestHandler que a classe Request utiliza,
+    permitindo reaproveitá-la sem alterações no motor assíncrono.
+    rfile: corpo da requisição (StreamBody, arquivo temporário ou BytesIO).
+    """
+    def __init__(self, method, path, version, headers, rfile, client_address=None):
+        self.command = method
+        self.path = path
+        self.request_version = version
+        self.headers = headers
+        self.rfile = rfile
+        self.client_address = client_address
+
+
+class AsyncHTTPServer:
+    """
+    Servidor HTTP baseado em asyncio com a mesma interface usada pelo WebServer
+    (serve_forever, shutdown e server_close).
+
+    Handlers síncronos são executados em um pool de threads limitado para não
+    bloquear o event loop; handlers corrotina são aguardados diretamente.
+    """
+    # Tamanho máximo da linha de requisição + headers
+    max_header_size = 64 * 1024
+    # Corpos lidos antes do handler (ver _open_body) vão para o disco acima disto
+    body_memory_threshold = 1024 * 1024
+
+    def __init__(self, server_address, handler_class=RequestHandler, sock=None, executor=None):
+        self.server_address = server_address
+        self.handler_class = handler_class
+        self.socket = sock
+        self.executor = executor
+        self._loop = None
+        self._server = None
+        self._connections = set()
+        self._stopped = threading.Event()
+
+    # -------------------------------------------------------------------------
+    # Ciclo de vida
+    # -------------------------------------------------------------------------
+
+    def serve_forever(self):
+        """Executa o event loop até shutdown() ser chamado."""
+        self._stopped.clear()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._stopped.set()
+
+    def shutdown(self):
+        """Interrompe o serve_forever a partir de outra thread."""
+        if self._loop is not None and self._server is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._close)
+            self._stopped.wait(timeout=5)
+
+    def _close(self):
+        """Para de aceitar conexões e encerra as conexões keep-alive ociosas."""
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+
+    def server_close(self):
+        if self.socket is not None:
+            self.socket.close()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        if self.executor is not None:
+            self._loop.set_default_executor(self.executor)
+
+        if self.socket is not None:
+            self._server = await asyncio.start_server(
+                self._handle_connection, sock=self.socket, limit=self.max_header_size
+            )
+        else:
+            host, port = self.server_address
+            self._server = await asyncio.start_server(
+                self._handle_connection, host, port, limit=self.max_header_size, reuse_address=True
+            )
+
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    # -------------------------------------------------------------------------
+    # Conexões
+    # -------------------------------------------------------------------------
+
+    async def _handle_connection(self, reader, writer):
+        client_address = writer.get_extra_info("peername")
+        # Timeouts e limite de requisições por conexão seguem o RequestHandler
+        parser = HttpParser(reader, Request.max_body_size,
+                            self.handler_class.keep_alive_timeout, self.handler_class.timeout)
+        max_requests = self.handler_class.max_keep_alive_requests
+        served = 0
+        self._connections.add(writer)
+        try:
+            while served < max_requests:
+                try:
+                    message = await parser.read_request()
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HttpParseError as e:
+                    await self._send_error(writer, e.status, e.message)
+                    break
+
+                if message is None:
+                    break
+
+                served += 1
+                keep_alive = await self._process(parser, message, writer, client_address, served >= max_requests)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logging.error(f"Erro inesperado na conexão {client_address}: {e}")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    @staticmethod
+    def _wants_keep_alive(version: str, headers) -> bool:
+        connection = headers.get("Connection", "").lower()
+        if version == "HTTP/1.0":
+            return "keep-alive" in connection
+        return "close" not in connection
+
+    @staticmethod
+    def _expects_continue(version: str, headers) -> bool:
+        return version != "HTTP/1.0" and headers.get("Expect", "").lower() == "100-continue"
+
+    async def _open_body(self, parser: HttpParser, writer, method: str, target: str, version: str, headers):
+        """
+        Prepara o corpo da requisição, respondendo antes a "Expect: 100-continue"
+        (ou recusando o corpo sem recebê-lo, como o RequestHandler).
+
+        Handlers síncronos rodam no executor e leem o corpo direto do socket
+        (StreamBody). Quando a rota ou algum middleware roda no event loop, onde
+        uma leitura síncrona travaria o loop, o corpo é lido antes para um
+        arquivo temporário que vai para o disco acima de body_memory_threshold.
+        Retorna None se a conexão deve ser encerrada.
+        """
+        try:
+            if parser.body_length(headers) == 0:
+                return io.BytesIO()
+            if self._expects_continue(version, headers):
+                writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                await writer.drain()
+            if self._runs_on_loop(method, target):
+                return await parser.spool_body(headers, self.body_memory_threshold)
+            return StreamBody(parser, asyncio.get_running_loop())
+        except HttpParseError as e:
+            await self._send_error(writer, e.status, e.message)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        return None
+
+    @staticmethod
+    def _runs_on_loop(method: str, target: str) -> bool:
+        """Indica se algo que pode ler o corpo (middleware ou rota) executa no event loop."""
+        if Pipeline.has_async():
+            return True
+        found = Router.resolve(target.partition("?")[0], method)
+        return found is not None and inspect.iscoroutinefunction(found[0])
+
+    async def _finish_body(self, request: Request, body) -> bool:
+        """Descarta o corpo não lido pelo handler; retorna se a conexão pode continuar aberta."""
+        if not isinstance(body, StreamBody):
+            return request.finish()
+        if body.failed:
+            return False
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, request.finish)
+        except Exception:
+            return False
+
+    async def _process(self, parser: HttpParser, message, writer, client_address, last_request=False) -> bool:
+        method, target, version, headers = message
+        keep_alive = self._wants_keep_alive(version, headers) and not last_request
+        parse_started = parser.started
+
+        if method not in self.handler_class.SUPPORTED_METHODS:
+            await self._send_error(writer, HttpStatus.NOT_IMPLEMENTED, f"Método não suportado ({method!r})")
+            return False
+
+        body = await self._open_body(parser, writer, method, target, version, headers)
+        if body is None:
+            return False
+        try:
+            request = Request(AsyncRequestProxy(method, target, version, headers, body, client_address))
+            if method == "OPTIONS":
+                keep_alive = await self._finish_body(request, body) and keep_alive
+                await self._write(writer, 204, "No Content", list(self.handler_class.CORS_HEADERS), b"", keep_alive)
+                self._log_request(client_address, method, target, version, 204)
+                return keep_alive
+
+            Pipeline.record("parse", parse_started or time.perf_counter(), request)
+            self.handler_class.open_session(request)
+
+            response = await self._dispatch(request, method)
+            started = time.perf_counter()
+            try:
+                # Como no RequestHandler, o corpo não lido sai do socket antes da resposta
+                if not await self._finish_body(request, body):
+                    keep_alive = False
+                if response is None:
+                    # Mesmo comportamento do RequestHandler: nada é escrito e a conexão é encerrada
+                    return False
+                keep_alive = await self._send_response(writer, request, response, headers, method, version, keep_alive)
+                request.status = response.status
+            finally:
+                Pipeline.record("write", started, request)
+            self._log_request(client_address, method, target, version, response.status)
+            return keep_alive
+        finally:
+            body.close()
+
+    async def _send_response(self, writer, request: Request, response: Response, headers, method, version, keep_alive) -> bool:
+        """Escreve a resposta; retorna se a conexão pode continuar aberta."""
+        if isinstance(response, StreamingResponse):
+            return await self._send_stream(writer, request, response, version, keep_alive)
+
+        if isinstance(response, FileResponse):
+            response.prepare(headers, method)
+        payload = self.handler_class.encode_payload(response, headers)
+        items = self.handler_class.header_items(response, request.loaded_session)
+        if payload is None:
+            # FileResponse: headers agora, conteúdo via sendfile
+            await self._write(writer, response.status, response.status_message, items, b"", keep_alive)
+            if response.has_content and not await self._send_file(writer, response):
+                keep_alive = False
+        else:
+            await self._write(writer, response.status, response.status_message, items, payload, keep_alive)
+        return keep_alive
+
+    async def _send_stream(self, writer, request: Request, response: StreamingResponse, version: str, keep_alive: bool) -> bool:
+        """Envia a resposta bloco a bloco; retorna se a conexão pode continuar aberta."""
+        chunked = version != "HTTP/1.0"
+        if not chunked:
+            response.headers.pop("Transfer-Encoding", None)
+            keep_alive = False
+
+        items = self.handler_class.header_items(response, request.loaded_session)
+        await self._write(writer, response.status, response.status_message, items, None, keep_alive)
+        try:
+            async for chunk in response:
+                if chunk:
+                    writer.write(response.frame(chunk) if chunked else chunk)
+                    await writer.drain()
+            if chunked:
+                writer.write(response.LAST_CHUNK)
+                await writer.drain()
+        except ConnectionError:
+            return False
+        except Exception as e:
+            # Os headers já foram enviados: resta interromper a resposta
+            logging.error(f"Erro durante o envio da resposta em streaming: {e}")
+            return False
+        return keep_alive
+
+    async def _send_file(self, writer, response: FileResponse) -> bool:
+        """Envia o arquivo com loop.sendfile (os.sendfile quando disponível)."""
+        loop = asyncio.get_running_loop()
+        try:
+            with open(response.path, "rb") as file:
+                sent = await loop.sendfile(writer.transport, file, response.offset, response.length)
+        except OSError as e:
+            logging.error(f"Erro ao enviar arquivo {response.path}: {e}")
+            return False
+        return sent == response.length
+
+    async def _dispatch(self, request: Request, method: str):
+        handler = self.handler_class
+        try:
+            if not Pipeline.middlewares or Pipeline.has_async():
+                result = await Pipeline.run_async(request, lambda r: handler.dispatch_async(r, method))
+            else:
+                # Cadeia só com middlewares síncronos: roda inteira em uma thread do
+                # executor; handlers corrotina voltam a executar no event loop
+                loop = asyncio.get_running_loop()
+                run_coroutine = lambda coro: asyncio.run_coroutine_threadsafe(coro, loop).result()
+                result = await loop.run_in_executor(
+                    None, Pipeline.run, request, lambda r: handler.dispatch(r, method, run_coroutine)
+                )
+            return handler.finish_response(request, result)
+        except PayloadTooLarge:
+            return handler.payload_too_large_response()
+        except (BadRequest, MultipartError) as e:
+            return handler.bad_request_response(str(e))
+        except HttpParseError as e:
+            # Falha ao receber o corpo (ex.: prazo esgotado)
+            return Response(e.status, {"error": e.message})
+        except Exception as e:
+            return handler.error_response(f"Erro ao executar a rota: {e}")
+
+    async def _write(self, writer, status: int, reason: str, headers, payload: bytes, keep_alive: bool):
+        lines = [
+            f"HTTP/1.1 {status} {reason}",
+            f"Server: {self.handler_class.server_version} {self.handler_class.sys_version}",
+            f"Date: {formatdate(usegmt=True)}",
+        ]
+        lines.extend(f"{key}: {value}" for key, value in headers)
+        # Respostas em streaming são delimitadas pelo chunked ou pelo fechamento da conexão
+        framed = any(key.lower() in ("content-length", "transfer-encoding") for key, _ in headers)
+        if not framed and status not in (204, 304) and payload is not None:
+            lines.append(f"Content-Length: {len(payload)}")
+        if keep_alive:
+            lines.append("Connection: keep-alive")
+            lines.append(f"Keep-Alive: timeout={self.handler_class.keep_alive_timeout}")
+        else:
+            lines.append("Connection: close")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1", "strict")
+
+        writer.write(head + payload if payload else head)
+        await writer.drain()
+
+    async def _send_error(self, writer, status: HttpStatus, message: str):
+        response = Response(status, {"error": message})
+        try:
+            await self._write(writer, response.status, response.status_message,
+                              list(response.headers.items()), response.payload, False)
+        except ConnectionError:
+            pass
+
+    def _log_request(self, client_address, method, target, version, status):
+        """Registra o acesso no mesmo formato do BaseHTTPRequestHandler."""
+        host = client_address[0] if client_address else "-"
+        sys.stderr.write(f'{host} - - [{_log_date_time()}] "{method} {target} {version}" {status} -\n')
+
+
+def _log_date_time() -> str:
+    """Data no formato usado por BaseHTTPRequestHandler.log_date_time_string."""
+    year, month, day, hh, mm, ss, *_ = time.localtime()
+    return "%02d/%3s/%04d %02d:%02d:%02d" % (day, RequestHandler.monthname[month], year, hh, mm, ss)
@@ -0,0 +1,169 @@
+import hashlib
+import inspect
+from functools import wraps
+
+from arcforge.cache import LRUCache
+from arcforge.core.conn.compression import Compression
+from arcforge.core.conn.request import Request
+from arcforge.core.conn.response import Response, HttpStatus, IResponse
+
+
+# -----------------------------------------------------------------------------
+# Design Pattern: Decorator
+# Cache de respostas HTTP por rota. A resposta de uma rota GET é guardada por
+# ttl segundos, identificada por método, caminho, query string e pelos headers
+# listados em vary. Enquanto válida, a rota não é executada (nem as consultas
+# ao banco e a serialização que ela faria). Toda resposta em cache recebe uma
+# ETag, e requisições com If-None-Match correspondente recebem 304.
+# -----------------------------------------------------------------------------
+
+
+class ResponseCache:
+    """
+    Decorator que ativa o cache de respostas em uma rota.
+
+    Uso:
+        @Router.route("/clientes", "GET")
+        @ResponseCache(ttl=30, vary=("Accept-Language",))
+        def listar_clientes(request): ...
+
+    Após uma escrita, o handler invalida as respostas afetadas:
+        ResponseCache.invalidate("/clientes")
+
+    Respostas de execuções que acessaram request.session não são guardadas.
+    """
+    # Armazenamento compartilhado por todas as rotas, limitado por memória (LRU)
+    store = LRUCache(max_entries=1024, max_bytes=64 * 1024 * 1024)
+    methods = ("GET",)
+
+    def __init__(self, ttl: float = 60, vary=()):
+        self.ttl = ttl
+        self.vary = tuple(vary)
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(request: Request, *args, **kwargs):
+                cached = self.lookup(request)
+                if cached is not None:
+                    return cached
+                return self.save(request, await func(request, *args, **kwargs))
+        else:
+            @wraps(func)
+            def wrapper(request: Request, *args, **kwargs):
+                cached = self.lookup(request)
+                if cached is not None:
+                    return cached
+                return self.save(request, func(request, *args, **kwargs))
+
+        wrapper._response_cache = self
+        return wrapper
+
+    # -------------------------------------------------------------------------
+    # Consulta e armazenamento
+    # -------------------------------------------------------------------------
+
+    def key(self, request: Request) -> tuple:
+        vary_values = tuple(request.headers.get(header, "") for header in self.vary)
+        return request.method, request.path, request.query_string, vary_values
+
+    def lookup(self, request: Request):
+        """Resposta em cache para a requisição (ou 304), ou None se não houver."""
+        if request.method not in self.methods:
+            return None
+        response = self.store.get(self.key(request))
+        if response is None:
+            return None
+        matched = self._etag_matches(request, response)
+        if matched:
+            return self._not_modified(response, matched)
+        return response.copy()
+
+    def save(self, request: Request, result):
+        """Guarda a resposta, se puder ser compartilhada, e a devolve ao pipeline."""
+        if isinstance(result, IResponse):
+            result = result.to_response()
+
+        if not self._cacheable(request, result):
+            return result
+
+        result.headers.setdefault("ETag", self._etag(result.payload))
+        if self.vary:
+            vary = result.headers.get("Vary", "")
+            result.headers["Vary"] = ", ".join(filter(None, [vary, *self.vary]))
+
+        size = len(result.payload) + sum(len(k) + len(str(v)) for k, v in result.headers.items())
+        self.store.set(self.key(request), result.copy(), ttl=self.ttl, size=size)
+
+        matched = self._etag_matches(request, result)
+        if matched:
+            return self._not_modified(result, matched)
+        return result
+
+    def _cacheable(self, request: Request, result) -> bool:
+        # Respostas com cookies próprios ou geradas a partir da sessão pertencem
+        # a um usuário: a chave do cache não identifica o cliente, e guardá-las
+        # entregaria os dados dele a qualquer outro. Arquivos e streams já têm
+        # mecanismos próprios (sendfile/ETag e chunked)
+        return (
+            request.method in self.methods
+            and type(result) is Response
+            and result.status == HttpStatus.OK.code
+            and not result.cookies
+            and request.loaded_session is None
+        )
+
+    @staticmethod
+    def _etag(payload: bytes) -> str:
+        return f'"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+
+    @staticmethod
+    def _etag_matches(request: Request, response: Response):
+        """ETag da representação que o cliente já tem, ou None se ele não tiver uma atual."""
+        if_none_match = request.headers.get("If-None-Match")
+        etag = response.headers.get("ETag")
+        if not if_none_match or etag is None:
+            return None
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags:
+            return etag
+        # O cliente pode ter recebido a versão comprimida ("...-gzip")
+        return next((variant for variant in Compression.etag_variants(etag) if variant in tags), None)
+
+    @staticmethod
+    def _not_modified(response: Response, etag: str) -> Response:
+        headers = {key: value for key, value in response.headers.items()
+                   if key in ("Vary", "Cache-Control", "Last-Modified")}
+        headers["ETag"] = etag
+        not_modified = Response(HttpStatus.NOT_MODIFIED, headers=headers)
+        not_modified.headers.pop("Content-Type", None)
+        return not_modified
+
+    # -------------------------------------------------------------------------
+    # Invalidação
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def invalidate(cls, path: str = None, prefix: str = None) -> int:
+        """
+        Remove as respostas de um caminho exato e/ou de todos os caminhos que
+        começam com prefix (todas as query strings e variações). Retorna quantas.
+        """
+        if path is None and prefix is None:
+            return 0
+        return cls.store.invalidate(
+            lambda key: key[1] == path or (prefix is not None and key[1].startswith(prefix))
+        )
+
+    @classmethod
+    def clear(cls):
+        cls.store.clear()
+
+    @classmethod
+    def configure(cls, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        """Substitui o armazenamento por um novo com os limites informados."""
+        cls.store = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    @classmethod
+    def stats(cls) -> dict:
+        return cls.store.stats()
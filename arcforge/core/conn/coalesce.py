@@ -0,0 +1,140 @@
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future
+from functools import wraps
+
+from arcforge.core.conn.request import Request
+from arcforge.core.conn.response import Response, IResponse
+
+
+# -----------------------------------------------------------------------------
+# Design Pattern: Decorator
+# Coalescência de requisições idênticas (single-flight). Enquanto uma execução
+# da rota está em andamento, requisições com a mesma chave aguardam o seu
+# resultado em vez de executar o handler (e as consultas ao banco) de novo.
+# Funciona entre threads e entre event loops: o resultado é publicado em um
+# concurrent.futures.Future, que handlers assíncronos aguardam via wrap_future.
+# -----------------------------------------------------------------------------
+
+
+class Coalesce:
+    """
+    Decorator que executa a rota uma única vez para requisições simultâneas
+    com a mesma chave; todas recebem a mesma resposta (cada uma com sua cópia).
+
+    key: função (request) -> chave; padrão: método, caminho, query string e
+    os headers Cookie e Authorization, de modo que só clientes com a mesma
+    identidade compartilham a resposta. Rotas cuja resposta dependa de outros
+    headers (ex.: Accept-Language) devem informar uma chave própria.
+    methods: métodos coalescidos (os demais executam normalmente).
+    timeout: espera máxima (s) pela execução em andamento; esgotado o prazo a
+    requisição executa a rota por conta própria.
+
+    Uso:
+        @Router.route("/relatorio", "GET")
+        @ResponseCache(ttl=30)
+        @Coalesce()
+        def relatorio(request): ...
+    """
+
+    def __init__(self, key=None, methods=("GET",), timeout: float = None):
+        self.key = key or self.default_key
+        self.methods = tuple(methods)
+        self.timeout = timeout
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    # Headers que identificam o cliente e entram na chave padrão
+    identity_headers = ("Cookie", "Authorization")
+
+    @classmethod
+    def default_key(cls, request: Request):
+        identity = tuple(request.headers.get(header, "") for header in cls.identity_headers)
+        return request.method, request.path, request.query_string, identity
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(request: Request, *args, **kwargs):
+                if request.method not in self.methods:
+                    return await func(request, *args, **kwargs)
+                key = self.key(request)
+                future, leader = self._join(key)
+                if not leader:
+                    try:
+                        # shield: cancelar a espera não pode cancelar o Future compartilhado
+                        result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+                        return self._share(result)
+                    except asyncio.TimeoutError:
+                        return await func(request, *args, **kwargs)
+                return await self._lead_async(future, key, func(request, *args, **kwargs))
+        else:
+            @wraps(func)
+            def wrapper(request: Request, *args, **kwargs):
+                if request.method not in self.methods:
+                    return func(request, *args, **kwargs)
+                key = self.key(request)
+                future, leader = self._join(key)
+                if not leader:
+                    try:
+                        return self._share(future.result(self.timeout))
+                    except TimeoutError:
+                        return func(request, *args, **kwargs)
+                try:
+                    result = self._normalize(func(request, *args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+                    raise
+                else:
+                    future.set_result(self._template(result))
+                    return result
+                finally:
+                    self._leave(key)
+
+        wrapper._coalesce = self
+        return wrapper
+
+    def _join(self, key):
+        """Retorna (future, True) para quem executará a rota ou (future, False) para quem aguarda."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _leave(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    async def _lead_async(self, future: Future, key, coroutine):
+        try:
+            result = self._normalize(await coroutine)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(self._template(result))
+            return result
+        finally:
+            self._leave(key)
+
+    @staticmethod
+    def _normalize(result):
+        return result.to_response() if isinstance(result, IResponse) else result
+
+    @staticmethod
+    def _template(result):
+        # O líder segue alterando a própria resposta (sessão, compressão), por
+        # isso os demais copiam de um modelo separado
+        return result.copy() if isinstance(result, Response) else result
+
+    @staticmethod
+    def _share(result):
+        return result.copy() if isinstance(result, Response) else result
+
+    def in_flight(self) -> int:
+        """Número de chaves com execução em andamento."""
+        with self._lock:
+            return len(self._inflight)
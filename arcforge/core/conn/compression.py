@@ -0,0 +1,166 @@
+import gzip
+import hashlib
+import zlib
+
+from arcforge.cache import LRUCache
+from arcforge.core.conn.response import Response, FileResponse
+
+
+# -----------------------------------------------------------------------------
+# Compressão de respostas negociada por Accept-Encoding
+# O corpo é comprimido com gzip ou deflate quando o cliente aceita, o tipo de
+# conteúdo está na lista permitida e o tamanho passa do mínimo configurado.
+# Para respostas estáticas (FileResponse) ou com ETag, os bytes comprimidos
+# ficam em um cache LRU limitado por memória, evitando comprimir de novo o
+# mesmo conteúdo a cada requisição. A chave dos corpos dinâmicos é um resumo
+# do próprio conteúdo: a ETag do handler não distingue, por exemplo, páginas
+# da mesma rota com query strings diferentes.
+# -----------------------------------------------------------------------------
+
+
+class Compression:
+    """
+    Política de compressão usada pelos motores HTTP (RequestHandler.compression).
+
+    min_size: corpos menores que isto (bytes) são enviados sem compressão.
+    level: nível de compressão (1 = mais rápido, 9 = menor).
+    content_types: prefixos de Content-Type que podem ser comprimidos.
+    max_file_size: arquivos maiores continuam sendo enviados via sendfile, sem compressão.
+    cache_size: memória máxima (bytes) do cache de corpos comprimidos (0 desativa).
+    """
+    ENCODINGS = ("gzip", "deflate")
+
+    def __init__(self, min_size: int = 1024, level: int = 6,
+                 content_types=("text/", "application/json", "application/javascript",
+                                "application/xml", "image/svg+xml"),
+                 max_file_size: int = 4 * 1024 * 1024, cache_size: int = 32 * 1024 * 1024):
+        self.min_size = min_size
+        self.level = level
+        self.content_types = tuple(content_types)
+        self.max_file_size = max_file_size
+        self.cache_size = cache_size
+        self._cache = LRUCache(max_entries=None, max_bytes=cache_size)
+
+    # -------------------------------------------------------------------------
+    # Negociação
+    # -------------------------------------------------------------------------
+
+    def negotiate(self, accept_encoding: str):
+        """Escolhe a codificação preferida pelo cliente entre as suportadas (ou None)."""
+        if not accept_encoding:
+            return None
+
+        best, best_q = None, 0.0
+        wildcard_q = None
+        for item in accept_encoding.split(","):
+            name, _, params = item.strip().partition(";")
+            name = name.strip().lower()
+            q = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            if name == "*":
+                wildcard_q = q
+            elif name in self.ENCODINGS and q > best_q:
+                best, best_q = name, q
+
+        if best is None and wildcard_q:
+            return self.ENCODINGS[0]
+        return best
+
+    def is_compressible(self, response: Response) -> bool:
+        """Verifica status, headers e Content-Type da resposta."""
+        if response.status in Response.BODYLESS_STATUS or response.status == 206:
+            return False
+        headers = {key.lower(): value for key, value in response.headers.items()}
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(self.content_types)
+
+    # -------------------------------------------------------------------------
+    # Aplicação
+    # -------------------------------------------------------------------------
+
+    def apply(self, response: Response, request_headers):
+        """
+        Comprime a resposta, se cabível, ajustando Content-Encoding,
+        Content-Length e Vary. Retorna os bytes do corpo a enviar; para um
+        FileResponse não comprimido retorna None (o arquivo segue via sendfile).
+        """
+        is_file = isinstance(response, FileResponse)
+        if not self.is_compressible(response):
+            return None if is_file else response.payload
+
+        self._add_vary(response)
+        encoding = self.negotiate(request_headers.get("Accept-Encoding", ""))
+        if is_file:
+            if encoding is None or not response.has_content or not (self.min_size <= response.size <= self.max_file_size):
+                return None
+            key = ("file", response.path, response.etag, encoding)
+            compressed = self._cached(key, encoding, lambda: self._read_file(response))
+        else:
+            payload = response.payload
+            if encoding is None or len(payload) < self.min_size:
+                return payload
+            key = None
+            if "ETag" in response.headers and self.cache_size:
+                key = ("payload", hashlib.blake2b(payload, digest_size=16).digest(), encoding)
+            compressed = self._cached(key, encoding, lambda: payload)
+
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Content-Length"] = str(len(compressed))
+        etag = response.headers.get("ETag")
+        if etag:
+            # A representação comprimida é outra: a ETag deve ser diferente
+            response.headers["ETag"] = self.encoded_etag(etag, encoding)
+        return compressed
+
+    @staticmethod
+    def encoded_etag(etag: str, encoding: str) -> str:
+        """ETag da representação comprimida: '"abc"' -> '"abc-gzip"'."""
+        return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else f"{etag}-{encoding}"
+
+    @classmethod
+    def etag_variants(cls, etag: str):
+        """A ETag informada e as das suas versões comprimidas."""
+        return [etag] + [cls.encoded_etag(etag, encoding) for encoding in cls.ENCODINGS]
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == "gzip":
+            return gzip.compress(data, self.level, mtime=0)
+        return zlib.compress(data, self.level)
+
+    @staticmethod
+    def _add_vary(response: Response):
+        vary = response.headers.get("Vary", "")
+        if "accept-encoding" not in vary.lower():
+            response.headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+    @staticmethod
+    def _read_file(response: FileResponse) -> bytes:
+        with open(response.path, "rb") as file:
+            return file.read()
+
+    # -------------------------------------------------------------------------
+    # Cache LRU dos corpos comprimidos
+    # -------------------------------------------------------------------------
+
+    def _cached(self, key, encoding: str, load) -> bytes:
+        if key is None or not self.cache_size:
+            return self.compress(load(), encoding)
+
+        compressed = self._cache.get(key)
+        if compressed is None:
+            compressed = self.compress(load(), encoding)
+            self._cache.set(key, compressed)
+        return compressed
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
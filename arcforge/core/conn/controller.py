@@ -1,10 +1,11 @@
 from arcforge.core.conn.handler import *
+from arcforge.core.conn.router import Router
 
 
 # -----------------------------------------------------------------------------
 # Design Pattern: Decorator
 # Permite que métodos de subclasses de Controller sejam automaticamente registrados
-# como rotas quando decorados com @RequestHandler.route.
+# como rotas quando decorados com @Router.route.
 # -----------------------------------------------------------------------------
 
 class Controller:
@@ -23,10 +24,11 @@ class Controller:
     @classmethod
     def _register_routes(cls):
         """
-        Registra automaticamente os métodos do controlador decorados com @RequestHandler.route.
+        Registra automaticamente os métodos do controlador decorados com @Router.route
+        na mesma tabela de rotas compilada do Router.
         """
         for attr_name in dir(cls):
             attr = getattr(cls, attr_name)
             if callable(attr) and hasattr(attr, "_route_info"):
                 path, method = attr._route_info
-                RequestHandler.add_route(path, {method: attr})
+                Router.add_route(path, method, attr)
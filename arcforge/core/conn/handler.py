@@ -1,13 +1,21 @@
+import asyncio
+import inspect
 import logging
 import json
 import re
+import socket
+import time
 import http.cookies
 import uuid
+import functools
 from functools import wraps
 from http.server import BaseHTTPRequestHandler
 from arcforge.core.conn import session
-from arcforge.core.conn.request import Request
-from arcforge.core.conn.response import Response, HttpStatus, IResponse
+from arcforge.core.conn.compression import Compression
+from arcforge.core.conn.middleware import Pipeline
+from arcforge.core.conn.multipart import MultipartError
+from arcforge.core.conn.request import Request, PayloadTooLarge, BadRequest
+from arcforge.core.conn.response import Response, HttpStatus, IResponse, FileResponse, StreamingResponse
 from http.cookies import SimpleCookie
 
 from arcforge.core.conn.router import Router
@@ -28,10 +36,117 @@ class RequestHandler(BaseHTTPRequestHandler):
     Manipulador de requisições HTTP, responsável por delegar chamadas ao Router
     e gerenciar sessões corretamente.
     """
+    # Métodos atendidos pelo framework (os demais recebem 501)
+    SUPPORTED_METHODS = ("GET", "POST", "PUT", "DELETE", "OPTIONS")
+
+    CORS_HEADERS = (
+        ("Access-Control-Allow-Origin", "*"),
+        ("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS"),
+        ("Access-Control-Allow-Headers", "Content-Type, Authorization"),
+    )
+
+    # Conexões persistentes (keep-alive) e pipelining do HTTP/1.1
+    protocol_version = "HTTP/1.1"
+    # Tempo máximo (s) que uma conexão ociosa aguarda a próxima requisição
+    keep_alive_timeout = 15
+    # Após este número de requisições a conexão é encerrada com "Connection: close"
+    max_keep_alive_requests = 100
+    # Tempo máximo (s) sem receber dados durante a leitura de uma requisição já
+    # iniciada (headers e corpo); esgotado, a conexão é encerrada
+    timeout = 30
+    # Evita o atraso do algoritmo de Nagle entre o envio dos headers e do corpo
+    disable_nagle_algorithm = True
+    # Compressão gzip/deflate negociada por Accept-Encoding (None desativa)
+    compression = Compression()
+
     def __init__(self, *args, **kwargs):
         self.session = None
+        self._requests_served = 0
+        self._connection_header_sent = False
         super().__init__(*args, **kwargs)
 
+    def handle(self):
+        """Atende requisições na mesma conexão até o cliente ou o servidor encerrá-la."""
+        # Também a primeira requisição tem prazo: uma conexão que nada envia não
+        # pode ocupar indefinidamente uma thread do pool
+        self.close_connection = False
+        # Servidores com threads limitadas (PooledHTTPServer) recebem de volta a
+        # conexão ociosa e a devolvem ao pool quando chegar a próxima requisição
+        self.parked = False
+        can_park = getattr(self.server, "parks_idle_connections", False)
+        if can_park:
+            self._requests_served = self.server.requests_served(self.request)
+
+        while not self.close_connection:
+            if can_park and not self._request_pending():
+                self.parked = True
+                break
+            if not self._wait_next_request():
+                self.close_connection = True
+                break
+            self.handle_one_request()
+
+    def _request_pending(self) -> bool:
+        """
+        Verifica, sem bloquear, se a conexão tem algo a processar: bytes da
+        próxima requisição (no buffer ou no socket) ou o seu encerramento.
+        """
+        self.connection.settimeout(0)
+        try:
+            if self.rfile.peek(1):
+                return True
+            # Buffer vazio: o socket distingue ociosidade (BlockingIOError) de fim da conexão (b"")
+            self.connection.recv(1, socket.MSG_PEEK)
+            return True
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True  # o erro reaparece na leitura bloqueante, que encerra a conexão
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def _wait_next_request(self) -> bool:
+        """
+        Aguarda até keep_alive_timeout pelo início da próxima requisição.
+        Requisições enviadas em pipeline já estão no buffer e retornam imediatamente.
+        Retorna False se o prazo esgotar ou o cliente encerrar a conexão.
+        """
+        self.connection.settimeout(self.keep_alive_timeout)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:  # inclui TimeoutError
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def send_response_only(self, code, message=None):
+        self._status_code = int(code)
+        super().send_response_only(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == "connection":
+            self._connection_header_sent = True
+        super().send_header(keyword, value)
+
+    def end_headers(self):
+        """Contabiliza a requisição e informa ao cliente se a conexão continuará aberta."""
+        if 100 <= getattr(self, "_status_code", 200) < 200:
+            # Resposta provisória (ex.: 100 Continue): a resposta final ainda virá
+            super().end_headers()
+            return
+        self._requests_served += 1
+        if self._requests_served >= self.max_keep_alive_requests:
+            self.close_connection = True
+
+        if not self._connection_header_sent:
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            else:
+                self.send_header("Connection", "keep-alive")
+                self.send_header("Keep-Alive", f"timeout={self.keep_alive_timeout}, max={self.max_keep_alive_requests - self._requests_served}")
+        self._connection_header_sent = False
+        super().end_headers()
+
     def do_GET(self):
         self._execute_route("GET")
 
@@ -49,63 +164,277 @@ class RequestHandler(BaseHTTPRequestHandler):
         self.send_response(204)  # 204 No Content (resposta padrão para preflight)
         
         # Configura os cabeçalhos CORS
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
+        for key, value in self.CORS_HEADERS:
+            self.send_header(key, value)
         self.end_headers()
 
+    def handle_expect_100(self):
+        """Recusa "Expect: 100-continue" sem receber o corpo se ele for inválido ou exceder o limite."""
+        if not self._accept_body(Request(self)):
+            return False
+        return super().handle_expect_100()
+
+    def _accept_body(self, request: Request) -> bool:
+        """
+        Valida, só pelos headers, o corpo anunciado. Se ele for recusado (400 ou
+        413), responde e encerra a conexão, pois o corpo não será lido.
+        """
+        try:
+            if not request.exceeds_max_body_size():
+                return True
+            response = self.payload_too_large_response()
+        except BadRequest as e:
+            response = self.bad_request_response(str(e))
+        self.close_connection = True
+        self._serve_response(response)
+        return False
+
+    def parse_request(self):
+        # Início da etapa "parse" (linha de requisição já lida, headers a seguir)
+        self._parse_started = time.perf_counter()
+        return super().parse_request()
+
     def _execute_route(self, method):
+        started = getattr(self, "_parse_started", None) or time.perf_counter()
+        self.session = None
         request = Request(self)
-        self.session = Session(request)
-        
-        # Adicione o acesso à sessão no objeto request
-        request.session = self.session
-        
-        match, route, params = Router.match(request.path, method)
-        if match:
-            try:
-                response = route(request, **params)
-
-                if isinstance(response, IResponse):
-                    response = response.to_response()
-
-
-                if isinstance(response, Response):
-                    if not response.cookies:
-                        response.cookies = {}
-                    response.cookies.update(self.session.get_cookies())
-                    self._serve_response(response)
-                    return
-                return
-            except Exception as e:
-                self._internal_server_error(f"Erro ao executar a rota: {e}")
-                return
-        self._not_found()
+        if not self._accept_body(request):
+            # Recusada antes de ler qualquer byte do corpo
+            return
+        Pipeline.record("parse", started, request)
+        self.open_session(request)
+
+        try:
+            if Pipeline.has_async():
+                result = asyncio.run(Pipeline.run_async(request, lambda r: self.dispatch_async(r, method)))
+            else:
+                result = Pipeline.run(request, lambda r: self.dispatch(r, method))
+            response = self.finish_response(request, result)
+        except PayloadTooLarge:
+            response = self.payload_too_large_response()
+        except (BadRequest, MultipartError) as e:
+            response = self.bad_request_response(str(e))
+        except Exception as e:
+            response = self.error_response(f"Erro ao executar a rota: {e}")
+
+        self.session = request.loaded_session
+
+        started = time.perf_counter()
+        try:
+            # Corpo não lido pelo handler precisa sair do socket antes da próxima
+            # requisição; dentro do try para que "write" seja registrada mesmo
+            # se o cliente encerrar a conexão durante o descarte
+            if not request.finish():
+                self.close_connection = True
+
+            if response is not None:
+                self._serve_response(response)
+                request.status = response.status
+            else:
+                # Sem resposta não há como delimitar a mensagem: encerra a conexão
+                self.close_connection = True
+        finally:
+            Pipeline.record("write", started, request)
+
+    # -------------------------------------------------------------------------
+    # Pipeline compartilhado entre os motores (threads e asyncio)
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def open_session(cls, request: Request):
+        """
+        Associa a fábrica de sessões à requisição. A sessão só é carregada no
+        primeiro acesso a request.session: tráfego anônimo não consulta o store
+        nem recebe cookie.
+        """
+        request.session_factory = cls.create_session
+
+    @staticmethod
+    def create_session(request: Request) -> Session:
+        started = time.perf_counter()
+        session = Session(request)
+        Pipeline.record("session", started, request)
+        return session
+
+    @staticmethod
+    def match_route(request: Request, method: str):
+        """Procura a rota da requisição: (rota, parâmetros) ou (None, None)."""
+        found = Router.resolve(request.path, method)
+        if found is None:
+            return None, None
+        route, params, request.route = found
+        return route, params
+
+    @classmethod
+    def dispatch(cls, request: Request, method: str, run_coroutine=asyncio.run):
+        """
+        Fim da cadeia de middlewares: encontra e executa a rota, devolvendo uma
+        Response. run_coroutine executa o retorno de handlers assíncronos.
+        """
+        started = time.perf_counter()
+        route, params = cls.match_route(request, method)
+        started = Pipeline.record("route_match", started, request)
+        if route is None:
+            return cls.not_found_response()
+
+        result = route(request, **params)
+        if inspect.isawaitable(result):
+            # Handlers assíncronos também funcionam no motor com threads
+            result = run_coroutine(result)
+        return cls._serialize(request, result, Pipeline.record("handler", started, request))
+
+    @classmethod
+    async def dispatch_async(cls, request: Request, method: str):
+        """Versão assíncrona de dispatch: handlers síncronos rodam no executor do loop."""
+        started = time.perf_counter()
+        route, params = cls.match_route(request, method)
+        started = Pipeline.record("route_match", started, request)
+        if route is None:
+            return cls.not_found_response()
+
+        if inspect.iscoroutinefunction(route):
+            result = await route(request, **params)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, functools.partial(route, request, **params))
+            if inspect.isawaitable(result):
+                result = await result
+        return cls._serialize(request, result, Pipeline.record("handler", started, request))
+
+    @classmethod
+    def _serialize(cls, request: Request, result, started: float):
+        # Início da etapa "serialize", concluída por finish_response após os middlewares
+        response = cls.to_response(result)
+        request.timings["serialize"] = time.perf_counter() - started
+        return response
+
+    @classmethod
+    def finish_response(cls, request: Request, result):
+        """finalize cronometrado: conclui a etapa "serialize" iniciada no despacho."""
+        started = time.perf_counter()
+        response = cls.finalize(result, request.loaded_session)
+        Pipeline.record("serialize", started, request, request.timings.get("serialize", 0.0))
+        return response
+
+    @staticmethod
+    def to_response(result):
+        """Converte IResponse em Response para que os middlewares vejam sempre uma Response."""
+        return result.to_response() if isinstance(result, IResponse) else result
+
+    @staticmethod
+    def finalize(result, session: Session = None):
+        """
+        Converte o retorno do handler em Response, grava a sessão alterada e
+        anexa o seu cookie. Retorna None quando o handler não produz uma Response.
+        """
+        if isinstance(result, IResponse):
+            result = result.to_response()
+
+        if isinstance(result, Response):
+            if not result.cookies:
+                result.cookies = {}
+            if session is not None and session.save():
+                result.cookies.update(session.get_cookies())
+            return result
+        return None
+
+    @staticmethod
+    def header_items(response: Response, session: Session = None):
+        """Lista (nome, valor) dos headers a enviar, incluindo o cookie da sessão (se alterada)."""
+        items = list(response.headers.items())
+        if session is not None:
+            items.extend(("Set-Cookie", value) for value in session.cookie_headers())
+        return items
+
+    @classmethod
+    def encode_payload(cls, response: Response, request_headers):
+        """
+        Bytes do corpo a enviar, comprimidos conforme a política de compressão.
+        Retorna None para um FileResponse que deve ser enviado via sendfile.
+        """
+        if cls.compression is not None:
+            return cls.compression.apply(response, request_headers)
+        if isinstance(response, FileResponse):
+            return None
+        return response.payload
+
+    @staticmethod
+    def not_found_response() -> Response:
+        return Response(HttpStatus.NOT_FOUND, {"error": "Rota não encontrada"})
+
+    @staticmethod
+    def payload_too_large_response() -> Response:
+        return Response(HttpStatus.PAYLOAD_TOO_LARGE, {"error": f"O corpo da requisição excede {Request.max_body_size} bytes"})
+
+    @staticmethod
+    def bad_request_response(error_message: str) -> Response:
+        return Response(HttpStatus.BAD_REQUEST, {"error": error_message})
+
+    @staticmethod
+    def error_response(error_message: str) -> Response:
+        return Response(HttpStatus.INTERNAL_SERVER_ERROR, {"error": "Erro interno do servidor", "details": error_message})
 
     def _serve_response(self, response: Response):
+        if isinstance(response, StreamingResponse):
+            self._serve_stream(response)
+            return
+        if isinstance(response, FileResponse):
+            response.prepare(self.headers, self.command)
+        payload = self.encode_payload(response, self.headers)
+
         self.send_response(response.status)
         
-        # Escrevendo os headers corretamente
-        for key, value in response.headers.items():
+        # Escrevendo os headers e os cookies da sessão
+        for key, value in self.header_items(response, self.session):
             self.send_header(key, value)
         
-        # Adicionando cookies da sessão ao cabeçalho
-        cookies = self.session.get_cookies()
-        for key, value in cookies.items():
-            self.send_header("Set-Cookie", f"{key}={value}; Path=/; HttpOnly")
-        
         self.end_headers()
 
-        if response.status == HttpStatus.FOUND:  
-            return
+        if payload is None:
+            if response.has_content:
+                self._send_file(response)
+        elif payload:
+            self.wfile.write(payload)
+
+    def _serve_stream(self, response: StreamingResponse):
+        """Envia a resposta bloco a bloco (chunked; em HTTP/1.0, até fechar a conexão)."""
+        chunked = self.request_version != "HTTP/1.0"
+        if not chunked:
+            response.headers.pop("Transfer-Encoding", None)
+            self.close_connection = True
+
+        self.send_response(response.status)
+        for key, value in self.header_items(response, self.session):
+            self.send_header(key, value)
+        self.end_headers()
+
+        try:
+            for chunk in response:
+                if chunk:
+                    self.wfile.write(response.frame(chunk) if chunked else chunk)
+            if chunked:
+                self.wfile.write(response.LAST_CHUNK)
+        except Exception as e:
+            # Os headers já foram enviados: resta interromper a resposta
+            self.log_error("Erro durante o envio da resposta em streaming: %s", e)
+            self.close_connection = True
 
-        if response.body:
-            self.wfile.write(response.body.encode("utf-8"))
+    def _send_file(self, response: FileResponse):
+        """Envia o arquivo (ou o intervalo pedido) com os.sendfile via socket.sendfile."""
+        try:
+            with open(response.path, "rb") as file:
+                sent = self.connection.sendfile(file, response.offset, response.length)
+        except OSError as e:
+            self.log_error("Erro ao enviar arquivo %s: %s", response.path, e)
+            sent = -1
+        if sent != response.length:
+            # O arquivo mudou ou o envio falhou: o Content-Length já enviado não confere
+            self.close_connection = True
 
     def _not_found(self):
         """Retorna um erro 404 para rotas não encontradas."""
-        self._serve_response(Response(HttpStatus.NOT_FOUND, {"error": "Rota não encontrada"}))
+        self._serve_response(self.not_found_response())
 
     def _internal_server_error(self, error_message: str):
         """Retorna um erro 500 para exceções internas."""
-        self._serve_response(Response(HttpStatus.INTERNAL_SERVER_ERROR, {"error": "Erro interno do servidor", "details": error_message}))
+        self._serve_response(self.error_response(error_message))
@@ -0,0 +1,93 @@
+import time
+
+from arcforge.metrics import REGISTRY, Counter, Gauge, Histogram
+from arcforge.core.conn.cache import ResponseCache
+from arcforge.core.conn.handler import RequestHandler
+from arcforge.core.conn.middleware import Pipeline
+from arcforge.core.conn.request import Request
+from arcforge.core.conn.response import Response, HttpStatus
+from arcforge.core.conn.router import Router
+from arcforge.core.conn.session import Session
+
+
+# -----------------------------------------------------------------------------
+# Métricas HTTP
+# Alimentadas pelos hooks de etapa do Pipeline: a etapa "parse" marca o início
+# do atendimento e a etapa "write" o fim. As rotas são identificadas pelo
+# padrão registrado ("/clientes/{id:int}"), mantendo a cardinalidade baixa.
+# Tamanho das sessões e eficiência dos caches são calculados na exportação.
+# -----------------------------------------------------------------------------
+
+HTTP_REQUESTS = Counter(
+    "arcforge_http_requests_total", "Requisições HTTP atendidas.", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = Histogram(
+    "arcforge_http_request_duration_seconds", "Duração do atendimento das requisições HTTP.", ("method", "route"))
+HTTP_STAGE_SECONDS = Histogram(
+    "arcforge_http_stage_duration_seconds", "Duração de cada etapa do atendimento.", ("stage",))
+HTTP_IN_FLIGHT = Gauge(
+    "arcforge_http_requests_in_flight", "Requisições HTTP em andamento.")
+
+SESSIONS = Gauge(
+    "arcforge_sessions", "Sessões armazenadas.", function=lambda: len(Session.store))
+
+
+def _cache_stats():
+    stats = {"response": ResponseCache.stats()}
+    if RequestHandler.compression is not None:
+        stats["compression"] = RequestHandler.compression.stats()
+    return stats
+
+
+CACHE_HITS = Counter(
+    "arcforge_cache_hits_total", "Consultas atendidas pelo cache.", ("cache",),
+    function=lambda: {name: s["hits"] for name, s in _cache_stats().items()})
+CACHE_MISSES = Counter(
+    "arcforge_cache_misses_total", "Consultas não encontradas no cache.", ("cache",),
+    function=lambda: {name: s["misses"] for name, s in _cache_stats().items()})
+CACHE_ENTRIES = Gauge(
+    "arcforge_cache_entries", "Entradas armazenadas no cache.", ("cache",),
+    function=lambda: {name: s["entries"] for name, s in _cache_stats().items()})
+CACHE_BYTES = Gauge(
+    "arcforge_cache_bytes", "Memória ocupada pelo cache (bytes).", ("cache",),
+    function=lambda: {name: s["bytes"] for name, s in _cache_stats().items()})
+
+
+class Metrics:
+    """
+    Ativa a coleta das métricas HTTP e publica todas as métricas registradas.
+
+    Uso:
+        Metrics.enable("/metrics")
+        WebServer(port=8080)
+    """
+    path = None
+    _enabled = False
+
+    @classmethod
+    def enable(cls, path: str = "/metrics"):
+        """Instala os hooks de coleta e registra a rota de exportação (None = sem rota)."""
+        if not cls._enabled:
+            Pipeline.add_stage_hook(cls.record_stage)
+            cls._enabled = True
+        if path and path != cls.path:
+            Router.route(path, "GET")(cls.export)
+            cls.path = path
+
+    @staticmethod
+    def record_stage(stage: str, duration: float, request: Request):
+        if request is None:
+            return
+        HTTP_STAGE_SECONDS.labels(stage).observe(duration)
+        if stage == "parse":
+            HTTP_IN_FLIGHT.inc()
+        elif stage == "write":
+            HTTP_IN_FLIGHT.dec()
+            route = request.route or "<não encontrada>"
+            status = request.status or 0
+            HTTP_REQUESTS.labels(request.method, route, status).inc()
+            if request.started is not None:
+                HTTP_REQUEST_SECONDS.labels(request.method, route).observe(time.perf_counter() - request.started)
+
+    @staticmethod
+    def export(request: Request):
+        return Response(HttpStatus.OK, REGISTRY.render(), content_type="text/plain; version=0.0.4")
@@ -0,0 +1,141 @@
+import asyncio
+import inspect
+import time
+
+from arcforge.core.conn.request import Request
+
+
+# -----------------------------------------------------------------------------
+# Design Pattern: Chain of Responsibility
+# Middlewares envolvem o despacho da requisição em uma cadeia ordenada. Cada
+# middleware recebe a requisição e call_next; pode alterar a requisição, chamar
+# o próximo elo, alterar a resposta devolvida ou interromper a cadeia
+# devolvendo a própria resposta (ex.: autenticação).
+#
+# Instrumentação: cada etapa do atendimento (parse, session, route_match,
+# handler, serialize e write) informa a sua duração aos hooks registrados. A etapa
+# session só ocorre nas requisições que acessam request.session.
+# -----------------------------------------------------------------------------
+
+
+class Pipeline:
+    """
+    Registro global de middlewares e hooks de instrumentação.
+
+    Uso:
+        @Pipeline.use
+        def autenticacao(request, call_next):
+            if "Authorization" not in request.headers:
+                return Response(HttpStatus.UNAUTHORIZED, {"error": "Não autorizado"})
+            return call_next(request)
+
+        @Pipeline.use
+        async def tempo(request, call_next):
+            response = await call_next(request)
+            response.headers["X-Handler"] = "arcforge"
+            return response
+
+    Middlewares síncronos recebem um call_next síncrono e middlewares
+    corrotina um call_next que deve ser aguardado.
+    """
+    STAGES = ("parse", "session", "route_match", "handler", "serialize", "write")
+
+    middlewares = []
+    stage_hooks = []
+    _has_async = False
+
+    # -------------------------------------------------------------------------
+    # Registro
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def use(cls, middleware):
+        """Adiciona um middleware ao fim da cadeia (pode ser usado como decorator)."""
+        cls.middlewares.append(middleware)
+        cls._has_async = cls._has_async or cls._is_async(middleware)
+        return middleware
+
+    @classmethod
+    def add_stage_hook(cls, hook):
+        """Registra hook(etapa, duração em segundos, request) chamado ao fim de cada etapa."""
+        cls.stage_hooks.append(hook)
+        return hook
+
+    @classmethod
+    def clear(cls):
+        cls.middlewares.clear()
+        cls.stage_hooks.clear()
+        cls._has_async = False
+
+    @classmethod
+    def has_async(cls) -> bool:
+        """Indica se algum middleware registrado é uma corrotina."""
+        return cls._has_async
+
+    @staticmethod
+    def _is_async(middleware) -> bool:
+        return inspect.iscoroutinefunction(middleware) or inspect.iscoroutinefunction(getattr(middleware, "__call__", None))
+
+    # -------------------------------------------------------------------------
+    # Instrumentação
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def record(cls, stage: str, started: float, request: Request = None, elapsed: float = 0.0) -> float:
+        """
+        Informa a duração da etapa iniciada em started (perf_counter); retorna o instante atual.
+        elapsed: tempo da mesma etapa já gasto em outro trecho (ex.: serialize,
+        que começa no despacho e termina após os middlewares).
+        """
+        now = time.perf_counter()
+        duration = now - started + elapsed
+        if request is not None:
+            request.timings[stage] = duration
+            if stage == "parse":
+                request.started = started
+        for hook in cls.stage_hooks:
+            try:
+                hook(stage, duration, request)
+            except Exception:
+                pass  # instrumentação nunca interrompe o atendimento
+        return now
+
+    # -------------------------------------------------------------------------
+    # Execução da cadeia
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def run(cls, request: Request, endpoint):
+        """Executa a cadeia de middlewares síncronos e, ao fim, endpoint(request)."""
+        middlewares = list(cls.middlewares)
+
+        def call(index, req):
+            if index == len(middlewares):
+                return endpoint(req)
+            return middlewares[index](req, lambda r: call(index + 1, r))
+
+        return call(0, request)
+
+    @classmethod
+    async def run_async(cls, request: Request, endpoint):
+        """
+        Executa a cadeia em um event loop e, ao fim, await endpoint(request).
+        Middlewares síncronos rodam no executor do loop; o call_next que recebem
+        agenda o restante da cadeia de volta no loop e aguarda o resultado.
+        """
+        middlewares = list(cls.middlewares)
+        loop = asyncio.get_running_loop()
+
+        async def call(index, req):
+            if index == len(middlewares):
+                return await endpoint(req)
+            middleware = middlewares[index]
+            if cls._is_async(middleware):
+                return await middleware(req, lambda r: call(index + 1, r))
+
+            def call_next(r):
+                return asyncio.run_coroutine_threadsafe(call(index + 1, r), loop).result()
+
+            return await loop.run_in_executor(None, middleware, req, call_next)
+
+        return await call(0, request)
@@ -0,0 +1,171 @@
+import shutil
+import tempfile
+from email.parser import HeaderParser
+
+
+# -----------------------------------------------------------------------------
+# Parser de multipart/form-data em streaming
+# O corpo é consumido em blocos; campos de texto ficam em memória e arquivos
+# enviados ficam em memória até memory_threshold bytes, sendo transferidos para
+# um arquivo temporário em disco a partir daí (SpooledTemporaryFile).
+# -----------------------------------------------------------------------------
+
+
+class MultipartError(ValueError):
+    """Corpo multipart malformado."""
+
+
+class UploadedFile:
+    """Arquivo recebido em um formulário multipart/form-data."""
+
+    def __init__(self, field_name: str, filename: str, content_type: str, memory_threshold: int):
+        self.field_name = field_name
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        self.file = tempfile.SpooledTemporaryFile(max_size=memory_threshold)
+
+    def write(self, data):
+        self.file.write(data)
+        self.size += len(data)
+
+    def read(self, size=-1) -> bytes:
+        return self.file.read(size)
+
+    def seek(self, offset, whence=0):
+        return self.file.seek(offset, whence)
+
+    def save(self, destination):
+        """Copia o conteúdo para um caminho ou objeto arquivo de destino."""
+        self.file.seek(0)
+        if hasattr(destination, "write"):
+            shutil.copyfileobj(self.file, destination)
+        else:
+            with open(destination, "wb") as target:
+                shutil.copyfileobj(self.file, target)
+
+    def close(self):
+        self.file.close()
+
+    def __repr__(self):
+        return f"UploadedFile(field_name={self.field_name!r}, filename={self.filename!r}, size={self.size})"
+
+
+class MultipartParser:
+    """
+    Interpreta um corpo multipart/form-data recebido como uma sequência de blocos.
+    Retorna (campos, arquivos): dicionários nome -> valor e nome -> UploadedFile.
+
+    Arquivos vão para disco acima de memory_threshold; campos de texto ficam em
+    memória (viram str) e por isso são limitados a max_field_size bytes.
+    """
+    max_header_size = 16 * 1024
+    max_field_size = 1024 * 1024
+
+    def __init__(self, boundary: str, memory_threshold: int = 1024 * 1024, encoding: str = "utf-8"):
+        if not boundary:
+            raise MultipartError("Boundary do multipart ausente")
+        # Todo delimitador é precedido por CRLF; o primeiro é tratado inserindo
+        # um CRLF artificial no início do fluxo.
+        self.delimiter = b"\r\n--" + boundary.encode("latin-1")
+        self.memory_threshold = memory_threshold
+        self.encoding = encoding
+
+    @staticmethod
+    def boundary_from(content_type: str) -> str:
+        """Extrai o parâmetro boundary de um header Content-Type."""
+        message = HeaderParser().parsestr(f"Content-Type: {content_type}\r\n\r\n")
+        return message.get_param("boundary") or ""
+
+    def parse(self, chunks):
+        fields, files = {}, {}
+        buffer = b"\r\n"
+        state = "preamble"
+        part = None  # (nome, destino) da parte sendo lida
+        keep = len(self.delimiter) + 4
+
+        def feed():
+            nonlocal buffer
+            try:
+                buffer += next(chunks)
+                return True
+            except StopIteration:
+                return False
+
+        chunks = iter(chunks)
+        while True:
+            if state == "preamble":
+                index = buffer.find(self.delimiter)
+                if index < 0:
+                    buffer = buffer[-keep:]
+                    if not feed():
+                        raise MultipartError("Delimitador inicial não encontrado")
+                    continue
+                buffer = buffer[index + len(self.delimiter):]
+                state = "after_delimiter"
+
+            elif state == "after_delimiter":
+                if len(buffer) < 2 and feed():
+                    continue
+                if buffer.startswith(b"--"):
+                    return fields, files  # delimitador final
+                if not buffer.startswith(b"\r\n"):
+                    raise MultipartError("Delimitador malformado")
+                buffer = buffer[2:]
+                state = "headers"
+
+            elif state == "headers":
+                index = buffer.find(b"\r\n\r\n")
+                if index < 0:
+                    if len(buffer) > self.max_header_size:
+                        raise MultipartError("Headers da parte muito grandes")
+                    if not feed():
+                        raise MultipartError("Headers da parte incompletos")
+                    continue
+                part = self._start_part(buffer[:index].decode(self.encoding, "replace"))
+                buffer = buffer[index + 4:]
+                state = "data"
+
+            elif state == "data":
+                name, target = part
+                index = buffer.find(self.delimiter)
+                if index < 0:
+                    # Mantém o final do buffer, que pode conter parte do delimitador
+                    if len(buffer) > keep:
+                        self._write(target, buffer[:-keep])
+                        buffer = buffer[-keep:]
+                    if not feed():
+                        raise MultipartError("Corpo multipart incompleto")
+                    continue
+
+                self._write(target, buffer[:index])
+                buffer = buffer[index + len(self.delimiter):]
+                self._finish_part(name, target, fields, files)
+                state = "after_delimiter"
+
+    def _start_part(self, raw_headers: str):
+        headers = HeaderParser().parsestr(raw_headers + "\r\n\r\n")
+        name = headers.get_param("name", header="content-disposition")
+        if name is None:
+            raise MultipartError("Parte sem Content-Disposition name")
+        filename = headers.get_filename()
+        if filename is not None:
+            content_type = headers.get("Content-Type", "application/octet-stream")
+            return name, UploadedFile(name, filename, content_type, self.memory_threshold)
+        return name, bytearray()
+
+    def _write(self, target, data):
+        if data:
+            if isinstance(target, bytearray):
+                if len(target) + len(data) > self.max_field_size:
+                    raise MultipartError(f"Campo do formulário excede {self.max_field_size} bytes")
+                target.extend(data)
+            else:
+                target.write(data)
+
+    def _finish_part(self, name, target, fields, files):
+        if isinstance(target, bytearray):
+            fields[name] = target.decode(self.encoding, "replace")
+        else:
+            target.seek(0)
+            files[name] = target
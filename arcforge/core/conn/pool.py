@@ -0,0 +1,215 @@
+import queue
+import selectors
+import socket
+import threading
+import time
+from http.server import HTTPServer
+
+from arcforge.core.conn.response import Response, HttpStatus
+
+
+# -----------------------------------------------------------------------------
+# Pool de threads com controle de admissão
+# Em vez de uma thread por conexão (ThreadingHTTPServer), as conexões aceitas
+# entram em uma fila limitada consumida por um número fixo de threads. Com a
+# fila cheia a conexão é recusada na hora com 503 + Retry-After, mantendo a
+# latência das requisições admitidas sob controle durante picos de tráfego.
+#
+# Conexões keep-alive ociosas não ocupam threads: o handler as devolve ao
+# servidor, que as vigia com um seletor e as recoloca na fila quando a próxima
+# requisição chega (ou as encerra após RequestHandler.keep_alive_timeout).
+# -----------------------------------------------------------------------------
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer que despacha as conexões para um pool fixo de threads.
+
+    pool_size: número de threads atendendo conexões.
+    queue_size: conexões aceitas aguardando uma thread livre.
+    retry_after: valor (s) do header Retry-After enviado nas recusas.
+    """
+    # O RequestHandler devolve conexões ociosas em vez de aguardar nelas
+    parks_idle_connections = True
+
+    def __init__(self, server_address, RequestHandlerClass, pool_size=32, queue_size=64,
+                 retry_after=1, bind_and_activate=True):
+        if pool_size < 1:
+            raise ValueError("pool_size deve ser maior ou igual a 1.")
+        if queue_size < 1:
+            raise ValueError("queue_size deve ser maior ou igual a 1.")
+
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+        self.pool_size = pool_size
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+
+        self.rejected = 0
+        self._busy = 0
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+
+        # Conexões ociosas: socket -> (endereço, prazo, requisições atendidas)
+        self._idle = {}
+        self._parking = []  # devolvidas pelas threads, ainda não registradas no seletor
+        self._served = {}   # socket -> requisições atendidas, lido pelo handler ao retomar
+        self._idle_lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._wakeup_sender = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        self._closing = False
+
+        self._threads = []
+        for index in range(pool_size):
+            thread = threading.Thread(target=self._worker_loop, name=f"arcforge-pool-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._idle_thread = threading.Thread(target=self._idle_loop, name="arcforge-pool-idle", daemon=True)
+        self._idle_thread.start()
+
+    def process_request(self, request, client_address):
+        """Enfileira a conexão ou a recusa imediatamente se a fila estiver cheia."""
+        try:
+            self._queue.put_nowait((request, client_address))
+        except queue.Full:
+            self._reject(request)
+
+    def finish_request(self, request, client_address):
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def _reject(self, request):
+        with self._stats_lock:
+            self.rejected += 1
+        with self._idle_lock:
+            self._served.pop(request, None)
+
+        response = Response(
+            HttpStatus.SERVICE_UNAVAILABLE,
+            {"error": "Servidor sobrecarregado, tente novamente mais tarde"},
+            headers={"Retry-After": str(self.retry_after), "Connection": "close"},
+        )
+        try:
+            request.sendall(response.to_http_response().encode("utf-8"))
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _worker_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            request, client_address = item
+            with self._stats_lock:
+                self._busy += 1
+            handler = None
+            try:
+                handler = self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                if getattr(handler, "parked", False):
+                    self._park(request, client_address, handler)
+                else:
+                    self.shutdown_request(request)
+                with self._stats_lock:
+                    self._busy -= 1
+
+    # -------------------------------------------------------------------------
+    # Conexões ociosas
+    # -------------------------------------------------------------------------
+
+    def requests_served(self, request) -> int:
+        """Requisições já atendidas na conexão (0 se ela nunca ficou ociosa)."""
+        with self._idle_lock:
+            return self._served.pop(request, 0)
+
+    def _park(self, request, client_address, handler):
+        """Entrega a conexão ociosa ao seletor, liberando a thread do pool."""
+        deadline = time.monotonic() + handler.keep_alive_timeout
+        with self._idle_lock:
+            if self._closing:
+                self.shutdown_request(request)
+                return
+            self._parking.append((request, client_address, deadline, handler._requests_served))
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wakeup_sender.send(b"\0")
+        except OSError:
+            pass
+
+    def _idle_loop(self):
+        while True:
+            with self._idle_lock:
+                if self._closing:
+                    break
+                parking, self._parking = self._parking, []
+            for request, client_address, deadline, served in parking:
+                self._idle[request] = (client_address, deadline, served)
+                self._selector.register(request, selectors.EVENT_READ)
+
+            now = time.monotonic()
+            for request, (_, deadline, _) in list(self._idle.items()):
+                if deadline <= now:
+                    # Prazo de keep-alive esgotado sem nova requisição
+                    self._unpark(request)
+                    self.shutdown_request(request)
+
+            timeout = min((deadline for _, deadline, _ in self._idle.values()), default=now + 60) - now
+            for key, _ in self._selector.select(max(timeout, 0)):
+                if key.fileobj is self._wakeup:
+                    try:
+                        while self._wakeup.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                # Nova requisição (ou encerramento pelo cliente): volta para a fila
+                request = key.fileobj
+                client_address, _, served = self._unpark(request)
+                with self._idle_lock:
+                    self._served[request] = served
+                self.process_request(request, client_address)
+
+    def _unpark(self, request):
+        self._selector.unregister(request)
+        return self._idle.pop(request)
+
+    def server_close(self):
+        super().server_close()
+        with self._idle_lock:
+            self._closing = True
+        self._wake()
+        self._idle_thread.join(timeout=5)
+        for request in list(self._idle):
+            self._unpark(request)
+            self.shutdown_request(request)
+        with self._idle_lock:
+            parking, self._parking = self._parking, []
+        for request, *_ in parking:
+            self.shutdown_request(request)
+        self._selector.close()
+        self._wakeup.close()
+        self._wakeup_sender.close()
+        # Sinaliza o fim para cada thread (as pendentes recebem o aviso ao esvaziar a fila)
+        for _ in self._threads:
+            try:
+                self._queue.put(None, timeout=1)
+            except queue.Full:
+                break
+
+    def stats(self) -> dict:
+        """Métricas do pool para ajuste de pool_size e queue_size."""
+        with self._stats_lock:
+            return {
+                "pool_size": self.pool_size,
+                "queue_size": self.queue_size,
+                "queued": self._queue.qsize(),
+                "busy": self._busy,
+                "idle": len(self._idle),
+                "rejected": self.rejected,
+            }
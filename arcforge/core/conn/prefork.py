@@ -0,0 +1,186 @@
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+
+
+# -----------------------------------------------------------------------------
+# Modo pre-fork
+# O processo mestre abre o socket de escuta e cria N processos filhos (workers).
+# Cada worker executa o mesmo motor HTTP sobre o socket herdado (ou sobre um
+# socket próprio com SO_REUSEPORT), contornando o GIL. Como os workers são
+# criados via fork, as rotas registradas em Router/Controller antes do start
+# já estão disponíveis em todos eles.
+# -----------------------------------------------------------------------------
+
+
+def create_listen_socket(server_address, reuse_port=False, backlog=1024, listen=True) -> socket.socket:
+    """Cria, associa e (opcionalmente) coloca em escuta o socket TCP do servidor."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            sock.close()
+            raise RuntimeError("SO_REUSEPORT não é suportado nesta plataforma.")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(server_address)
+    if listen:
+        sock.listen(backlog)
+    return sock
+
+
+class PreforkServer:
+    """
+    Supervisor dos processos workers, com a mesma interface dos servidores
+    usados pelo WebServer (serve_forever, shutdown e server_close).
+
+    server_factory: função que recebe o socket de escuta e devolve o servidor
+    (ThreadingHTTPServer, AsyncHTTPServer, ...) a ser executado em cada worker.
+    """
+    # Tempo (s) aguardando os workers encerrarem antes de enviar SIGKILL
+    graceful_timeout = 10
+    # Um worker que morre antes deste tempo (s) é considerado em loop de falhas
+    min_worker_lifetime = 1.0
+
+    def __init__(self, server_factory, server_address, workers: int, reuse_port=False, backlog=1024):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("O modo com múltiplos workers requer os.fork (indisponível nesta plataforma).")
+        if workers < 1:
+            raise ValueError("O número de workers deve ser maior ou igual a 1.")
+
+        self.server_factory = server_factory
+        self.server_address = server_address
+        self.workers = workers
+        self.reuse_port = reuse_port
+        self.backlog = backlog
+
+        # Com SO_REUSEPORT cada worker abre o seu socket; o mestre mantém um
+        # socket associado (sem escutar) apenas para reservar a porta.
+        self.socket = create_listen_socket(server_address, reuse_port, backlog, listen=not reuse_port)
+
+        self._children = {}  # pid -> (índice do worker, instante de início)
+        self._stopping = False
+        # Reentrante: o handler de SIGTERM roda na thread principal e pode
+        # interromper um trecho dela que já detém o lock (_spawn, serve_forever)
+        self._lock = threading.RLock()
+
+    # -------------------------------------------------------------------------
+    # Mestre
+    # -------------------------------------------------------------------------
+
+    def serve_forever(self):
+        """Cria os workers e os supervisiona, reiniciando os que terminarem inesperadamente."""
+        self._stopping = False
+        previous_handler = signal.signal(signal.SIGTERM, self._handle_sigterm)
+        try:
+            for index in range(self.workers):
+                self._spawn(index)
+
+            while self._children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+
+                with self._lock:
+                    index, started_at = self._children.pop(pid, (None, None))
+                if index is None or self._stopping:
+                    continue
+
+                logging.warning(f"Worker {index} (pid {pid}) terminou inesperadamente (status {status}). Reiniciando...")
+                if time.monotonic() - started_at < self.min_worker_lifetime:
+                    time.sleep(self.min_worker_lifetime)
+                if not self._stopping:
+                    self._spawn(index)
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+
+    def shutdown(self):
+        """Encerra os workers com SIGTERM e, após o prazo, com SIGKILL."""
+        self._stopping = True
+        self._signal_children(signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+
+        if self._children:
+            logging.warning("Workers não encerraram a tempo; enviando SIGKILL.")
+            self._signal_children(signal.SIGKILL)
+            while self._children:
+                self._reap(block=True)
+
+    def server_close(self):
+        self.socket.close()
+
+    def _handle_sigterm(self, signum, frame):
+        self._stopping = True
+        self._signal_children(signal.SIGTERM)
+
+    def _signal_children(self, signum):
+        with self._lock:
+            pids = list(self._children)
+        for pid in pids:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _reap(self, block=False):
+        try:
+            pid, _ = os.waitpid(-1, 0 if block else os.WNOHANG)
+        except ChildProcessError:
+            with self._lock:
+                self._children.clear()
+            return
+        if pid:
+            with self._lock:
+                self._children.pop(pid, None)
+
+    def _spawn(self, index: int):
+        pid = os.fork()
+        if pid:
+            with self._lock:
+                self._children[pid] = (index, time.monotonic())
+            return
+
+        # Processo filho: nunca retorna ao código do mestre
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self._children = {}
+        exit_code = 0
+        try:
+            self._run_worker(index)
+        except KeyboardInterrupt:
+            pass
+        except Exception as e:
+            logging.error(f"Worker {index} falhou: {e}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    # -------------------------------------------------------------------------
+    # Worker
+    # -------------------------------------------------------------------------
+
+    def _run_worker(self, index: int):
+        if self.reuse_port:
+            self.socket.close()
+            sock = create_listen_socket(self.server_address, True, self.backlog)
+        else:
+            sock = self.socket
+
+        httpd = self.server_factory(sock)
+
+        def stop(signum, frame):
+            # shutdown() bloqueia até o serve_forever terminar, por isso roda em outra thread
+            threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        logging.info(f"Worker {index} iniciado (pid {os.getpid()}).")
+        try:
+            httpd.serve_forever()
+        finally:
+            httpd.server_close()
@@ -1,39 +1,291 @@
+from collections.abc import Mapping
 from http.cookies import SimpleCookie
 from http.server import BaseHTTPRequestHandler
 import json
 from urllib.parse import parse_qs
 
+from arcforge.core.conn.multipart import MultipartParser
+
+
+class PayloadTooLarge(Exception):
+    """O corpo da requisição excede Request.max_body_size."""
+
+
+class BadRequest(Exception):
+    """Requisição malformada (ex.: Content-Length inválido)."""
+
+
+class QueryDict(Mapping):
+    """
+    Parâmetros da query string. Uma chave pode aparecer várias vezes:
+    query["tag"] devolve o primeiro valor e query.getlist("tag") todos eles.
+    """
+    def __init__(self, query_string: str = ""):
+        self._data = parse_qs(query_string, keep_blank_values=True)
+
+    def __getitem__(self, key):
+        return self._data[key][0]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def getlist(self, key) -> list:
+        return list(self._data.get(key, []))
+
+    def __repr__(self):
+        return f"QueryDict({self._data!r})"
+
+
 class Request:
     """
     Classe responsável por armazenar os dados da requisição HTTP.
+
+    Cookies, corpo, JSON, formulário, query string e sessão são interpretados
+    apenas no primeiro acesso; handlers que não os usam não pagam pelo parsing.
     """
+    # Corpo não lido até este tamanho é descartado para reaproveitar a conexão;
+    # acima disso é mais barato encerrá-la.
+    max_discard_size = 64 * 1024
+    # Tamanho máximo do corpo (None = sem limite). Com Content-Length a recusa
+    # (413) acontece antes de qualquer byte do corpo ser lido.
+    max_body_size = None
+    # Arquivos de upload maiores que isto vão para um arquivo temporário em disco
+    multipart_memory_threshold = 1024 * 1024
+    stream_chunk_size = 64 * 1024
+
     def __init__(self, handler):
         self.method = handler.command
-        self.path = handler.path
+        # O roteamento usa apenas o caminho; a query string fica separada
+        self.full_path = handler.path
+        self.path, _, self.query_string = handler.path.partition("?")
         self.headers = handler.headers
-        self.cookies = self._parse_cookies()
-        self.body = self._parse_body(handler)
-        self.form = self.body if isinstance(self.body, dict) else {}
+        self._rfile = handler.rfile
+        self._raw_body = None
+        self._body_state = "unread"  # unread | streaming | done
+        self._cache = {}
+        # Início do atendimento (perf_counter) e duração (s) de cada etapa, preenchidos pelo Pipeline
+        self.started = None
+        self.timings = {}
+        # Rota registrada que atendeu a requisição e status enviado (logs e métricas)
+        self.route = None
+        self.status = None
+        # Fábrica (request) -> Session definida pelo handler; ver a propriedade session
+        self.session_factory = None
+
+    @property
+    def content_length(self):
+        """Valor de Content-Length, ou None para corpo chunked/ausente."""
+        value = self.headers.get("Content-Length")
+        if value is None or self.headers.get("Transfer-Encoding"):
+            return None
+        try:
+            length = int(value)
+        except ValueError:
+            raise BadRequest("Content-Length inválido")
+        if length < 0:
+            raise BadRequest("Content-Length inválido")
+        return length
+
+    def exceeds_max_body_size(self) -> bool:
+        """Verifica, só pelos headers, se o corpo declarado ultrapassa o limite."""
+        length = self.content_length
+        return self.max_body_size is not None and length is not None and length > self.max_body_size
+
+    # -------------------------------------------------------------------------
+    # Atributos calculados sob demanda
+    # -------------------------------------------------------------------------
+
+    @property
+    def cookies(self) -> dict:
+        if "cookies" not in self._cache:
+            self._cache["cookies"] = self._parse_cookies()
+        return self._cache["cookies"]
+
+    @property
+    def session(self):
+        """Sessão do cliente, carregada (ou criada) no primeiro acesso."""
+        if "session" not in self._cache:
+            if self.session_factory is None:
+                raise RuntimeError("Nenhuma sessão associada a esta requisição")
+            self._cache["session"] = self.session_factory(self)
+        return self._cache["session"]
+
+    @session.setter
+    def session(self, value):
+        self._cache["session"] = value
+
+    @property
+    def loaded_session(self):
+        """Sessão já carregada por esta requisição, ou None se nunca foi acessada."""
+        return self._cache.get("session")
+
+    @property
+    def query(self) -> QueryDict:
+        if "query" not in self._cache:
+            self._cache["query"] = QueryDict(self.query_string)
+        return self._cache["query"]
+
+    @property
+    def raw_body(self) -> bytes:
+        """Corpo da requisição sem decodificação."""
+        if self._raw_body is None:
+            self._raw_body = b"".join(self._consume(self.stream_chunk_size))
+        return self._raw_body
+
+    def stream(self, chunk_size: int = None):
+        """
+        Itera o corpo em blocos de até chunk_size bytes sem carregá-lo inteiro
+        na memória. O corpo só pode ser consumido uma vez.
+        """
+        chunk_size = chunk_size or self.stream_chunk_size
+        if self._raw_body is not None:
+            for start in range(0, len(self._raw_body), chunk_size):
+                yield self._raw_body[start:start + chunk_size]
+            return
+        yield from self._consume(chunk_size)
+
+    @property
+    def files(self) -> dict:
+        """Arquivos enviados em multipart/form-data (nome do campo -> UploadedFile)."""
+        if "files" not in self._cache:
+            self._parse_multipart()
+        return self._cache["files"]
+
+    @property
+    def body_view(self) -> memoryview:
+        """Visão sem cópia do corpo (útil para fatiar payloads binários)."""
+        return memoryview(self.raw_body)
+
+    @property
+    def json(self):
+        """Corpo interpretado como JSON, ou None se vazio ou inválido."""
+        if "json" not in self._cache:
+            try:
+                self._cache["json"] = json.loads(self.raw_body) if self.raw_body else None
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                self._cache["json"] = None
+        return self._cache["json"]
+
+    @property
+    def body(self):
+        """Corpo interpretado como JSON ou form-urlencoded ({} nos demais casos)."""
+        if "body" not in self._cache:
+            self._cache["body"] = self._parse_body()
+        return self._cache["body"]
+
+    @property
+    def form(self) -> dict:
+        return self.body if isinstance(self.body, dict) else {}
+
+    # -------------------------------------------------------------------------
+    # Parsing
+    # -------------------------------------------------------------------------
 
     def _parse_cookies(self):
         """Converte os cookies da requisição em um dicionário."""
         cookie = SimpleCookie(self.headers.get("Cookie"))
         return {key: morsel.value for key, morsel in cookie.items()}
 
-    def _parse_body(self, handler):
-        """Lê e interpreta o corpo da requisição como JSON ou form-urlencoded."""
-        content_length = int(handler.headers.get('Content-Length', 0))
-        if content_length > 0:
-            raw_body = handler.rfile.read(content_length).decode('utf-8')
+    def _parse_simple_body(self):
+        """Interpreta o corpo da requisição como JSON ou form-urlencoded."""
+        if self.raw_body:
             content_type = self.headers.get("Content-Type", "")
 
             if "application/json" in content_type:
-                try:
-                    return json.loads(raw_body)  # Requisições JSON
-                except json.JSONDecodeError:
-                    return {}
+                # Requisições JSON (json.loads aceita bytes diretamente)
+                return self.json if self.json is not None else {}
 
             elif "application/x-www-form-urlencoded" in content_type:
+                raw_body = self.raw_body.decode('utf-8')
                 return {k: v[0] for k, v in parse_qs(raw_body).items()}  # Formulário HTML
 
         return {}
+
+    def _parse_body(self):
+        """Interpreta o corpo da requisição como JSON, form-urlencoded ou multipart."""
+        if "multipart/form-data" in self.headers.get("Content-Type", ""):
+            self._parse_multipart()
+            return self._cache["multipart_fields"]
+        return self._parse_simple_body()
+
+    def _parse_multipart(self):
+        if "files" in self._cache:
+            return
+        content_type = self.headers.get("Content-Type", "")
+        if "multipart/form-data" not in content_type:
+            self._cache["multipart_fields"], self._cache["files"] = {}, {}
+            return
+        parser = MultipartParser(MultipartParser.boundary_from(content_type), self.multipart_memory_threshold)
+        chunks = self.stream()
+        self._cache["multipart_fields"], self._cache["files"] = parser.parse(chunks)
+        # O parser para no delimitador final: o epílogo é consumido para que o
+        # corpo termine de ser lido e a conexão possa ser reaproveitada
+        for _ in chunks:
+            pass
+
+    def finish(self) -> bool:
+        """
+        Consome o corpo que o handler não leu, deixando a conexão pronta para a
+        próxima requisição. Retorna False se for melhor encerrar a conexão.
+        """
+        if self._body_state == "done":
+            return True
+        if self._body_state == "streaming" or self.headers.get("Transfer-Encoding"):
+            return False
+
+        content_length = self.content_length or 0
+        if content_length > self.max_discard_size:
+            return False
+        if content_length > 0:
+            self._rfile.read(content_length)
+        self._body_state = "done"
+        self._raw_body = b""
+        return True
+
+    def _consume(self, chunk_size: int):
+        """
+        Lê exatamente o corpo da mensagem, respeitando Content-Length ou
+        Transfer-Encoding: chunked, para não corromper requisições em pipeline.
+        """
+        if self._body_state != "unread":
+            raise RuntimeError("O corpo da requisição já foi consumido")
+        self._body_state = "streaming"
+
+        if self.headers.get("Transfer-Encoding", "").strip().lower() == "chunked":
+            chunks = self._read_chunked(chunk_size)
+        else:
+            chunks = self._read_fixed(self.content_length or 0, chunk_size)
+
+        total = 0
+        for chunk in chunks:
+            total += len(chunk)
+            if self.max_body_size is not None and total > self.max_body_size:
+                raise PayloadTooLarge(f"O corpo da requisição excede {self.max_body_size} bytes")
+            yield chunk
+        self._body_state = "done"
+
+    def _read_fixed(self, remaining: int, chunk_size: int):
+        while remaining > 0:
+            chunk = self._rfile.read(min(chunk_size, remaining))
+            if not chunk:
+                raise ConnectionError("Conexão encerrada antes do fim do corpo")
+            remaining -= len(chunk)
+            yield chunk
+
+    def _read_chunked(self, chunk_size: int):
+        rfile = self._rfile
+        while True:
+            try:
+                size = int(rfile.readline().split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise BadRequest("Chunk inválido")
+            if size == 0:
+                break
+            yield from self._read_fixed(size, chunk_size)
+            rfile.readline()  # CRLF ao fim de cada chunk
+        # Descarta trailers até a linha em branco final
+        while rfile.readline() not in (b"\r\n", b"\n", b""):
+            pass
@@ -1,17 +1,42 @@
+import asyncio
+import copy
 import json
 import http.cookies
+import mimetypes
+import os
+import uuid
+import datetime
+import decimal
+from email.utils import formatdate, parsedate_to_datetime
 from enum import Enum
 from abc import ABC, abstractmethod
 
+from arcforge.core.model.model import Model, ModelDTO
+
+# orjson é opcional: quando instalado, serializa JSON direto para bytes bem mais rápido
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class HttpStatus(Enum):
     OK = (200, "OK")
     CREATED = (201, "Created")
     NO_CONTENT = (204, "No Content")
+    PARTIAL_CONTENT = (206, "Partial Content")
+    NOT_MODIFIED = (304, "Not Modified")
     BAD_REQUEST = (400, "Bad Request")
     UNAUTHORIZED = (401, "Unauthorized")
     FORBIDDEN = (403, "Forbidden")
     NOT_FOUND = (404, "Not Found")
+    REQUEST_TIMEOUT = (408, "Request Timeout")
+    PAYLOAD_TOO_LARGE = (413, "Payload Too Large")
+    RANGE_NOT_SATISFIABLE = (416, "Range Not Satisfiable")
+    REQUEST_HEADER_FIELDS_TOO_LARGE = (431, "Request Header Fields Too Large")
     INTERNAL_SERVER_ERROR = (500, "Internal Server Error")
+    NOT_IMPLEMENTED = (501, "Not Implemented")
+    SERVICE_UNAVAILABLE = (503, "Service Unavailable")
+    HTTP_VERSION_NOT_SUPPORTED = (505, "HTTP Version Not Supported")
     FOUND = (302, "Found")
 
     def __init__(self, code, message):
@@ -22,18 +47,54 @@ class HttpStatus(Enum):
         return f"{self.code} {self.message}"
 
 class JsonSerializer:
-    """Responsável por serializar objetos para JSON."""
+    """
+    Responsável por serializar objetos para JSON.
+
+    A saída é compacta por padrão (indent=None); defina JsonSerializer.indent
+    para obter JSON formatado durante o desenvolvimento. Model, ModelDTO,
+    datetime/date/time, Decimal e UUID são convertidos automaticamente.
+    """
+    indent = None
+
+    @classmethod
+    def serialize(cls, data) -> str:
+        return cls.serialize_bytes(data).decode("utf-8")
+
+    @classmethod
+    def serialize_bytes(cls, data) -> bytes:
+        """Serializa direto para bytes UTF-8 (usa orjson quando disponível)."""
+        if orjson is not None and cls.indent is None:
+            try:
+                return orjson.dumps(data, default=cls.default, option=orjson.OPT_NON_STR_KEYS)
+            except orjson.JSONEncodeError:
+                pass  # ex.: inteiros maiores que 64 bits; o módulo json trata esses casos
+        separators = (",", ":") if cls.indent is None else None
+        return json.dumps(data, indent=cls.indent, separators=separators,
+                          ensure_ascii=False, default=cls.default).encode("utf-8")
+
     @staticmethod
-    def serialize(data) -> str:
-        if data is None:
-            return  "null"  
-        if isinstance(data, (dict, list, str)):
-            return json.dumps(data, indent=4, ensure_ascii=False)
-        if hasattr(data, "__dict__"):
-            return json.dumps(data.__dict__, indent=4, ensure_ascii=False)
-        raise TypeError(f"Objeto do tipo {type(data).__name__} não é serializável")
+    def default(obj):
+        """Converte objetos que o encoder JSON não conhece."""
+        if isinstance(obj, (Model, ModelDTO)):
+            return obj.to_dict()
+        if isinstance(obj, (datetime.date, datetime.time)):  # inclui datetime.datetime
+            return obj.isoformat()
+        if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+            return str(obj)
+        if isinstance(obj, (set, frozenset, tuple)):
+            return list(obj)
+        if isinstance(obj, Enum):
+            return obj.value
+        if hasattr(obj, "to_dict"):
+            return obj.to_dict()
+        if hasattr(obj, "__dict__"):
+            return obj.__dict__
+        raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável")
 
 class Response:
+    # Status que, pelo protocolo, nunca carregam corpo
+    BODYLESS_STATUS = (204, 304)
+
     def __init__(self, status: HttpStatus, data=None, headers=None, cookies=None, content_type="application/json"):
         self.status = status.code
         self.status_message = status.message
@@ -41,32 +102,57 @@ class Response:
         self.cookies = cookies or {}
         self.content_type = content_type
 
-        if content_type == "text/html":
-            self.body = data if isinstance(data, str) else ""
-            self.headers.setdefault("Content-Type", "text/html; charset=utf-8")
+        if content_type.startswith("text/"):
+            # Texto (text/html, text/plain, ...): o conteúdo é enviado como está
+            self.body = data if isinstance(data, (str, bytes)) else ""
+            charset = "" if "charset" in content_type else "; charset=utf-8"
+            self.headers.setdefault("Content-Type", f"{content_type}{charset}")
         else:
-            self.body = JsonSerializer.serialize(data)
+            # O JSON é gerado já em bytes: codificado uma única vez
+            self.payload = JsonSerializer.serialize_bytes(data)
             self.headers.setdefault("Content-Type", "application/json; charset=utf-8")
 
         self._set_default_headers()
 
+    @property
+    def body(self) -> str:
+        """Corpo como texto; o envio usa diretamente os bytes em payload."""
+        return self.payload.decode("utf-8")
+
+    @body.setter
+    def body(self, value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            self.payload = bytes(value)
+        else:
+            self.payload = str(value).encode("utf-8") if value else b""
+
     def _set_default_headers(self):
         """Define os headers padrão da resposta."""
-        
-        if not isinstance(self.body, str):  # Converte para string se necessário
-            self.body = str(self.body) if self.body else ""
 
+        # Respostas 204 e 304 não podem ter corpo
+        if self.status in self.BODYLESS_STATUS:
+            self.payload = b""
 
-        if self.body:
+        if self.payload:
             self.headers.setdefault("Content-Type", "application/json; charset=utf-8")
-            self.headers.setdefault("Content-Length", str(len(self.body.encode("utf-8"))))
+            self.headers.setdefault("Content-Length", str(len(self.payload)))
         else:
             self.headers.setdefault("Content-Type", "text/plain; charset=utf-8")
+            # Content-Length explícito permite manter a conexão aberta (keep-alive)
+            if self.status not in self.BODYLESS_STATUS:
+                self.headers.setdefault("Content-Length", "0")
 
         # Adiciona cookies, se houver
         if self.cookies:
             self.headers["Set-Cookie"] = self._build_cookies()
 
+    def copy(self) -> "Response":
+        """Cópia independente de headers e cookies (o corpo em bytes é compartilhado)."""
+        clone = copy.copy(self)
+        clone.headers = dict(self.headers)
+        clone.cookies = dict(self.cookies)
+        return clone
+
     def _build_cookies(self) -> str:
         """Gera a string de cookies para o cabeçalho HTTP."""
         return "; ".join(f"{key}={value}" for key, value in self.cookies.items())
@@ -134,3 +220,261 @@ class RedirectResponse(IResponse):
 
     def to_response(self):
         return Response(self.status, headers={"Location": self.location})
+
+
+
+class FileResponse(Response):
+    """
+    Resposta com o conteúdo de um arquivo em disco, enviado com os.sendfile
+    (sem passar o conteúdo por strings Python).
+
+    Suporta requisições condicionais (ETag/If-None-Match e
+    Last-Modified/If-Modified-Since, respondidas com 304) e intervalos
+    (Range, respondidos com 206). A avaliação acontece no envio, via prepare().
+    """
+
+    def __init__(self, path: str, status: HttpStatus = HttpStatus.OK, headers=None, cookies=None,
+                 content_type: str = None, filename: str = None):
+        stat = os.stat(path)
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.offset = 0
+        self.length = self.size
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+        self.status = status.code
+        self.status_message = status.message
+        self.headers = headers or {}
+        self.cookies = cookies or {}
+        self.content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.payload = b""
+
+        if self.content_type.startswith("text/") and "charset" not in self.content_type:
+            self.headers.setdefault("Content-Type", f"{self.content_type}; charset=utf-8")
+        else:
+            self.headers.setdefault("Content-Type", self.content_type)
+        self.headers.setdefault("Content-Length", str(self.size))
+        self.headers.setdefault("Last-Modified", formatdate(self.mtime, usegmt=True))
+        self.headers.setdefault("ETag", self.etag)
+        self.headers.setdefault("Accept-Ranges", "bytes")
+        if filename:
+            self.headers.setdefault("Content-Disposition", f'attachment; filename="{filename}"')
+        if self.cookies:
+            self.headers["Set-Cookie"] = self._build_cookies()
+
+    @property
+    def has_content(self) -> bool:
+        """Indica se o conteúdo do arquivo deve ser enviado após os headers."""
+        return self.status in (HttpStatus.OK.code, HttpStatus.PARTIAL_CONTENT.code) and self.length > 0
+
+    def prepare(self, request_headers, method: str = "GET"):
+        """Ajusta status e headers conforme os headers condicionais e Range da requisição."""
+        if self.status != HttpStatus.OK.code or method not in ("GET", "HEAD"):
+            return self
+
+        if self._not_modified(request_headers):
+            self._set_status(HttpStatus.NOT_MODIFIED)
+            self.length = 0
+            for header in ("Content-Length", "Content-Type", "Content-Disposition"):
+                self.headers.pop(header, None)
+            return self
+
+        requested = self._requested_range(request_headers)
+        if requested == "unsatisfiable":
+            self._set_status(HttpStatus.RANGE_NOT_SATISFIABLE)
+            self.length = 0
+            self.headers["Content-Range"] = f"bytes */{self.size}"
+            self.headers["Content-Length"] = "0"
+        elif requested is not None:
+            start, end = requested
+            self._set_status(HttpStatus.PARTIAL_CONTENT)
+            self.offset, self.length = start, end - start + 1
+            self.headers["Content-Range"] = f"bytes {start}-{end}/{self.size}"
+            self.headers["Content-Length"] = str(self.length)
+        return self
+
+    def _set_status(self, status: HttpStatus):
+        self.status = status.code
+        self.status_message = status.message
+
+    def _not_modified(self, request_headers) -> bool:
+        if_none_match = request_headers.get("If-None-Match")
+        if if_none_match is not None:
+            # Comparação fraca: o prefixo W/ é ignorado
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            # Aceita também a ETag da versão comprimida ("...-gzip")
+            prefix = self.etag[:-1] + "-"
+            return "*" in tags or any(tag == self.etag or tag.startswith(prefix) for tag in tags)
+
+        if_modified_since = request_headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return int(self.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _requested_range(self, request_headers):
+        """Retorna (início, fim), "unsatisfiable" ou None (enviar o arquivo completo)."""
+        header = request_headers.get("Range")
+        if not header or not header.startswith("bytes=") or self.size == 0:
+            return None
+
+        # If-Range: o intervalo só vale se o arquivo não mudou
+        if_range = request_headers.get("If-Range")
+        if if_range and if_range.strip() not in (self.etag, self.headers.get("Last-Modified")):
+            return None
+
+        spec = header[len("bytes="):].strip()
+        if "," in spec:
+            return None  # múltiplos intervalos: responde com o arquivo completo
+
+        first, _, last = spec.partition("-")
+        try:
+            if first == "":
+                suffix = int(last)
+                if suffix == 0:
+                    return "unsatisfiable"
+                return max(self.size - suffix, 0), self.size - 1
+            start = int(first)
+            end = min(int(last), self.size - 1) if last else self.size - 1
+        except ValueError:
+            return None
+
+        if start >= self.size:
+            return "unsatisfiable"
+        if end < start:
+            return None  # intervalo inválido é ignorado (RFC 9110)
+        return start, end
+
+
+class StreamingResponse(Response):
+    """
+    Resposta enviada aos poucos a partir de um iterador (síncrono ou
+    assíncrono) de str/bytes, com Transfer-Encoding: chunked. O cliente começa
+    a receber os dados antes do último bloco ser produzido e a memória usada
+    não depende do tamanho total da resposta.
+
+    Uso:
+        def linhas():
+            for cliente in dao.find_all():
+                yield f"{cliente.nome}\\n"
+
+        return StreamingResponse(linhas())
+    """
+    # Bloco vazio que encerra o corpo chunked
+    LAST_CHUNK = b"0\r\n\r\n"
+
+    def __init__(self, content, status: HttpStatus = HttpStatus.OK, headers=None, cookies=None,
+                 content_type: str = "text/plain; charset=utf-8"):
+        self.content = content
+        self.status = status.code
+        self.status_message = status.message
+        self.headers = headers or {}
+        self.cookies = cookies or {}
+        self.content_type = content_type
+        self.payload = b""
+
+        self.headers.setdefault("Content-Type", content_type)
+        self.headers.pop("Content-Length", None)
+        self.headers["Transfer-Encoding"] = "chunked"
+        if self.cookies:
+            self.headers["Set-Cookie"] = self._build_cookies()
+
+    @classmethod
+    def json_array(cls, items, status: HttpStatus = HttpStatus.OK, headers=None, cookies=None, batch_size: int = 100):
+        """
+        Envia um array JSON elemento a elemento. items pode ser um iterável ou
+        um iterável assíncrono; cada bloco agrupa até batch_size elementos.
+        """
+        if hasattr(items, "__aiter__"):
+            content = cls._json_array_async(items, batch_size)
+        else:
+            content = cls._json_array(items, batch_size)
+        return cls(content, status, headers, cookies, content_type="application/json; charset=utf-8")
+
+    @classmethod
+    def html(cls, content, status: HttpStatus = HttpStatus.OK, headers=None, cookies=None):
+        """
+        Página HTML enviada em blocos, ex.: com TemplateEngine.stream_template:
+
+            return StreamingResponse.html(template_engine.stream_template("pagina.html", itens=itens))
+        """
+        return cls(content, status, headers, cookies, content_type="text/html; charset=utf-8")
+
+    @staticmethod
+    def _json_array(items, batch_size: int):
+        buffer = [b"["]
+        first = True
+        for item in items:
+            buffer.append(JsonSerializer.serialize_bytes(item) if first else b"," + JsonSerializer.serialize_bytes(item))
+            first = False
+            if len(buffer) >= batch_size:
+                yield b"".join(buffer)
+                buffer = []
+        buffer.append(b"]")
+        yield b"".join(buffer)
+
+    @staticmethod
+    async def _json_array_async(items, batch_size: int):
+        buffer = [b"["]
+        first = True
+        async for item in items:
+            buffer.append(JsonSerializer.serialize_bytes(item) if first else b"," + JsonSerializer.serialize_bytes(item))
+            first = False
+            if len(buffer) >= batch_size:
+                yield b"".join(buffer)
+                buffer = []
+        buffer.append(b"]")
+        yield b"".join(buffer)
+
+    @property
+    def is_async(self) -> bool:
+        return hasattr(self.content, "__aiter__")
+
+    @staticmethod
+    def _to_bytes(chunk) -> bytes:
+        return chunk.encode("utf-8") if isinstance(chunk, str) else bytes(chunk)
+
+    def __iter__(self):
+        """Blocos em bytes; um iterador assíncrono é consumido em um event loop próprio."""
+        if not self.is_async:
+            for chunk in self.content:
+                yield self._to_bytes(chunk)
+            return
+
+        loop = asyncio.new_event_loop()
+        iterator = self.content.__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = loop.run_until_complete(iterator.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield self._to_bytes(chunk)
+        finally:
+            if hasattr(iterator, "aclose"):
+                loop.run_until_complete(iterator.aclose())
+            loop.close()
+
+    async def __aiter__(self):
+        """Blocos em bytes; um iterador síncrono avança em uma thread do executor."""
+        if self.is_async:
+            async for chunk in self.content:
+                yield self._to_bytes(chunk)
+            return
+
+        loop = asyncio.get_running_loop()
+        iterator = iter(self.content)
+        done = object()
+        while True:
+            chunk = await loop.run_in_executor(None, next, iterator, done)
+            if chunk is done:
+                break
+            yield self._to_bytes(chunk)
+
+    @staticmethod
+    def frame(chunk: bytes) -> bytes:
+        """Codifica um bloco no formato chunked."""
+        return b"%x\r\n%s\r\n" % (len(chunk), chunk)
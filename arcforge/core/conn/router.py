@@ -1,4 +1,56 @@
 import re
+import threading
+import uuid
+
+
+# -----------------------------------------------------------------------------
+# Tabela de rotas compilada
+# Caminhos estáticos são resolvidos por um dicionário (hash) e caminhos com
+# parâmetros por uma trie de segmentos. As estruturas são montadas uma única
+# vez (Router.compile) e reconstruídas apenas quando uma nova rota é registrada.
+# A semântica é a mesma da busca linear: vence a primeira rota registrada cujo
+# padrão atende o caminho e que possui o método pedido.
+#
+# Parâmetros podem ser tipados ("{id:int}", "{slug:str}", "{uid:uuid}",
+# "{arquivo:path}"): o roteador valida e converte o valor durante o match, e
+# um valor inválido simplesmente não casa com a rota.
+# -----------------------------------------------------------------------------
+
+_PARAM_PATTERN = re.compile(r"{(\w+)(?::(\w+))?}")
+
+
+class Converter:
+    """Tipo de parâmetro de rota: regex que o valor deve atender e função de conversão."""
+    __slots__ = ("regex", "convert", "compiled")
+
+    def __init__(self, regex: str, convert):
+        self.regex = regex
+        self.convert = convert
+        self.compiled = re.compile(regex)
+
+
+class _Param:
+    """Aresta da trie para um segmento com parâmetros."""
+    __slots__ = ("key", "regex", "name", "converters", "node")
+
+    def __init__(self, key, regex, name, converters, node):
+        self.key = key                # identifica segmentos equivalentes
+        self.regex = regex            # None quando qualquer segmento não vazio serve
+        self.name = name              # nome do parâmetro quando ocupa o segmento inteiro
+        self.converters = converters  # nome -> função de conversão
+        self.node = node
+
+
+class _Node:
+    """Nó da trie: um segmento do caminho."""
+    __slots__ = ("static", "params", "tails", "routes", "min_index")
+
+    def __init__(self):
+        self.static = {}      # segmento literal -> _Node
+        self.params = []      # _Param para segmentos com parâmetros
+        self.tails = []       # (nome, _Node) para "{nome:path}", que consome o restante do caminho
+        self.routes = []      # (índice de registro, rota) que terminam neste nó
+        self.min_index = None # menor índice de rota nesta subárvore (poda da busca)
 
 
 class Router:
@@ -6,41 +58,265 @@ class Router:
     Classe responsável por gerenciar o mapeamento de rotas para os métodos HTTP correspondentes.
     """
     routes = []
+    _compiled = None
+    _lock = threading.RLock()
+
+    converters = {
+        "str": Converter(r"[^/]+", str),
+        "int": Converter(r"[0-9]+", int),
+        "float": Converter(r"[0-9]+(?:\.[0-9]+)?", float),
+        "uuid": Converter(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}", uuid.UUID),
+        "path": Converter(r".+", str),
+    }
+
+    @classmethod
+    def register_converter(cls, name: str, regex: str, convert):
+        """Registra um novo tipo de parâmetro para uso em rotas ("{nome:tipo}")."""
+        with cls._lock:
+            cls.converters[name] = Converter(regex, convert)
 
     @classmethod
     def route(cls, path: str, method: str):
         """Decorator para adicionar uma rota ao roteador."""
         def wrapper(func):
-            pattern = cls._path_to_regex(path)
-            compiled_pattern = re.compile(f"^{pattern}$")
+            cls.add_route(path, method, func)
+            # Permite que Controller reconheça o método como rota
+            func._route_info = (path, method.upper())
+            return func
+        return wrapper
 
+    @classmethod
+    def add_route(cls, path: str, method: str, func):
+        """Registra o handler de um método HTTP para o caminho (atualiza se já existir)."""
+        with cls._lock:
             # Verifica se a rota já existe
             for route in cls.routes:
                 if route["path"] == path:
                     # Atualiza ou adiciona o método à rota existente
                     route["methods"][method.upper()] = func
-                    return func
-
-            # Se não existir, cria uma nova rota
-            cls.routes.append({
-                "path": path,
-                "pattern": compiled_pattern,
-                "methods": {method.upper(): func},
-            })
-            return func
-        return wrapper
+                    break
+            else:
+                # Se não existir, cria uma nova rota
+                cls.routes.append({
+                    "path": path,
+                    "pattern": re.compile(f"^{cls._path_to_regex(path)}$"),
+                    "converters": cls._param_converters(path),
+                    "methods": {method.upper(): func},
+                })
+            # A tabela compilada deixa de refletir as rotas registradas
+            cls._compiled = None
+
+    @classmethod
+    def compile(cls):
+        """
+        Monta a tabela de rotas: hash para caminhos estáticos e trie para os
+        caminhos com parâmetros. Chamado pelo WebServer antes de iniciar; se
+        novas rotas forem registradas depois, a tabela é recompilada no próximo match.
+        """
+        with cls._lock:
+            static = {}
+            tree = _Node()
+
+            for index, route in enumerate(cls.routes):
+                if _PARAM_PATTERN.search(route["path"]):
+                    cls._insert(tree, index, route)
+                else:
+                    static[route["path"]] = None
+
+            # Para cada caminho estático resolve, por método, a rota vencedora na
+            # ordem de registro (uma rota com parâmetros registrada antes pode atendê-lo).
+            for path in static:
+                winners = {}
+                for route in cls.routes:
+                    match = route["pattern"].match(path)
+                    params = cls._convert(route["converters"], match.groupdict()) if match else None
+                    if params is None:
+                        continue
+                    for method, func in route["methods"].items():
+                        winners.setdefault(method, (func, params, route["path"]))
+                static[path] = winners
+
+            cls._compiled = (static, tree)
+            return cls._compiled
+
+    @classmethod
+    def match(cls, path, method):
+        """Procura uma rota correspondente ao caminho e método da requisição."""
+        found = cls.resolve(path, method)
+        if found is None:
+            return False, None, {}
+        func, params, _ = found
+        return True, func, params
 
-    @classmethod 
-    def match(cls, path, method): 
-        """Procura uma rota correspondente ao caminho e método da requisição.""" 
-        for route in cls.routes: 
-            match = route["pattern"].match(path) 
-            if match and method in route["methods"]: 
-                return True, route["methods"][method], match.groupdict() 
-        return False, None, {}
+    @classmethod
+    def resolve(cls, path, method):
+        """
+        Como match, mas retorna (handler, parâmetros, rota registrada) ou None.
+        A rota registrada (ex.: "/usuarios/{id:int}") identifica o endpoint em
+        logs e métricas sem depender dos valores dos parâmetros.
+        """
+        static, tree = cls._compiled or cls.compile()
+
+        methods = static.get(path)
+        if methods is not None:
+            entry = methods.get(method)
+            if entry is None:
+                return None
+            func, params, route_path = entry
+            return func, dict(params), route_path
+
+        found = cls._search(tree, path.split("/"), 0, method, [], None)
+        if found is None:
+            return None
+        _, func, params, route_path = found
+        return func, params, route_path
+
+    @classmethod
+    def _path_to_regex(cls, path: str) -> str:
+        """Converte uma rota com parâmetros (ex.: "/usuarios/{id:int}") em uma regex."""
+        regex = []
+        position = 0
+        for match in _PARAM_PATTERN.finditer(path):
+            name, type_name = match.group(1), match.group(2) or "str"
+            regex.append(re.escape(path[position:match.start()]))
+            regex.append(f"(?P<{name}>{cls._converter(type_name).regex})")
+            position = match.end()
+        regex.append(re.escape(path[position:]))
+        return "".join(regex)
+
+    @classmethod
+    def _converter(cls, type_name: str) -> Converter:
+        try:
+            return cls.converters[type_name]
+        except KeyError:
+            raise ValueError(f"Tipo de parâmetro de rota desconhecido: '{type_name}'")
+
+    @classmethod
+    def _param_converters(cls, path: str) -> dict:
+        """Funções de conversão dos parâmetros tipados da rota (str não precisa converter)."""
+        segments = path.split("/")
+        for segment in segments[:-1]:
+            if any(m.group(2) == "path" for m in _PARAM_PATTERN.finditer(segment)):
+                raise ValueError(f"O tipo 'path' só pode ocupar o último segmento da rota: '{path}'")
+        if any(m.group(2) == "path" for m in _PARAM_PATTERN.finditer(segments[-1])) \
+                and not _PARAM_PATTERN.fullmatch(segments[-1]):
+            raise ValueError(f"O tipo 'path' só pode ocupar o último segmento da rota: '{path}'")
+
+        return {
+            m.group(1): cls._converter(m.group(2)).convert
+            for m in _PARAM_PATTERN.finditer(path)
+            if m.group(2) and m.group(2) not in ("str", "path")
+        }
 
     @staticmethod
-    def _path_to_regex(path: str) -> str:
-        """Converte uma rota com parâmetros (ex.: "/usuarios/{id}") em uma regex."""
-        return re.sub(r"{(\w+)}", r"(?P<\1>[^/]+)", path)
+    def _convert(converters: dict, values):
+        """Converte os valores capturados; retorna None se algum não for válido."""
+        params = dict(values)
+        for name, convert in converters.items():
+            if name in params:
+                try:
+                    params[name] = convert(params[name])
+                except (ValueError, TypeError):
+                    return None
+        return params
+
+    # -------------------------------------------------------------------------
+    # Trie
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def _insert(cls, tree: _Node, index: int, route: dict):
+        node = tree
+        cls._update_min(node, index)
+        for segment in route["path"].split("/"):
+            node = cls._child_for(node, segment)
+            cls._update_min(node, index)
+        node.routes.append((index, route))
+
+    @staticmethod
+    def _update_min(node: _Node, index: int):
+        if node.min_index is None or index < node.min_index:
+            node.min_index = index
+
+    @classmethod
+    def _child_for(cls, node: _Node, segment: str) -> _Node:
+        if not _PARAM_PATTERN.search(segment):
+            return node.static.setdefault(segment, _Node())
+
+        full = _PARAM_PATTERN.fullmatch(segment)
+        if full and full.group(2) == "path":
+            for name, child in node.tails:
+                if name == full.group(1):
+                    return child
+            child = _Node()
+            node.tails.append((full.group(1), child))
+            return child
+
+        if full:
+            # Segmento inteiro é um parâmetro: basta validar o valor com o conversor
+            name, type_name = full.group(1), full.group(2) or "str"
+            converter = cls._converter(type_name)
+            regex = None if type_name == "str" else converter.compiled
+            converters = {} if type_name == "str" else {name: converter.convert}
+        else:
+            name = None
+            regex = re.compile(cls._path_to_regex(segment))
+            converters = cls._param_converters(segment)
+
+        key = (segment if name is None else (name, full.group(2) or "str"))
+        for param in node.params:
+            if param.key == key:
+                return param.node
+
+        param = _Param(key, regex, name, converters, _Node())
+        node.params.append(param)
+        return param.node
+
+    @classmethod
+    def _search(cls, node: _Node, segments, i, method, params, best):
+        """
+        Busca em profundidade pela rota de menor índice de registro que atende
+        o caminho e o método. best = (índice, handler, parâmetros, rota) ou None.
+        """
+        if best is not None and node.min_index >= best[0]:
+            return best  # nenhuma rota desta subárvore venceria a já encontrada
+
+        if i == len(segments):
+            for index, route in node.routes:
+                func = route["methods"].get(method)
+                if func is not None and (best is None or index < best[0]):
+                    best = (index, func, dict(params), route["path"])
+            return best
+
+        segment = segments[i]
+        child = node.static.get(segment)
+        if child is not None:
+            best = cls._search(child, segments, i + 1, method, params, best)
+
+        if segment:
+            for param in node.params:
+                if param.name is not None:
+                    if param.regex is not None and not param.regex.fullmatch(segment):
+                        continue
+                    groups = {param.name: segment}
+                else:
+                    match = param.regex.fullmatch(segment)
+                    if not match:
+                        continue
+                    groups = match.groupdict()
+
+                values = cls._convert(param.converters, groups) if param.converters else groups
+                if values is None:
+                    continue
+                params.extend(values.items())
+                best = cls._search(param.node, segments, i + 1, method, params, best)
+                del params[len(params) - len(values):]
 
+        if node.tails:
+            rest = "/".join(segments[i:])
+            if rest:
+                for name, child in node.tails:
+                    params.append((name, rest))
+                    best = cls._search(child, segments, len(segments), method, params, best)
+                    params.pop()
+        return best
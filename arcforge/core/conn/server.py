@@ -1,8 +1,14 @@
+import functools
 import threading
 import socket
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from http.server import HTTPServer, ThreadingHTTPServer
 from arcforge.core.conn.handler import RequestHandler
+from arcforge.core.conn.router import Router
+from arcforge.core.conn.async_server import AsyncHTTPServer
+from arcforge.core.conn.prefork import PreforkServer
+from arcforge.core.conn.pool import PooledHTTPServer
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -20,9 +26,43 @@ class Singleton(type):
 
 
 class WebServer(metaclass=Singleton):
-    def __init__(self, host="localhost", port=9090, threaded=True):
+    """
+    Servidor web do framework.
+
+    engine:
+        "threading" (padrão): ThreadingHTTPServer, ou HTTPServer se threaded=False.
+        "asyncio": AsyncHTTPServer, uma corrotina por conexão em um único event loop.
+
+    workers:
+        Com workers > 1 o processo mestre cria N processos (pre-fork) que
+        compartilham o socket de escuta herdado, ou abrem o seu próprio com
+        SO_REUSEPORT se reuse_port=True. Registre as rotas antes de criar o
+        WebServer para que fiquem visíveis em todos os workers.
+
+    pool_size / queue_size:
+        No motor "threading", pool_size troca a thread por conexão por um pool
+        fixo de threads com fila limitada (PooledHTTPServer); com a fila cheia
+        a conexão recebe 503 + Retry-After. No motor "asyncio", pool_size
+        define o número de threads que executam os handlers síncronos.
+    """
+    ENGINES = ("threading", "asyncio")
+
+    # Servidor em execução. O construtor bloqueia em start(), então este é o
+    # meio de outras threads (ex.: uma rota de diagnóstico) chegarem a stats().
+    instance = None
+
+    def __init__(self, host="localhost", port=9090, threaded=True, engine="threading", workers=1, reuse_port=False,
+                 pool_size=None, queue_size=64):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Engine '{engine}' inválida. Opções: {', '.join(self.ENGINES)}")
+
         self.host = host
         self.port = port
+        self.threaded = threaded
+        self.engine = engine
+        self.workers = workers
+        self.pool_size = pool_size
+        self.queue_size = queue_size
         self.server_address = (self.host, self.port)
         self._is_running = False
 
@@ -30,11 +70,37 @@ class WebServer(metaclass=Singleton):
         if self.is_port_in_use():
             raise RuntimeError(f"A porta {self.port} já está em uso. Escolha outra porta.")
 
-        # Define o servidor HTTP, podendo ser multithreaded
-        ServerClass = ThreadingHTTPServer if threaded else HTTPServer
-        self.httpd = ServerClass(self.server_address, RequestHandler)
+        # Monta a tabela de rotas uma única vez (antes do fork, no modo com workers)
+        Router.compile()
+
+        if workers > 1:
+            self.httpd = PreforkServer(self._create_server, self.server_address, workers, reuse_port)
+        else:
+            self.httpd = self._create_server()
+        WebServer.instance = self
         self.start()
 
+    def _create_server(self, sock=None):
+        """Cria o servidor do motor escolhido, opcionalmente sobre um socket já em escuta."""
+        if self.engine == "asyncio":
+            executor = ThreadPoolExecutor(self.pool_size) if self.pool_size else None
+            return AsyncHTTPServer(self.server_address, RequestHandler, sock=sock, executor=executor)
+
+        if self.pool_size:
+            ServerClass = functools.partial(PooledHTTPServer, pool_size=self.pool_size, queue_size=self.queue_size)
+        else:
+            # Define o servidor HTTP, podendo ser multithreaded
+            ServerClass = ThreadingHTTPServer if self.threaded else HTTPServer
+        if sock is None:
+            return ServerClass(self.server_address, RequestHandler)
+
+        httpd = ServerClass(self.server_address, RequestHandler, bind_and_activate=False)
+        httpd.socket.close()
+        httpd.socket = sock
+        httpd.server_name = socket.getfqdn(self.host)
+        httpd.server_port = self.port
+        return httpd
+
     def is_port_in_use(self):
         """Verifica se a porta está em uso"""
         try:
@@ -45,6 +111,11 @@ class WebServer(metaclass=Singleton):
             logging.error(f"Erro ao verificar a porta {self.port}: {e}")
             return True  # Assume que a porta está ocupada por segurança
 
+    def stats(self) -> dict:
+        """Métricas do servidor (pool de threads, quando configurado)."""
+        stats = getattr(self.httpd, "stats", None)
+        return stats() if stats else {}
+
     def start(self):
         """Inicia o servidor se ele não estiver rodando"""
         if self._is_running:
@@ -52,7 +123,7 @@ class WebServer(metaclass=Singleton):
             return
 
         try:
-            logging.info(f"Servidor rodando em http://{self.host}:{self.port}")
+            logging.info(f"Servidor rodando em http://{self.host}:{self.port} (engine: {self.engine}, workers: {self.workers})")
             self._is_running = True
             self.httpd.serve_forever()
         except KeyboardInterrupt:
@@ -1,28 +1,444 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
 
-import uuid
 from arcforge.core.conn.request import Request
 
 
+# -----------------------------------------------------------------------------
+# Design Pattern: Strategy
+# O armazenamento das sessões é definido por um SessionStore intercambiável
+# (memória, cookie assinado, arquivo...). Session conversa apenas com a
+# interface load/save/delete, independente de onde os dados ficam.
+# -----------------------------------------------------------------------------
+
+
+class SessionStore(ABC):
+    """Interface dos armazenamentos de sessão."""
+
+    @abstractmethod
+    def load(self, token: str):
+        """Dados da sessão identificada pelo token, ou None se não existir/expirou."""
+
+    @abstractmethod
+    def save(self, token: str, data: dict) -> str:
+        """Grava os dados e retorna o token que o cliente deve guardar no cookie."""
+
+    @abstractmethod
+    def delete(self, token: str):
+        """Remove a sessão."""
+
+    def new_token(self) -> str:
+        """Identificador aleatório e imprevisível para uma nova sessão."""
+        return secrets.token_urlsafe(32)
+
+    def should_refresh(self, token: str) -> bool:
+        """Indica se o token deve ser regravado mesmo sem alterações (ex.: prazo ou chave antigos)."""
+        return False
+
+    def __len__(self) -> int:
+        return 0
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessões em memória do processo.
+
+    ttl: tempo ocioso (s) após o qual a sessão expira (renovado a cada acesso).
+    max_entries: limite de sessões; acima dele as menos usadas são descartadas (LRU).
+    shards: número de partições, cada uma com o seu lock (menos disputa entre threads).
+    sweep_interval: intervalo (s) da limpeza periódica das sessões expiradas.
+
+    A thread de limpeza só é iniciada no primeiro save, nunca na importação,
+    de modo que workers criados via fork iniciam a sua própria.
+    """
+
+    def __init__(self, ttl: float = 30 * 60, max_entries: int = 100_000, shards: int = 16, sweep_interval: float = 60):
+        if shards < 1:
+            raise ValueError("shards deve ser maior ou igual a 1.")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self._per_shard = max(1, max_entries // shards) if max_entries else None
+        self._sweeper_pid = None
+        self._sweeper_lock = threading.Lock()
+
+    def _shard(self, token: str):
+        return self._shards[hash(token) % len(self._shards)]
+
+    def load(self, token: str):
+        lock, entries = self._shard(token)
+        now = time.monotonic()
+        with lock:
+            entry = entries.get(token)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at <= now:
+                del entries[token]
+                return None
+            # Acesso renova a validade e a posição no LRU
+            entries[token] = (data, now + self.ttl)
+            entries.move_to_end(token)
+            return data
+
+    def save(self, token: str, data: dict) -> str:
+        self._ensure_sweeper()
+        lock, entries = self._shard(token)
+        with lock:
+            entries[token] = (data, time.monotonic() + self.ttl)
+            entries.move_to_end(token)
+            if self._per_shard is not None:
+                while len(entries) > self._per_shard:
+                    entries.popitem(last=False)
+        return token
+
+    def delete(self, token: str):
+        lock, entries = self._shard(token)
+        with lock:
+            entries.pop(token, None)
+
+    def purge_expired(self) -> int:
+        """Remove as sessões expiradas; retorna quantas."""
+        removed = 0
+        for lock, entries in self._shards:
+            now = time.monotonic()
+            with lock:
+                expired = [token for token, (_, expires_at) in entries.items() if expires_at <= now]
+                for token in expired:
+                    del entries[token]
+            removed += len(expired)
+        return removed
+
+    def clear(self):
+        for lock, entries in self._shards:
+            with lock:
+                entries.clear()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for _, entries in self._shards)
+
+    def _ensure_sweeper(self):
+        # Após um fork a thread do processo pai não existe no filho: o pid identifica isso
+        if self._sweeper_pid == os.getpid() or not self.sweep_interval:
+            return
+        with self._sweeper_lock:
+            if self._sweeper_pid == os.getpid():
+                return
+            self._sweeper_pid = os.getpid()
+            threading.Thread(target=self._sweep_loop, name="arcforge-session-sweeper", daemon=True).start()
+
+    def _sweep_loop(self):
+        pid = os.getpid()
+        while self._sweeper_pid == pid:
+            time.sleep(self.sweep_interval)
+            self.purge_expired()
+
+
+class SessionTooLarge(ValueError):
+    """A sessão não cabe no cookie."""
+
+
+class SignedCookieSessionStore(SessionStore):
+    """
+    Sessões sem estado no servidor: os dados viajam no próprio cookie,
+    serializados em JSON, comprimidos com zlib quando vale a pena e assinados
+    com HMAC-SHA256. Qualquer processo ou máquina com as mesmas chaves atende
+    qualquer requisição, sem armazenamento compartilhado.
+
+    Os dados ficam visíveis para o cliente (assinados, não cifrados): não
+    guarde segredos na sessão.
+
+    secret_keys: chave ou lista de chaves. A primeira assina; todas são aceitas
+    na verificação, o que permite a rotação (nova chave na frente, a antiga
+    mantida até os cookies expirarem). Cookies assinados com uma chave antiga
+    são reassinados na próxima resposta.
+    max_age: validade (s) do cookie desde a última gravação; reemitido ao
+    passar da metade do prazo, o que o torna um tempo ocioso (None = sem prazo).
+    max_size: tamanho máximo do cookie; acima dele save levanta SessionTooLarge.
+    compress_min_size: JSON a partir deste tamanho é comprimido.
+
+    Uso:
+        Session.store = SignedCookieSessionStore([os.environ["SECRET_KEY"]])
+    """
+
+    def __init__(self, secret_keys, max_age: float = 30 * 60, max_size: int = 4000, compress_min_size: int = 256):
+        if isinstance(secret_keys, (str, bytes)):
+            secret_keys = [secret_keys]
+        self.keys = [key.encode() if isinstance(key, str) else key for key in secret_keys]
+        if not self.keys or not all(self.keys):
+            raise ValueError("Informe ao menos uma chave secreta não vazia.")
+        self.max_age = max_age
+        self.max_size = max_size
+        self.compress_min_size = compress_min_size
+
+    @staticmethod
+    def _b64encode(data: bytes) -> str:
+        return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+    @staticmethod
+    def _b64decode(data: str) -> bytes:
+        return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+    def _signature(self, key: bytes, message: str) -> str:
+        return self._b64encode(hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest())
+
+    def _verify(self, token: str):
+        """(payload, timestamp, índice da chave) de um token íntegro, ou None."""
+        message, _, signature = token.rpartition(".")
+        if not message:
+            return None
+        for index, key in enumerate(self.keys):
+            if hmac.compare_digest(self._signature(key, message), signature):
+                payload, _, timestamp = message.rpartition(".")
+                try:
+                    return payload, int(timestamp), index
+                except ValueError:
+                    return None
+        return None
+
+    def new_token(self) -> str:
+        # O token só passa a existir quando os dados são gravados
+        return ""
+
+    def load(self, token: str):
+        verified = self._verify(token)
+        if verified is None:
+            return None
+        payload, timestamp, _ = verified
+        if self.max_age is not None and time.time() - timestamp > self.max_age:
+            return None
+        try:
+            if payload.startswith("."):
+                raw = zlib.decompress(self._b64decode(payload[1:]))
+            else:
+                raw = self._b64decode(payload)
+            data = json.loads(raw)
+        except (ValueError, zlib.error):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def save(self, token: str, data: dict) -> str:
+        raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        if len(raw) >= self.compress_min_size:
+            compressed = zlib.compress(raw)
+            payload = "." + self._b64encode(compressed) if len(compressed) < len(raw) else self._b64encode(raw)
+        else:
+            payload = self._b64encode(raw)
+        message = f"{payload}.{int(time.time())}"
+        token = f"{message}.{self._signature(self.keys[0], message)}"
+        if len(token) > self.max_size:
+            raise SessionTooLarge(f"A sessão ocupa {len(token)} bytes no cookie (máximo {self.max_size})")
+        return token
+
+    def delete(self, token: str):
+        # Nada fica no servidor: expirar o cookie basta
+        pass
+
+    def should_refresh(self, token: str) -> bool:
+        verified = self._verify(token)
+        if verified is None:
+            return False
+        _, timestamp, index = verified
+        stale = self.max_age is not None and time.time() - timestamp > self.max_age / 2
+        return index > 0 or stale
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessões em um arquivo SQLite compartilhado pelos processos da máquina
+    (ex.: workers do modo pre-fork), sem depender de um servidor externo.
+
+    O banco usa WAL: leitores não bloqueiam o escritor e vice-versa. Cada
+    thread de cada processo tem a sua conexão (reaberta após um fork).
+
+    ttl: tempo ocioso (s) após o qual a sessão expira.
+    touch_interval: a renovação da validade nas leituras é acumulada em memória
+    e gravada em lote a cada touch_interval segundos, em vez de uma escrita
+    por requisição (a sessão pode expirar até touch_interval antes do previsto).
+    sweep_interval: intervalo mínimo (s) entre remoções das sessões expiradas,
+    feitas durante as gravações.
+
+    Uso:
+        Session.store = SQLiteSessionStore("/var/lib/app/sessions.db")
+    """
+
+    def __init__(self, path: str, ttl: float = 30 * 60, touch_interval: float = 30, sweep_interval: float = 60, timeout: float = 5):
+        self.path = path
+        self.ttl = ttl
+        self.touch_interval = touch_interval
+        self.sweep_interval = sweep_interval
+        self.timeout = timeout
+        self._local = threading.local()
+        self._touches = {}
+        self._touch_lock = threading.Lock()
+        self._last_flush = time.time()
+        self._last_sweep = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "token TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            # Conexões não podem ser herdadas através de um fork
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def load(self, token: str):
+        row = self._conn.execute("SELECT data, expires_at FROM sessions WHERE token = ?", (token,)).fetchone()
+        now = time.time()
+        if row is None or row[1] <= now:
+            return None
+        with self._touch_lock:
+            self._touches[token] = now + self.ttl
+        self._flush_touches()
+        return json.loads(row[0])
+
+    def save(self, token: str, data: dict) -> str:
+        now = time.time()
+        with self._touch_lock:
+            self._touches.pop(token, None)
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO sessions (token, data, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (token) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+                (token, json.dumps(data, separators=(",", ":")), now + self.ttl),
+            )
+            if now - self._last_sweep >= self.sweep_interval:
+                self._last_sweep = now
+                conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        return token
+
+    def delete(self, token: str):
+        with self._touch_lock:
+            self._touches.pop(token, None)
+        self._conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    def _flush_touches(self, force: bool = False):
+        """Grava em lote as renovações de validade acumuladas."""
+        with self._touch_lock:
+            if not self._touches or (not force and time.time() - self._last_flush < self.touch_interval):
+                return
+            touches, self._touches = self._touches, {}
+            self._last_flush = time.time()
+        with self._transaction() as conn:
+            # MAX: nunca encurta uma validade gravada por outro processo
+            conn.executemany(
+                "UPDATE sessions SET expires_at = MAX(expires_at, ?) WHERE token = ?",
+                [(expires_at, token) for token, expires_at in touches.items()],
+            )
+
+    def flush(self):
+        """Grava imediatamente as renovações pendentes (ex.: ao encerrar o processo)."""
+        self._flush_touches(force=True)
+
+    def purge_expired(self) -> int:
+        """Remove as sessões expiradas; retorna quantas."""
+        self.flush()
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def clear(self):
+        with self._touch_lock:
+            self._touches.clear()
+        self._conn.execute("DELETE FROM sessions")
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+
+
 class Session:
     """
     Classe responsável pelo gerenciamento de sessões e cookies.
+    Os dados ficam no SessionStore configurado em Session.store.
+
+    A sessão só é gravada (e o cookie só é enviado) quando foi alterada:
+    uma sessão nova que ninguém alterou não ocupa o store nem gera Set-Cookie.
+    Ao alterar objetos guardados na sessão (ex.: uma lista obtida via get),
+    marque session.modified = True.
     """
-    sessions = {}
+    store: SessionStore = MemorySessionStore()
+    cookie_name = "session_id"
+    cookie_attributes = "Path=/; HttpOnly"
 
     def __init__(self, request: Request):
-        self.session_id = request.cookies.get("session_id", str(uuid.uuid4()))
-        self.data = self.sessions.get(self.session_id, {})
-        self.sessions[self.session_id] = self.data
+        token = request.cookies.get(self.cookie_name)
+        data = self.store.load(token) if token else None
+        # Sessão nova: sem cookie, expirada ou descartada
+        self.new = data is None
+        self.session_id = self.store.new_token() if self.new else token
+        self.data = {} if self.new else data
+        # Stores que precisam reemitir o token (ex.: cookie assinado perto de expirar)
+        self.modified = not self.new and self.store.should_refresh(token)
+        self.deleted = False
+        self._cookie_pending = False
 
     def get(self, key, default=None):
         return self.data.get(key, default)
 
     def set(self, key, value):
         self.data[key] = value
+        self.modified = True
+        self.deleted = False
 
     def delete(self):
-        if self.session_id in self.sessions:
-            del self.sessions[self.session_id]
-    
+        """Encerra a sessão: remove os dados do store e expira o cookie no cliente."""
+        if not self.new:
+            self.store.delete(self.session_id)
+        # Uma sessão recriada depois disto (ex.: novo login) recebe outro identificador
+        self.session_id = self.store.new_token()
+        self.data = {}
+        self.modified = False
+        self.deleted = True
+
+    def save(self) -> bool:
+        """Grava a sessão se foi alterada; retorna se o cookie precisa ser enviado."""
+        if self.modified:
+            self.session_id = self.store.save(self.session_id, self.data)
+            self.modified = False
+            self._cookie_pending = True
+        return self._cookie_pending or (self.deleted and not self.new)
+
     def get_cookies(self):
-        return {"session_id": self.session_id} if self.session_id else {}
+        """Cookie a enviar nesta resposta ({} quando não houve alteração)."""
+        if self.deleted:
+            return {self.cookie_name: ""} if not self.new else {}
+        return {self.cookie_name: self.session_id} if self._cookie_pending else {}
+
+    def cookie_headers(self):
+        """Valores de Set-Cookie a enviar nesta resposta."""
+        if self.deleted:
+            return [f"{self.cookie_name}=; Max-Age=0; {self.cookie_attributes}"] if not self.new else []
+        if self._cookie_pending:
+            return [f"{self.cookie_name}={self.session_id}; {self.cookie_attributes}"]
+        return []
@@ -0,0 +1,58 @@
+import os
+from urllib.parse import unquote
+
+from arcforge.core.conn.request import Request
+from arcforge.core.conn.response import Response, HttpStatus, FileResponse
+from arcforge.core.conn.router import Router
+
+
+# -----------------------------------------------------------------------------
+# Arquivos estáticos
+# Serve os arquivos de um diretório com FileResponse (sendfile, Range e
+# GET condicional). O caminho pedido é decodificado (%20, UTF-8), resolvido com
+# realpath e recusado se sair do diretório configurado (proteção contra path
+# traversal, inclusive com "%2e%2e/").
+# -----------------------------------------------------------------------------
+
+
+class StaticFiles:
+    """
+    Handler de arquivos estáticos.
+
+    Uso:
+        StaticFiles.mount("/static", "public")
+    """
+
+    def __init__(self, directory: str, cache_control: str = "public, max-age=3600", index: str = None):
+        self.directory = os.path.realpath(directory)
+        self.cache_control = cache_control
+        self.index = index
+
+    @classmethod
+    def mount(cls, prefix: str, directory: str, **options) -> "StaticFiles":
+        """Registra uma rota GET "{prefix}/{path:path}" servindo o diretório."""
+        handler = cls(directory, **options)
+        Router.route(f"{prefix.rstrip('/')}/{{path:path}}", "GET")(handler)
+        return handler
+
+    def __call__(self, request: Request, path: str):
+        file_path = self.resolve(path)
+        if file_path is None:
+            return Response(HttpStatus.NOT_FOUND, {"error": "Arquivo não encontrado"})
+
+        headers = {"Cache-Control": self.cache_control} if self.cache_control else None
+        return FileResponse(file_path, headers=headers)
+
+    def resolve(self, path: str):
+        """Caminho real do arquivo pedido, ou None se não existir ou estiver fora do diretório."""
+        path = unquote(path)
+        if "\x00" in path:
+            return None
+        file_path = os.path.realpath(os.path.join(self.directory, path.lstrip("/")))
+        if os.path.commonpath((self.directory, file_path)) != self.directory:
+            return None
+        if os.path.isdir(file_path) and self.index:
+            file_path = os.path.join(file_path, self.index)
+        if not os.path.isfile(file_path):
+            return None
+        return file_path
@@ -18,6 +18,9 @@ class Validator:
             # Valida os parâmetros passados na requisição
             for param, expected_type in self.expected_types.items():
                 if param in kwargs:
+                    # Parâmetros tipados na rota ("{id:int}") já chegam convertidos
+                    if isinstance(kwargs[param], expected_type):
+                        continue
                     try:
                         # Tenta converter para o tipo esperado, caso não consiga, lança exceção
                         converted_value = expected_type(kwargs[param])
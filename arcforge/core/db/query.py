@@ -1,14 +1,23 @@
 from typing import List, Any
+import time
 import psycopg
 from psycopg import sql
 import logging
 
+from arcforge.metrics import Counter, Histogram
+
 # -----------------------------------------------------------------------------
 # Configuração de Logging
 # -----------------------------------------------------------------------------
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# -----------------------------------------------------------------------------
+# Métricas das consultas (exportadas junto com as métricas HTTP)
+# -----------------------------------------------------------------------------
+DB_QUERY_SECONDS = Histogram("arcforge_db_query_duration_seconds", "Duração das consultas ao banco de dados.", ("operation",))
+DB_QUERY_ERRORS = Counter("arcforge_db_query_errors_total", "Consultas ao banco de dados que falharam.", ("operation",))
+
 
 class Query:
 
@@ -22,6 +31,18 @@ class Query:
         connection = self.__db_manager.get_connection()
         return connection
 
+    @staticmethod
+    def __execute(cursor, operation: str, query, params=None):
+        """Executa a consulta registrando a duração e as falhas por operação."""
+        started = time.perf_counter()
+        try:
+            cursor.execute(query, params)
+        except Exception:
+            DB_QUERY_ERRORS.labels(operation).inc()
+            raise
+        finally:
+            DB_QUERY_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
     def table_exists(self, table_name):
         """Verifica se uma tabela já existe no banco de dados."""
         query = sql.SQL("""
@@ -33,7 +54,7 @@ class Query:
         conn = self.__get_connection()
         try:
             with conn.cursor() as cursor:
-                cursor.execute(query, (table_name,))
+                self.__execute(cursor, "table_exists", query, (table_name,))
                 return cursor.fetchone()[0]  # Retorna True se a tabela existir, False caso contrário
         except psycopg.Error as e:
             logger.error(f"Erro ao verificar a existência da tabela {table_name}: {e}")
@@ -57,7 +78,7 @@ class Query:
         conn = self.__get_connection()
         try:
             with conn.cursor() as cursor:  # Usando a conexão obtida dinamicamente
-                cursor.execute(create_table_query)
+                self.__execute(cursor, "create_table", create_table_query)
                 conn.commit()  # Commit na conexão
                 logger.info(f"Tabela {base_model._table_name} criada com sucesso.")
         except psycopg.Error as e:
@@ -77,7 +98,7 @@ class Query:
         conn = self.__get_connection()
         try:
             with conn.cursor() as cursor:
-                cursor.execute(drop_table_query)
+                self.__execute(cursor, "delete_table", drop_table_query)
                 conn.commit()
                 logger.info(f"Tabela {base_model._table_name} deletada com sucesso (cascade).")
         except psycopg.Error as e:
@@ -108,7 +129,7 @@ class Query:
         conn = self.__get_connection()
         try:
             with conn.cursor() as cursor:
-                cursor.execute(query, values)
+                self.__execute(cursor, "save", query, values)
                 conn.commit()
                 model_instance.id = cursor.fetchone()[0]
                 logger.info(f"Instância de {model_instance.__class__.__name__} salva com sucesso.")
@@ -146,7 +167,7 @@ class Query:
         conn = self.__get_connection()
         try:
             with conn.cursor() as cursor:
-                cursor.execute(query, values)
+                self.__execute(cursor, "update", query, values)
                 conn.commit()
                 logger.info(f"Instância de {model_instance.__class__.__name__} atualizada com sucesso.")
                 return model_instance
@@ -173,7 +194,7 @@ class Query:
         conn = self.__get_connection()
         try:
             with conn.cursor() as cursor:
-                cursor.execute(query, (object_id,))
+                self.__execute(cursor, "delete", query, (object_id,))
                 conn.commit()
                 logger.info(f"Registro com ID {object_id} deletado com sucesso.")
         except psycopg.Error as e:
@@ -195,7 +216,7 @@ class Query:
         conn = self.__get_connection()
         try:
             with conn.cursor() as cursor:
-                cursor.execute(query, [object_id])
+                self.__execute(cursor, "read", query, [object_id])
                 row = cursor.fetchone()
                 if row:
                     columns = [desc[0] for desc in cursor.description]
@@ -219,7 +240,7 @@ class Query:
         conn = self.__get_connection()
         try:
             with conn.cursor() as cursor:
-                cursor.execute(query)
+                self.__execute(cursor, "find_all", query)
                 columns = [desc[0] for desc in cursor.description]
                 rows = cursor.fetchall()
 
@@ -238,7 +259,7 @@ class Query:
         conn = self.__get_connection()
         try:
             with conn.cursor() as cursor:
-                cursor.execute(query, params)
+                self.__execute(cursor, "execute_sql", query, params)
                 return cursor.fetchall()
         except psycopg.Error as e:
             logger.error(f"Erro ao executar a consulta: {e}")
@@ -349,7 +370,7 @@ class Query:
 
 
             with conn.cursor() as cursor:
-                cursor.execute(query, filter_values)
+                self.__execute(cursor, "execute", query, filter_values)
                 rows = cursor.fetchall()
                 columns = [desc[0] for desc in cursor.description]
 
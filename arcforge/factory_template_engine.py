@@ -5,10 +5,23 @@ import os
 class TemplateEngineFactory:
     """
     Classe responsável por criar e retornar instâncias do TemplateEngine.
+
+    template_dir: pasta ou lista de pastas dos templates.
+    Demais parâmetros: ver TemplateEngine.
     """
-    def __init__(self, template_dir=None):
+    def __init__(self, template_dir=None, bytecode_cache_dir=None, precompiled_dir=None,
+                 auto_reload=True, cache_size=400, watch_interval=None,
+                 render_cache_entries=1024, render_cache_bytes=16 * 1024 * 1024, render_cache_ttl=None):
         # Define o template_dir padrão se não for fornecido
         self.template_dir = template_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+        self.bytecode_cache_dir = bytecode_cache_dir
+        self.precompiled_dir = precompiled_dir
+        self.auto_reload = auto_reload
+        self.cache_size = cache_size
+        self.watch_interval = watch_interval
+        self.render_cache_entries = render_cache_entries
+        self.render_cache_bytes = render_cache_bytes
+        self.render_cache_ttl = render_cache_ttl
 
     def create_template_engine(self):
         """
@@ -16,4 +29,8 @@ class TemplateEngineFactory:
         """
         # Importando o TemplateEngine apenas no momento da criação
         from .template_engine import TemplateEngine # Feito dessa forma pra evitar importaç~ao circular
-        return TemplateEngine()
+        return TemplateEngine(
+            self.template_dir, self.bytecode_cache_dir, self.precompiled_dir,
+            self.auto_reload, self.cache_size, self.watch_interval,
+            self.render_cache_entries, self.render_cache_bytes, self.render_cache_ttl,
+        )
@@ -0,0 +1,242 @@
+import bisect
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+
+# -----------------------------------------------------------------------------
+# Métricas no formato de texto do Prometheus
+# Contadores, gauges e histogramas com labels, registrados em um Registry e
+# exportados por Registry.render(). Cada série tem o seu próprio lock e o
+# registro de uma amostra custa apenas uma busca em dicionário e uma soma,
+# o que permite manter as métricas ligadas em produção.
+#
+# Fica fora de arcforge.core para que as camadas de conexão e de banco de
+# dados possam usá-la sem depender uma da outra. Em modo pre-fork cada worker
+# mantém as próprias séries.
+# -----------------------------------------------------------------------------
+
+
+class Registry:
+    """Conjunto de métricas exportadas juntas."""
+
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Métrica '{metric.name}' já registrada")
+            self.metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str):
+        return self.metrics.get(name)
+
+    def render(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus (versão 0.0.4)."""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registro padrão usado pelo framework
+REGISTRY = Registry()
+
+
+class Metric(ABC):
+    """
+    Família de séries com o mesmo nome, diferenciadas pelos valores dos labels.
+
+    function: métrica calculada na exportação. Para métricas sem labels retorna
+    um número; com labels, um dicionário (valores dos labels) -> número.
+    """
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry: Registry = REGISTRY, function=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._children = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values):
+        """Série correspondente aos valores dos labels (na ordem de labelnames)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"A métrica '{self.name}' espera os labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Nova série (valor) desta família."""
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"A métrica '{self.name}' exige labels: use .labels(...)")
+        return self.labels()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}", f"# TYPE {self.name} {self.type_name}"]
+        if self.function is not None:
+            values = self.function()
+            items = values.items() if isinstance(values, dict) else [((), values)]
+            for label_values, value in items:
+                if not isinstance(label_values, tuple):
+                    label_values = (label_values,)
+                lines.append(f"{self.name}{_labels(self.labelnames, label_values)} {_number(value)}")
+            return lines
+        lines.extend(self._render_children())
+        return lines
+
+    def _series(self):
+        """Séries (valores dos labels convertidos para str)."""
+        return [(tuple(str(v) for v in values), child) for values, child in list(self._children.items())]
+
+    def _render_children(self):
+        for values, child in self._series():
+            yield f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}"
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(Metric):
+    """Valor que só aumenta (ex.: total de requisições)."""
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        if amount < 0:
+            raise ValueError("Um contador não pode diminuir")
+        self._default().inc(amount)
+
+
+class Gauge(Metric):
+    """Valor que sobe e desce (ex.: requisições em andamento)."""
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._default().dec(amount)
+
+    def set(self, value: float):
+        self._default().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count", "lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # o último é o +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(Metric):
+    """Distribuição de valores em faixas cumulativas (ex.: latência)."""
+    type_name = "histogram"
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry: Registry = REGISTRY, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _render_children(self):
+        for values, child in self._series():
+            with child.lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _labels(self.labelnames + ("le",), values + (_number(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, values)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, values)} {count}"
+
+
+# -----------------------------------------------------------------------------
+# Formatação
+# -----------------------------------------------------------------------------
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_value(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
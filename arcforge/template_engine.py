@@ -1,30 +1,399 @@
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from jinja2 import ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, ModuleLoader, TemplateNotFound, nodes
+from jinja2.ext import Extension
+from .cache import LRUCache
 from .factory_template_engine import TemplateEngineFactory
+import asyncio
+import inspect
 import os
+import threading
+import time
+
+_MISSING = object()
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Tag {% cache %}: guarda o HTML gerado por um trecho do template no cache
+    de renderização do TemplateEngine.
+
+        {% cache "menu" %}...{% endcache %}
+        {% cache "cliente", cliente.id, ttl=60 %}...{% endcache %}
+
+    O primeiro argumento nomeia o fragmento; os demais diferenciam as versões
+    (o valor de cada um compõe a chave). ttl: validade em segundos (padrão: a
+    do TemplateEngine). Fragmentos são invalidados com
+    TemplateEngine.invalidate_cache(nome).
+    """
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = []
+        ttl = nodes.Const(None)
+        first = True
+        while parser.stream.current.type != "block_end":
+            if not first:
+                parser.stream.expect("comma")
+            first = False
+            if parser.stream.current.test("name:ttl") and parser.stream.look().test("assign"):
+                next(parser.stream)
+                next(parser.stream)
+                ttl = parser.parse_expression()
+            else:
+                args.append(parser.parse_expression())
+        if not args:
+            parser.fail("A tag cache exige o nome do fragmento", lineno)
+
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method("_render_fragment", [nodes.List(args), ttl])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_fragment(self, key_parts, ttl, caller):
+        if self.environment.is_async:
+            return self._render_fragment_async(key_parts, ttl, caller)
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        key = ("fragment",) + tuple(str(part) for part in key_parts)
+        output = cache.get(key, _MISSING)
+        if output is _MISSING:
+            output = caller()
+            cache.set(key, output, ttl=ttl)
+        return output
+
+    async def _render_fragment_async(self, key_parts, ttl, caller):
+        # No ambiente assíncrono o corpo do bloco (caller) é uma corrotina
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return await caller()
+        key = ("fragment",) + tuple(str(part) for part in key_parts)
+        output = cache.get(key, _MISSING)
+        if output is _MISSING:
+            output = await caller()
+            cache.set(key, output, ttl=ttl)
+        return output
 
 class TemplateEngine:
     """
     Classe responsável por gerenciar a renderização de templates com Jinja2.
-    Sempre busca os templates na pasta fixa 'templates' dentro do projeto.
+
+    template_dirs: pasta ou lista de pastas onde os templates são procurados,
+    em ordem (padrão: a pasta 'templates' do projeto).
+    bytecode_cache_dir: pasta onde o código compilado dos templates é guardado
+    entre execuções; workers novos não precisam recompilar os templates.
+    precompiled_dir: pasta (ou .zip) gerada por compile_templates. Os templates
+    encontrados nela não são interpretados nem compilados; os demais continuam
+    sendo lidos de template_dirs.
+
+    Modo de produção (auto_reload=False): os templates carregados ficam em
+    memória (LRU de até cache_size templates) e os arquivos não são consultados
+    a cada renderização. Alterações só entram em vigor via reload() ou, com
+    watch_interval, por uma thread que verifica os arquivos a cada
+    watch_interval segundos.
+
+    Renderização assíncrona: render_template_async e stream_template_async
+    usam um segundo ambiente (enable_async), criado no primeiro uso, em que
+    corrotinas e iteráveis assíncronos podem ser usados dentro dos templates.
+
+    Cache de renderização: render_template(..., cache_key=..., ttl=...) e a tag
+    {% cache %} guardam o HTML gerado em um LRU limitado a render_cache_entries
+    entradas e render_cache_bytes caracteres; render_cache_ttl é a validade
+    padrão (None = até ser invalidado ou descartado).
     """
-    def __init__(self):
-        # Obtém o diretório raiz do projeto e fixa o caminho dos templates
-        project_root = os.path.dirname(os.path.abspath(__file__))  # Caminho do arquivo atual
-        self.template_dir = os.path.join(project_root, "templates")  # templates dentro do projeto
-        self.env = Environment(loader=FileSystemLoader(self.template_dir))
+    def __init__(self, template_dirs=None, bytecode_cache_dir=None, precompiled_dir=None,
+                 auto_reload=True, cache_size=400, watch_interval=None,
+                 render_cache_entries=1024, render_cache_bytes=16 * 1024 * 1024, render_cache_ttl=None):
+        if template_dirs is None:
+            # Obtém o diretório raiz do projeto e usa a pasta de templates dele
+            project_root = os.path.dirname(os.path.abspath(__file__))  # Caminho do arquivo atual
+            template_dirs = [os.path.join(project_root, "templates")]  # templates dentro do projeto
+        elif isinstance(template_dirs, (str, os.PathLike)):
+            template_dirs = [template_dirs]
+        self.template_dirs = [os.fspath(path) for path in template_dirs]
+        self.template_dir = self.template_dirs[0]
+
+        loader = self._file_loader = FileSystemLoader(self.template_dirs)
+        if precompiled_dir is not None:
+            loader = ChoiceLoader([ModuleLoader(precompiled_dir), loader])
 
-    def render_template(self, template_name, **context):
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+
+        self.env = Environment(
+            loader=loader, bytecode_cache=bytecode_cache, auto_reload=auto_reload, cache_size=cache_size,
+            extensions=[FragmentCacheExtension],
+        )
+        self.bytecode_cache_dir = bytecode_cache_dir
+        self.cache_size = cache_size
+        self.render_cache = LRUCache(render_cache_entries, render_cache_bytes, render_cache_ttl)
+        self.env.fragment_cache = self.render_cache
+        self._async_env = None
+
+        self.watch_interval = watch_interval
+        self._watcher_pid = None
+        self._watcher_lock = threading.Lock()
+        self._ensure_watcher()
+
+    def render_template(self, template_name, cache_key=None, ttl=None, **context):
         """
         Renderiza um template HTML com as variáveis fornecidas.
+
+        cache_key: identifica o resultado no cache de renderização (deve
+        refletir todo o contexto que altera a página). Enquanto válido, o HTML
+        guardado é devolvido sem renderizar. ttl: validade em segundos.
         """
+        if cache_key is not None:
+            key = ("render", template_name, cache_key)
+            output = self.render_cache.get(key, _MISSING)
+            if output is _MISSING:
+                output = self.render_template(template_name, **context)
+                self.render_cache.set(key, output, ttl=ttl)
+            return output
+
+        self._ensure_watcher()
         try:
             template = self.env.get_template(template_name)
             return template.render(context)
         except TemplateNotFound:
-            raise FileNotFoundError(f"Template '{template_name}' não encontrado em '{self.template_dir}'")
+            raise FileNotFoundError(f"Template '{template_name}' não encontrado em {self.template_dirs}")
+        except Exception as e:
+            raise RuntimeError(f"Erro ao renderizar template '{template_name}': {e}")
+
+    @property
+    def async_env(self) -> Environment:
+        """Ambiente Jinja2 assíncrono, com as mesmas pastas e o mesmo cache de renderização de self.env."""
+        if self._async_env is None:
+            # O código compilado difere do síncrono: templates pré-compilados
+            # não são usados e o bytecode fica em arquivos separados
+            bytecode_cache = None
+            if self.bytecode_cache_dir is not None:
+                bytecode_cache = FileSystemBytecodeCache(self.bytecode_cache_dir, "__jinja2_async_%s.cache")
+            env = self.env.overlay(
+                enable_async=True, loader=self._file_loader, bytecode_cache=bytecode_cache,
+                cache_size=self.cache_size,  # cache próprio: o do ambiente síncrono não serve
+            )
+            env.fragment_cache = self.render_cache
+            self._async_env = env
+        return self._async_env
+
+    async def render_template_async(self, template_name, cache_key=None, ttl=None, **context):
+        """
+        Versão assíncrona de render_template para handlers corrotina.
+
+        Valores do contexto que são awaitables (ex.: corrotinas de um DAO) são
+        aguardados em paralelo antes da renderização; dentro do template,
+        chamadas que retornam corrotinas e iteráveis assíncronos em {% for %}
+        são aguardados automaticamente, sem bloquear o event loop.
+        """
+        if cache_key is not None:
+            key = ("render", template_name, cache_key)
+            output = self.render_cache.get(key, _MISSING)
+            if output is _MISSING:
+                output = await self.render_template_async(template_name, **context)
+                self.render_cache.set(key, output, ttl=ttl)
+            return output
+
+        self._ensure_watcher()
+        try:
+            template = self.async_env.get_template(template_name)
+            return await template.render_async(await self._resolve_context(context))
+        except TemplateNotFound:
+            raise FileNotFoundError(f"Template '{template_name}' não encontrado em {self.template_dirs}")
+        except Exception as e:
+            raise RuntimeError(f"Erro ao renderizar template '{template_name}': {e}")
+
+    @staticmethod
+    async def _resolve_context(context: dict) -> dict:
+        """Aguarda (em paralelo) os valores do contexto que são awaitables."""
+        pending = [name for name, value in context.items() if inspect.isawaitable(value)]
+        if not pending:
+            return context
+        values = await asyncio.gather(*(context[name] for name in pending))
+        return {**context, **dict(zip(pending, values))}
+
+    def stream_template(self, template_name, buffer_size=4096, **context):
+        """
+        Renderiza o template aos poucos (Template.generate), devolvendo um
+        gerador de blocos de texto para uma resposta chunked
+        (StreamingResponse.html). Cada bloco é liberado ao acumular ao menos
+        buffer_size caracteres (0 = cada trecho do template sai imediatamente),
+        de modo que o início da página chega ao navegador enquanto as partes
+        lentas ainda estão sendo calculadas.
+
+        O template é carregado aqui, antes do envio dos headers: se não existir
+        ou tiver erro de sintaxe, a exceção ocorre nesta chamada.
+        """
+        template = self._load_for_streaming(self.env, template_name)
+        return self._buffered(template_name, template.generate(context), buffer_size)
+
+    def stream_template_async(self, template_name, buffer_size=4096, **context):
+        """
+        Versão assíncrona de stream_template: devolve um gerador assíncrono de
+        blocos, aceito por StreamingResponse.html. Como em stream_template, o
+        template é carregado nesta chamada; os valores awaitables do contexto
+        são aguardados no início da iteração.
+        """
+        template = self._load_for_streaming(self.async_env, template_name)
+        return self._buffered_async(template_name, template, context, buffer_size)
+
+    def _load_for_streaming(self, env: Environment, template_name):
+        self._ensure_watcher()
+        try:
+            return env.get_template(template_name)
+        except TemplateNotFound:
+            raise FileNotFoundError(f"Template '{template_name}' não encontrado em {self.template_dirs}")
         except Exception as e:
             raise RuntimeError(f"Erro ao renderizar template '{template_name}': {e}")
 
+    @staticmethod
+    def _buffered(template_name, pieces, buffer_size):
+        buffer = []
+        size = 0
+        try:
+            for piece in pieces:
+                buffer.append(piece)
+                size += len(piece)
+                if size >= buffer_size:
+                    yield "".join(buffer)
+                    buffer = []
+                    size = 0
+        except Exception as e:
+            raise RuntimeError(f"Erro ao renderizar template '{template_name}': {e}") from e
+        if buffer:
+            yield "".join(buffer)
+
+    @classmethod
+    async def _buffered_async(cls, template_name, template, context, buffer_size):
+        buffer = []
+        size = 0
+        try:
+            async for piece in template.generate_async(await cls._resolve_context(context)):
+                buffer.append(piece)
+                size += len(piece)
+                if size >= buffer_size:
+                    yield "".join(buffer)
+                    buffer = []
+                    size = 0
+        except Exception as e:
+            raise RuntimeError(f"Erro ao renderizar template '{template_name}': {e}") from e
+        if buffer:
+            yield "".join(buffer)
+
+    def reload(self, template_name=None):
+        """
+        Descarta da memória o template informado (ou todos), que será lido de
+        novo na próxima renderização. Templates que o estendem ou incluem
+        passam a usar a nova versão automaticamente.
+        """
+        # O HTML guardado pode ter vindo da versão antiga (de um template pai ou
+        # incluído, inclusive): descarta o cache de renderização inteiro
+        self.render_cache.clear()
+        for env in (self.env, self._async_env):
+            cache = env.cache if env is not None else None
+            if cache is None:  # cache_size=0: nada fica em memória
+                continue
+            if template_name is None:
+                cache.clear()
+                continue
+            # Chaves do cache do Jinja2: (referência ao loader, nome do template)
+            for key in list(cache.keys()):
+                if key[1] == template_name:
+                    try:
+                        del cache[key]
+                    except KeyError:
+                        pass
+
+    def invalidate_cache(self, name=None) -> int:
+        """
+        Remove do cache de renderização as páginas do template name e os
+        fragmentos {% cache %} chamados name (None = tudo). Retorna quantas
+        entradas foram removidas.
+        """
+        if name is None:
+            removed = len(self.render_cache)
+            self.render_cache.clear()
+            return removed
+        return self.render_cache.invalidate(lambda key: key[1] == name)
+
+    def _snapshot(self) -> dict:
+        """Data de modificação de cada arquivo de template (nome -> mtime)."""
+        mtimes = {}
+        for template_dir in self.template_dirs:
+            for root, _, files in os.walk(template_dir):
+                for file in files:
+                    path = os.path.join(root, file)
+                    name = os.path.relpath(path, template_dir).replace(os.sep, "/")
+                    try:
+                        mtimes.setdefault(name, os.stat(path).st_mtime)
+                    except OSError:
+                        pass
+        return mtimes
+
+    def _ensure_watcher(self):
+        # Após um fork a thread do processo pai não existe no filho: o pid identifica isso
+        if not self.watch_interval or self._watcher_pid == os.getpid():
+            return
+        with self._watcher_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            # O estado inicial é lido aqui, e não na thread: uma alteração feita
+            # logo após esta chamada não pode entrar na referência
+            mtimes = self._snapshot()
+            threading.Thread(target=self._watch_loop, args=(mtimes,), name="arcforge-template-watcher", daemon=True).start()
+
+    def _watch_loop(self, mtimes):
+        pid = os.getpid()
+        while self._watcher_pid == pid:
+            time.sleep(self.watch_interval)
+            current = self._snapshot()
+            if current != mtimes:
+                changed = {name for name in current.keys() | mtimes.keys() if current.get(name) != mtimes.get(name)}
+                for name in changed:
+                    self.reload(name)
+                mtimes = current
+
+    def precompile(self) -> int:
+        """
+        Carrega todos os templates (ex.: na inicialização do servidor), deixando-os
+        compilados em memória e no cache de bytecode. Retorna quantos foram carregados.
+        Com precompiled_dir, os pré-compilados são carregados de lá e os demais
+        são compilados. Arquivos que não são texto (imagens, fontes...) guardados
+        nas pastas de templates são ignorados.
+        """
+        # O ModuleLoader não sabe listar os templates: a lista vem das pastas
+        loaded = 0
+        for name in self._file_loader.list_templates():
+            try:
+                self.env.get_template(name)
+            except UnicodeDecodeError:
+                continue
+            loaded += 1
+        return loaded
+
+    def compile_templates(self, target, zip=None):
+        """
+        Compila todos os templates para módulos Python em target (etapa de build).
+        O resultado é usado com TemplateEngine(precompiled_dir=target).
+        zip: None grava uma pasta; "deflated" ou "stored" gravam um arquivo .zip.
+        Arquivos que não são texto são ignorados, como em precompile.
+        """
+        self.env.compile_templates(target, zip=zip, ignore_errors=False, filter_func=self._is_text_template)
+
+    def _is_text_template(self, name) -> bool:
+        """Indica se o arquivo pode ser lido como template (texto na codificação do loader)."""
+        try:
+            self._file_loader.get_source(self.env, name)
+        except UnicodeDecodeError:
+            return False
+        return True
+
 
-factory = TemplateEngineFactory() 
-template_engine = factory.create_template_engine()  # Criando uma instância global do TemplateEngine
\ No newline at end of file
+factory = TemplateEngineFactory()
+template_engine = factory.create_template_engine()  # Criando uma instância global do TemplateEngine
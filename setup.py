@@ -8,6 +8,10 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        # Serialização JSON mais rápida (opcional)
+        "fast": ["orjson"],
+    },
     author="Filipe Rodriges, Lucas Pedro, Gabriel Felix",
     author_email="filiperodrigues.estudo@gmail.com, lucasjaud19@gmail.com, gfedacs@hotmail.com",
     description="Um framework web em Python",
@@ -0,0 +1,132 @@
+import http.client
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+# arcforge.core valida os parâmetros de conexão ao ser importado. Nenhum
+# teste abre conexões com o banco, então valores fictícios bastam quando não
+# há um .env disponível.
+for name in ("DB_NAME", "DB_USER", "DB_PASSWORD", "DB_HOST"):
+    os.environ.setdefault(name, "arcforge_test")
+
+from arcforge.core.conn.router import Router  # noqa: E402
+
+
+@pytest.fixture
+def isolated_router():
+    """Cada teste registra as próprias rotas sem afetar as globais."""
+    routes, compiled = Router.routes, Router._compiled
+    Router.routes, Router._compiled = [], None
+    yield Router
+    Router.routes, Router._compiled = routes, compiled
+
+
+@pytest.fixture
+def serve():
+    """
+    Inicia um servidor em uma porta livre de 127.0.0.1 e devolve a porta:
+    serve("threading") ou serve("asyncio"); os servidores são encerrados no fim.
+    """
+    from http.server import ThreadingHTTPServer
+    from arcforge.core.conn.async_server import AsyncHTTPServer
+    from arcforge.core.conn.handler import RequestHandler
+    from arcforge.core.conn.prefork import create_listen_socket
+
+    servers = []
+
+    def start(engine="threading", server_class=None, handler_class=RequestHandler, **options):
+        if engine == "asyncio":
+            sock = create_listen_socket(("127.0.0.1", 0))
+            httpd = AsyncHTTPServer(sock.getsockname(), handler_class, sock=sock)
+        else:
+            httpd = (server_class or ThreadingHTTPServer)(("127.0.0.1", 0), handler_class, **options)
+            sock = httpd.socket
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        servers.append((httpd, thread))
+        port = sock.getsockname()[1]
+        _wait_until_listening(port)
+        return port
+
+    yield start
+
+    for httpd, thread in servers:
+        httpd.shutdown()
+        httpd.server_close()
+        thread.join(timeout=5)
+
+
+def _wait_until_listening(port, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+class RawConnection:
+    """Conexão TCP com o servidor de teste que envia bytes e lê respostas HTTP/1.1."""
+
+    def __init__(self, port, timeout=5.0):
+        self.sock = socket.create_connection(("127.0.0.1", port), timeout=timeout)
+        self.file = self.sock.makefile("rb")
+
+    def send(self, data: bytes):
+        self.sock.sendall(data)
+
+    def read_response(self, method="GET"):
+        """(status, headers, corpo) da próxima resposta; status None se a conexão fechou."""
+        line = self.file.readline()
+        if not line:
+            return None, None, b""
+        status = int(line.split()[1])
+        headers = http.client.parse_headers(self.file)
+        if 100 <= status < 200 or status in (204, 304) or method == "HEAD":
+            return status, headers, b""
+        if headers.get("Transfer-Encoding", "").lower() == "chunked":
+            return status, headers, self._read_chunked()
+        if headers.get("Content-Length") is not None:
+            return status, headers, self.file.read(int(headers["Content-Length"]))
+        return status, headers, self.file.read()
+
+    def _read_chunked(self) -> bytes:
+        body = []
+        while True:
+            size = int(self.file.readline().split(b";")[0], 16)
+            if size == 0:
+                self.file.readline()
+                return b"".join(body)
+            body.append(self.file.read(size))
+            self.file.readline()
+
+    def closed_by_server(self) -> bool:
+        try:
+            return self.file.read(1) == b""
+        except ConnectionError:
+            return True
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+@pytest.fixture
+def connect():
+    """connect(porta) -> RawConnection; as conexões são fechadas no fim do teste."""
+    connections = []
+
+    def open_connection(port, timeout=5.0):
+        connection = RawConnection(port, timeout)
+        connections.append(connection)
+        return connection
+
+    yield open_connection
+    for connection in connections:
+        connection.close()
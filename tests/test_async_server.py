@@ -0,0 +1,55 @@
+import pytest
+
+from arcforge.core.conn.request import Request
+from arcforge.core.conn.response import Response, HttpStatus
+
+
+# -----------------------------------------------------------------------------
+# Comportamentos de protocolo que os dois motores devem ter em comum.
+# -----------------------------------------------------------------------------
+
+pytestmark = pytest.mark.usefixtures("isolated_router")
+
+ENGINES = ("threading", "asyncio")
+
+
+@pytest.fixture
+def echo(isolated_router):
+    @isolated_router.route("/eco", "POST")
+    def eco(request):
+        return Response(HttpStatus.OK, {"recebido": request.raw_body.decode()})
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_expect_100_continue(engine, serve, connect, echo):
+    connection = connect(serve(engine))
+    connection.send(b"POST /eco HTTP/1.1\r\nHost: t\r\nContent-Length: 5\r\nExpect: 100-continue\r\n\r\n")
+
+    # O cliente só envia o corpo depois da resposta provisória
+    status, _, _ = connection.read_response()
+    assert status == 100
+    connection.send(b"hello")
+    status, _, body = connection.read_response()
+    assert status == 200
+    assert b'"hello"' in body
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_expect_100_continue_rejects_large_body(engine, serve, connect, echo, monkeypatch):
+    monkeypatch.setattr(Request, "max_body_size", 4)
+    connection = connect(serve(engine))
+    connection.send(b"POST /eco HTTP/1.1\r\nHost: t\r\nContent-Length: 5\r\nExpect: 100-continue\r\n\r\n")
+
+    status, headers, _ = connection.read_response()
+    assert status == 413
+    assert headers["Connection"] == "close"
+    assert connection.closed_by_server()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_expect_is_ignored_in_http_1_0(engine, serve, connect, echo):
+    connection = connect(serve(engine))
+    connection.send(b"POST /eco HTTP/1.0\r\nContent-Length: 2\r\nExpect: 100-continue\r\n\r\nok")
+    status, _, body = connection.read_response()
+    assert status == 200
+    assert b'"ok"' in body
@@ -0,0 +1,247 @@
+import asyncio
+import http.client
+import io
+import time
+
+import pytest
+
+from arcforge.cache import LRUCache
+from arcforge.core.conn.async_server import AsyncRequestProxy
+from arcforge.core.conn.cache import ResponseCache
+from arcforge.core.conn.request import Request
+from arcforge.core.conn.response import Response, HttpStatus, HtmlResponse
+from arcforge.core.conn.session import Session, MemorySessionStore
+
+
+ENGINES = ("threading", "asyncio")
+
+
+# -----------------------------------------------------------------------------
+# LRUCache
+# -----------------------------------------------------------------------------
+
+def test_least_recently_used_is_evicted():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit():
+    cache = LRUCache(max_entries=None, max_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.set("c", b"1")
+    assert "a" not in cache
+    assert cache.stats()["bytes"] == 6
+    assert cache.set("d", b"x" * 11) is False
+    assert "d" not in cache
+
+
+def test_replacing_a_key_updates_size():
+    cache = LRUCache(max_bytes=100)
+    cache.set("a", b"x" * 40)
+    cache.set("a", b"x" * 10)
+    assert len(cache) == 1
+    assert cache.stats()["bytes"] == 10
+
+
+def test_expired_entries():
+    cache = LRUCache(ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    time.sleep(0.1)
+    assert cache.get("a", "padrão") == "padrão"
+    assert cache.get("b") == 2
+    cache.set("c", 3, ttl=0.01)
+    time.sleep(0.05)
+    assert cache.purge_expired() == 1
+    assert len(cache) == 1
+
+
+def test_invalidate_and_delete():
+    cache = LRUCache()
+    for key in ("/a", "/a/1", "/b"):
+        cache.set(key, key)
+    assert cache.invalidate(lambda key: key.startswith("/a")) == 2
+    assert cache.delete("/b") is True
+    assert cache.delete("/b") is False
+    assert len(cache) == 0
+
+
+def test_hits_and_misses():
+    cache = LRUCache()
+    cache.set("a", None)
+    cache.get("a")
+    cache.get("x")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+# -----------------------------------------------------------------------------
+# ResponseCache
+# -----------------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    ResponseCache.clear()
+    yield
+    ResponseCache.clear()
+
+
+def make_request(target: str, raw_headers: bytes = b"", method: str = "GET") -> Request:
+    headers = http.client.parse_headers(io.BytesIO(raw_headers + b"\r\n"))
+    return Request(AsyncRequestProxy(method, target, "HTTP/1.1", headers, io.BytesIO()))
+
+
+def counting_route(cache: ResponseCache, result=None):
+    calls = []
+
+    @cache
+    def route(request):
+        calls.append(request.full_path)
+        if result is not None:
+            return result()
+        return Response(HttpStatus.OK, {"chamada": len(calls)})
+
+    return route, calls
+
+
+def test_repeated_request_is_served_from_cache():
+    route, calls = counting_route(ResponseCache(ttl=60))
+    first = route(make_request("/itens"))
+    second = route(make_request("/itens"))
+    assert calls == ["/itens"]
+    assert second.payload == first.payload
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert second is not first
+
+
+def test_query_string_and_vary_headers_are_part_of_the_key():
+    route, calls = counting_route(ResponseCache(ttl=60, vary=("Accept-Language",)))
+    route(make_request("/itens?pagina=1"))
+    route(make_request("/itens?pagina=2"))
+    route(make_request("/itens?pagina=1", b"Accept-Language: en\r\n"))
+    route(make_request("/itens?pagina=1"))
+    assert calls == ["/itens?pagina=1", "/itens?pagina=2", "/itens?pagina=1"]
+    assert route(make_request("/itens")).headers["Vary"] == "Accept-Language"
+
+
+def test_entries_expire_after_ttl():
+    route, calls = counting_route(ResponseCache(ttl=0.05))
+    route(make_request("/itens"))
+    time.sleep(0.1)
+    route(make_request("/itens"))
+    assert len(calls) == 2
+
+
+def test_if_none_match_gets_304():
+    route, calls = counting_route(ResponseCache(ttl=60))
+    etag = route(make_request("/itens")).headers["ETag"]
+    for if_none_match in (etag, f"W/{etag}", "*", etag[:-1] + '-deflate"'):
+        response = route(make_request("/itens", b"If-None-Match: %s\r\n" % if_none_match.encode()))
+        assert response.status == 304
+        assert response.payload == b""
+        assert "Content-Type" not in response.headers
+    assert route(make_request("/itens", b'If-None-Match: "outra"\r\n')).status == 200
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("result", [
+    lambda: Response(HttpStatus.NOT_FOUND, {"error": "não encontrado"}),
+    lambda: Response(HttpStatus.OK, {"ok": True}, cookies={"tema": "escuro"}),
+])
+def test_responses_that_are_not_shared_are_not_cached(result):
+    route, calls = counting_route(ResponseCache(ttl=60), result)
+    route(make_request("/itens"))
+    route(make_request("/itens"))
+    assert len(calls) == 2
+
+
+def test_only_get_is_cached():
+    route, calls = counting_route(ResponseCache(ttl=60))
+    route(make_request("/itens", method="POST"))
+    route(make_request("/itens", method="POST"))
+    assert len(calls) == 2
+
+
+def test_iresponse_is_converted_and_cached():
+    route, calls = counting_route(ResponseCache(ttl=60), lambda: HtmlResponse(HttpStatus.OK, "<p>oi</p>"))
+    assert route(make_request("/pagina")).payload == b"<p>oi</p>"
+    assert route(make_request("/pagina")).payload == b"<p>oi</p>"
+    assert len(calls) == 1
+
+
+def test_session_dependent_response_is_not_cached():
+    cache = ResponseCache(ttl=60)
+    calls = []
+
+    @cache
+    def perfil(request):
+        calls.append(1)
+        return Response(HttpStatus.OK, {"usuario": request.session.get("usuario")})
+
+    def request_with_session():
+        request = make_request("/perfil")
+        request.session_factory = lambda r: {"usuario": "ana"}
+        return request
+
+    assert perfil(request_with_session()).payload == b'{"usuario":"ana"}'
+    perfil(request_with_session())
+    assert len(calls) == 2
+    assert ResponseCache.stats()["entries"] == 0
+
+
+def test_invalidate_by_path_and_prefix():
+    route, calls = counting_route(ResponseCache(ttl=60))
+    for target in ("/clientes", "/clientes?pagina=2", "/clientes/1", "/pedidos"):
+        route(make_request(target))
+    assert ResponseCache.invalidate("/clientes") == 2
+    assert ResponseCache.invalidate(prefix="/clientes/") == 1
+    assert ResponseCache.invalidate() == 0
+    assert ResponseCache.stats()["entries"] == 1
+
+
+def test_async_route():
+    calls = []
+
+    @ResponseCache(ttl=60)
+    async def route(request):
+        calls.append(1)
+        return Response(HttpStatus.OK, {"ok": True})
+
+    asyncio.run(route(make_request("/async")))
+    asyncio.run(route(make_request("/async")))
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_session_data_does_not_leak_through_cache(engine, isolated_router, serve, connect, monkeypatch):
+    monkeypatch.setattr(Session, "store", MemorySessionStore(sweep_interval=0))
+
+    @isolated_router.route("/login/{nome}", "POST")
+    def login(request, nome):
+        request.session.set("usuario", nome)
+        return Response(HttpStatus.OK, {"ok": True})
+
+    @isolated_router.route("/perfil", "GET")
+    @ResponseCache(ttl=60)
+    def perfil(request):
+        return Response(HttpStatus.OK, {"usuario": request.session.get("usuario")})
+
+    port = serve(engine)
+    ana = connect(port)
+    ana.send(b"POST /login/ana HTTP/1.1\r\nHost: t\r\nContent-Length: 0\r\n\r\n")
+    _, headers, _ = ana.read_response()
+    cookie = headers["Set-Cookie"].split(";")[0]
+
+    ana.send(b"GET /perfil HTTP/1.1\r\nHost: t\r\nCookie: %s\r\n\r\n" % cookie.encode())
+    assert ana.read_response()[2] == b'{"usuario":"ana"}'
+
+    anonymous = connect(port)
+    anonymous.send(b"GET /perfil HTTP/1.1\r\nHost: t\r\n\r\n")
+    assert anonymous.read_response()[2] == b'{"usuario":null}'
@@ -0,0 +1,169 @@
+import asyncio
+import http.client
+import io
+import threading
+import time
+
+import pytest
+
+from arcforge.core.conn.async_server import AsyncRequestProxy
+from arcforge.core.conn.coalesce import Coalesce
+from arcforge.core.conn.request import Request
+from arcforge.core.conn.response import Response, HttpStatus
+
+
+WAITERS = 8
+
+
+def make_request(target: str = "/relatorio", raw_headers: bytes = b"", method: str = "GET") -> Request:
+    headers = http.client.parse_headers(io.BytesIO(raw_headers + b"\r\n"))
+    return Request(AsyncRequestProxy(method, target, "HTTP/1.1", headers, io.BytesIO()))
+
+
+class Report:
+    """Rota coalescida que só termina quando o teste libera, contando as execuções."""
+
+    def __init__(self, coalesce: Coalesce = None, error: Exception = None):
+        self.release = threading.Event()
+        self.executions = []
+        self.keys = []
+        self.error = error
+        self.coalesce = coalesce or Coalesce(key=self._key)
+
+        @self.coalesce
+        def route(request):
+            self.executions.append(request.headers.get("Cookie"))
+            self.release.wait(5)
+            if self.error is not None:
+                raise self.error
+            return Response(HttpStatus.OK, {"execucao": len(self.executions)})
+
+        self.route = route
+
+    def _key(self, request):
+        key = Coalesce.default_key(request)
+        self.keys.append(key)
+        return key
+
+    def run_concurrently(self, requests) -> list:
+        """Executa a rota em uma thread por requisição; devolve respostas ou exceções."""
+        results = [None] * len(requests)
+
+        def call(index, request):
+            try:
+                results[index] = self.route(request)
+            except Exception as e:
+                results[index] = e
+
+        threads = [threading.Thread(target=call, args=item) for item in enumerate(requests)]
+        for thread in threads:
+            thread.start()
+        # Todas as threads calcularam a chave (e entraram em seguida na espera)
+        deadline = time.monotonic() + 5
+        while len(self.keys) < len(requests) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+
+def test_concurrent_identical_requests_execute_once():
+    report = Report()
+    responses = report.run_concurrently([make_request() for _ in range(WAITERS)])
+
+    assert len(report.executions) == 1
+    assert all(response.payload == b'{"execucao":1}' for response in responses)
+    # Cada requisição recebe a sua própria cópia
+    assert len({id(response) for response in responses}) == WAITERS
+    assert report.coalesce.in_flight() == 0
+
+
+def test_different_identities_execute_separately():
+    report = Report()
+    requests = [make_request(raw_headers=b"Cookie: session_id=%d\r\n" % (index % 2)) for index in range(WAITERS)]
+    requests += [make_request(raw_headers=b"Authorization: Bearer abc\r\n")]
+    report.run_concurrently(requests)
+
+    assert sorted(report.executions, key=str) == sorted(["session_id=0", "session_id=1", None], key=str)
+
+
+def test_default_key():
+    key = Coalesce.default_key(make_request("/a?x=1", b"Cookie: c=1\r\nAuthorization: Basic y\r\nAccept: */*\r\n"))
+    assert key == ("GET", "/a", "x=1", ("c=1", "Basic y"))
+    assert Coalesce.default_key(make_request("/a")) != Coalesce.default_key(make_request("/a?x=1"))
+
+
+def test_exception_is_shared_with_waiters():
+    report = Report(error=RuntimeError("banco indisponível"))
+    results = report.run_concurrently([make_request() for _ in range(4)])
+
+    assert len(report.executions) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert report.coalesce.in_flight() == 0
+
+
+def test_waiter_runs_route_itself_after_timeout():
+    report = Report(coalesce=Coalesce(timeout=0.05))
+    leader = threading.Thread(target=report.route, args=(make_request(),))
+    leader.start()
+    while report.coalesce.in_flight() == 0:
+        time.sleep(0.01)
+
+    waiter = threading.Thread(target=report.route, args=(make_request(),))
+    waiter.start()
+    time.sleep(0.2)
+    report.release.set()
+    leader.join(5)
+    waiter.join(5)
+    assert len(report.executions) == 2
+
+
+def test_other_methods_are_not_coalesced():
+    report = Report()
+    report.release.set()
+    report.route(make_request(method="POST"))
+    report.route(make_request(method="POST"))
+    assert len(report.executions) == 2
+    assert report.keys == []
+
+
+def test_async_route():
+    executions = []
+
+    @Coalesce()
+    async def route(request):
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return Response(HttpStatus.OK, {"ok": True})
+
+    async def run():
+        return await asyncio.gather(*(route(make_request()) for _ in range(WAITERS)))
+
+    responses = asyncio.run(run())
+    assert len(executions) == 1
+    assert all(response.payload == b'{"ok":true}' for response in responses)
+
+
+def test_waiters_in_another_event_loop_share_the_result():
+    release = threading.Event()
+    executions = []
+
+    @Coalesce()
+    async def route(request):
+        executions.append(1)
+        await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+        return Response(HttpStatus.OK, {"ok": True})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(route(make_request()))))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(executions) == 1
+    assert [response.status for response in results] == [200, 200, 200]
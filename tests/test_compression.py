@@ -0,0 +1,170 @@
+import gzip
+import zlib
+
+import pytest
+
+from arcforge.core.conn.cache import ResponseCache
+from arcforge.core.conn.compression import Compression
+from arcforge.core.conn.response import Response, HttpStatus, FileResponse
+
+
+ENGINES = ("threading", "asyncio")
+TEXT = "arcforge " * 400  # 3600 bytes, bem compressível
+
+
+@pytest.fixture
+def compression():
+    return Compression(min_size=1024)
+
+
+def html(data=TEXT, headers=None) -> Response:
+    return Response(HttpStatus.OK, data, headers=headers, content_type="text/html")
+
+
+# -----------------------------------------------------------------------------
+# Negociação
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("deflate", "deflate"),
+    ("gzip, deflate", "gzip"),
+    ("deflate, gzip", "deflate"),
+    ("gzip;q=0.5, deflate", "deflate"),
+    ("gzip;q=0, deflate;q=0", None),
+    ("gzip;q=abc", None),
+    ("br, *", "gzip"),
+    ("*;q=0", None),
+    ("br;q=1.0, deflate;q=0.1", "deflate"),
+])
+def test_negotiate(compression, accept_encoding, expected):
+    assert compression.negotiate(accept_encoding) == expected
+
+
+# -----------------------------------------------------------------------------
+# Aplicação
+# -----------------------------------------------------------------------------
+
+def test_compresses_large_text_body(compression):
+    response = html()
+    body = compression.apply(response, {"Accept-Encoding": "gzip"})
+    assert gzip.decompress(body) == TEXT.encode()
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Content-Length"] == str(len(body))
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+
+def test_deflate(compression):
+    response = html()
+    body = compression.apply(response, {"Accept-Encoding": "deflate"})
+    assert zlib.decompress(body) == TEXT.encode()
+
+
+@pytest.mark.parametrize("response, accept_encoding", [
+    (html("pequeno"), "gzip"),                                          # abaixo de min_size
+    (html(), ""),                                                        # cliente não aceita
+    (html(headers={"Content-Encoding": "br"}), "gzip"),                 # já codificado
+    (html(headers={"Cache-Control": "no-transform"}), "gzip"),
+    (html(headers={"Content-Type": "image/png"}), "gzip"),              # tipo não permitido
+])
+def test_leaves_body_untouched(compression, response, accept_encoding):
+    payload, encoding = response.payload, response.headers.get("Content-Encoding")
+    assert compression.apply(response, {"Accept-Encoding": accept_encoding}) == payload
+    assert response.headers.get("Content-Encoding") == encoding
+
+
+def test_vary_is_kept_even_without_compression(compression):
+    response = html(headers={"Vary": "Accept-Language"})
+    compression.apply(response, {})
+    assert response.headers["Vary"] == "Accept-Language, Accept-Encoding"
+
+
+def test_etag_of_compressed_body_gets_encoding_suffix(compression):
+    response = html(headers={"ETag": '"v1"'})
+    compression.apply(response, {"Accept-Encoding": "gzip"})
+    assert response.headers["ETag"] == '"v1-gzip"'
+
+    response = html(headers={"ETag": 'W/"v1"'})
+    compression.apply(response, {"Accept-Encoding": "deflate"})
+    assert response.headers["ETag"] == 'W/"v1-deflate"'
+
+
+def test_etag_helpers():
+    assert Compression.encoded_etag('"abc"', "gzip") == '"abc-gzip"'
+    assert Compression.encoded_etag("abc", "gzip") == "abc-gzip"
+    assert Compression.etag_variants('"abc"') == ['"abc"', '"abc-gzip"', '"abc-deflate"']
+
+
+def test_cache_is_keyed_by_content_not_by_etag(compression):
+    # Mesma ETag do handler, conteúdos diferentes (ex.: query strings distintas)
+    first = compression.apply(html("a" * 2000, {"ETag": '"rota"'}), {"Accept-Encoding": "gzip"})
+    second = compression.apply(html("b" * 2000, {"ETag": '"rota"'}), {"Accept-Encoding": "gzip"})
+    assert gzip.decompress(first) == b"a" * 2000
+    assert gzip.decompress(second) == b"b" * 2000
+    assert compression.stats()["entries"] == 2
+
+    # O mesmo conteúdo reaproveita o corpo já comprimido
+    again = compression.apply(html("a" * 2000, {"ETag": '"rota"'}), {"Accept-Encoding": "gzip"})
+    assert again is first
+    assert compression.stats()["entries"] == 2
+
+
+def test_bodies_without_etag_are_not_cached(compression):
+    compression.apply(html(), {"Accept-Encoding": "gzip"})
+    assert compression.stats()["entries"] == 0
+
+
+def test_file_response(compression, tmp_path):
+    path = tmp_path / "pagina.html"
+    path.write_text(TEXT)
+
+    response = FileResponse(str(path))
+    body = compression.apply(response, {"Accept-Encoding": "gzip"})
+    assert gzip.decompress(body) == TEXT.encode()
+    assert response.headers["ETag"] == FileResponse(str(path)).etag[:-1] + '-gzip"'
+
+    # Sem compressão o arquivo segue via sendfile
+    assert compression.apply(FileResponse(str(path)), {}) is None
+    assert compression.apply(FileResponse(str(path)).prepare({"Range": "bytes=0-9"}),
+                             {"Accept-Encoding": "gzip"}) is None
+    assert Compression(max_file_size=100).apply(FileResponse(str(path)), {"Accept-Encoding": "gzip"}) is None
+
+
+# -----------------------------------------------------------------------------
+# Pela rede, com ResponseCache
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_compressed_etag_revalidates_against_response_cache(engine, isolated_router, serve, connect):
+    ResponseCache.clear()
+
+    @isolated_router.route("/pagina", "GET")
+    @ResponseCache(ttl=60)
+    def pagina(request):
+        return html()
+
+    connection = connect(serve(engine))
+    connection.send(b"GET /pagina HTTP/1.1\r\nHost: t\r\nAccept-Encoding: gzip\r\n\r\n")
+    status, headers, body = connection.read_response()
+    assert status == 200
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == TEXT.encode()
+    etag = headers["ETag"]
+    assert etag.endswith('-gzip"')
+
+    connection.send(b"GET /pagina HTTP/1.1\r\nHost: t\r\nAccept-Encoding: gzip\r\nIf-None-Match: %s\r\n\r\n"
+                    % etag.encode())
+    status, headers, body = connection.read_response()
+    assert status == 304
+    assert headers["ETag"] == etag
+
+    # Cliente sem compressão recebe o corpo original e a ETag sem sufixo
+    connection.send(b"GET /pagina HTTP/1.1\r\nHost: t\r\n\r\n")
+    status, headers, body = connection.read_response()
+    assert status == 200
+    assert body == TEXT.encode()
+    assert headers["ETag"] == etag.replace("-gzip", "")
+    ResponseCache.clear()
@@ -0,0 +1,188 @@
+import asyncio
+import http.client
+import io
+
+import pytest
+
+from arcforge.core.conn.async_server import HttpParser, HttpParseError
+from arcforge.core.conn.response import HttpStatus
+
+
+async def read(parser: HttpParser):
+    """(método, alvo, versão, headers, corpo) da próxima requisição, ou None."""
+    head = await parser.read_request()
+    if head is None:
+        return None
+    return (*head, await parser.read_body(head[3]))
+
+
+def parse(data: bytes, max_body_size=None, read_timeout=None, eof=True):
+    """Lê uma requisição (headers e corpo) dos bytes informados."""
+    async def run():
+        reader = asyncio.StreamReader(limit=1024)
+        reader.feed_data(data)
+        if eof:
+            reader.feed_eof()
+        return await read(HttpParser(reader, max_body_size, read_timeout=read_timeout))
+    return asyncio.run(run())
+
+
+def parse_all(data: bytes):
+    """Todas as requisições de uma conexão (pipeline) até o cliente encerrar."""
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        parser = HttpParser(reader)
+        requests = []
+        while (message := await read(parser)) is not None:
+            requests.append(message)
+        return requests
+    return asyncio.run(run())
+
+
+def parse_error(data: bytes, **options) -> HttpStatus:
+    with pytest.raises(HttpParseError) as error:
+        parse(data, **options)
+    return error.value.status
+
+
+def chunked(*pieces: bytes) -> bytes:
+    return b"".join(b"%x\r\n%s\r\n" % (len(piece), piece) for piece in pieces) + b"0\r\n\r\n"
+
+def test_content_length_body():
+    method, target, version, headers, body = parse(
+        b"POST /itens?x=1 HTTP/1.1\r\nHost: a\r\nContent-Length: 5\r\n\r\nhello"
+    )
+    assert (method, target, version, body) == ("POST", "/itens?x=1", "HTTP/1.1", b"hello")
+    assert headers["Host"] == "a"
+
+
+def test_request_without_body():
+    assert parse(b"GET / HTTP/1.0\r\n\r\n")[4] == b""
+
+
+def test_leading_blank_line_is_ignored():
+    assert parse(b"\r\nGET /a HTTP/1.1\r\n\r\n")[1] == "/a"
+
+
+def test_closed_connection_returns_none():
+    assert parse(b"") is None
+    assert parse(b"\r\n") is None
+
+
+def test_pipelined_requests_keep_their_boundaries():
+    data = (
+        b"POST /a HTTP/1.1\r\nContent-Length: 3\r\n\r\nabc"
+        b"POST /b HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n" + chunked(b"de", b"f") +
+        b"GET /c HTTP/1.1\r\n\r\n"
+    )
+    requests = parse_all(data)
+    assert [(r[1], r[4]) for r in requests] == [("/a", b"abc"), ("/b", b"def"), ("/c", b"")]
+
+
+def test_chunked_body_is_decoded():
+    _, _, _, headers, body = parse(
+        b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n" + chunked(b"hello ", b"world")
+    )
+    assert body == b"hello world"
+    assert "Transfer-Encoding" not in headers
+    assert headers["Content-Length"] == "11"
+
+
+def test_chunk_extensions_and_trailers_are_skipped():
+    body = parse(
+        b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+        b"3;nome=valor\r\nabc\r\nA\r\n0123456789\r\n0\r\nX-Soma: 1\r\nX-Outro: 2\r\n\r\n"
+    )[4]
+    assert body == b"abc0123456789"
+
+
+def test_chunked_with_content_length_uses_chunked():
+    _, _, _, headers, body = parse(
+        b"POST / HTTP/1.1\r\nContent-Length: 100\r\nTransfer-Encoding: chunked\r\n\r\n" + chunked(b"ok")
+    )
+    assert body == b"ok"
+    assert headers.get_all("Content-Length") == ["2"]
+
+
+def test_invalid_chunk_size():
+    data = b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\nabc\r\n0\r\n\r\n"
+    assert parse_error(data) is HttpStatus.BAD_REQUEST
+
+
+def test_unsupported_transfer_encoding():
+    data = b"POST / HTTP/1.1\r\nTransfer-Encoding: gzip\r\n\r\n"
+    assert parse_error(data) is HttpStatus.NOT_IMPLEMENTED
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-1"])
+def test_invalid_content_length(length):
+    data = b"POST / HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n"
+    assert parse_error(data) is HttpStatus.BAD_REQUEST
+
+
+def test_oversized_body():
+    data = b"POST / HTTP/1.1\r\nContent-Length: 11\r\n\r\nhello world"
+    assert parse_error(data, max_body_size=10) is HttpStatus.PAYLOAD_TOO_LARGE
+    assert parse(data, max_body_size=11)[4] == b"hello world"
+
+
+def test_oversized_chunked_body():
+    data = b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n" + chunked(b"hello", b" world")
+    assert parse_error(data, max_body_size=10) is HttpStatus.PAYLOAD_TOO_LARGE
+
+
+def test_headers_too_large():
+    data = b"GET / HTTP/1.1\r\nX-Grande: " + b"a" * 2048 + b"\r\n\r\n"
+    assert parse_error(data) is HttpStatus.REQUEST_HEADER_FIELDS_TOO_LARGE
+
+
+@pytest.mark.parametrize("request_line", [b"GET /", b"GET / HTTP/1.1 extra", b"LIXO"])
+def test_invalid_request_line(request_line):
+    assert parse_error(request_line + b"\r\n\r\n") is HttpStatus.BAD_REQUEST
+
+
+def test_unsupported_http_version():
+    assert parse_error(b"GET / HTTP/2.0\r\n\r\n") is HttpStatus.HTTP_VERSION_NOT_SUPPORTED
+
+
+def test_incomplete_head():
+    assert parse_error(b"GET / HTTP/1.1\r\nHost: a") is HttpStatus.BAD_REQUEST
+
+
+def test_truncated_body():
+    with pytest.raises(asyncio.IncompleteReadError):
+        parse(b"POST / HTTP/1.1\r\nContent-Length: 10\r\n\r\nabc")
+
+
+def test_stalled_body_times_out():
+    data = b"POST / HTTP/1.1\r\nContent-Length: 10\r\n\r\nabc"
+    assert parse_error(data, read_timeout=0.05, eof=False) is HttpStatus.REQUEST_TIMEOUT
+
+
+def test_head_is_read_without_the_body():
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"POST / HTTP/1.1\r\nContent-Length: 5\r\nExpect: 100-continue\r\n\r\n")
+        parser = HttpParser(reader)
+        head = await parser.read_request()
+        # O corpo ainda não foi enviado: read_request não pode esperar por ele
+        reader.feed_data(b"hello")
+        return head, await parser.read_body(head[3])
+
+    (method, _, _, headers), body = asyncio.run(run())
+    assert (method, headers["Expect"], body) == ("POST", "100-continue", b"hello")
+
+
+def test_body_length_is_checked_before_reading():
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"POST / HTTP/1.1\r\nContent-Length: 50\r\n\r\n")
+        parser = HttpParser(reader, max_body_size=10)
+        head = await parser.read_request()
+        parser.body_length(head[3])
+
+    with pytest.raises(HttpParseError) as error:
+        asyncio.run(run())
+    assert error.value.status is HttpStatus.PAYLOAD_TOO_LARGE
@@ -0,0 +1,100 @@
+import pytest
+
+from arcforge.core.conn.handler import RequestHandler
+from arcforge.core.conn.response import Response, HttpStatus
+
+
+pytestmark = pytest.mark.usefixtures("isolated_router")
+
+ENGINES = ("threading", "asyncio")
+
+
+@pytest.fixture(autouse=True)
+def routes(isolated_router):
+    @isolated_router.route("/item/{id:int}", "GET")
+    def item(request, id):
+        return Response(HttpStatus.OK, {"id": id})
+
+    @isolated_router.route("/item", "POST")
+    def create(request):
+        return Response(HttpStatus.CREATED, {"tamanho": len(request.raw_body)})
+
+
+class ShortLivedHandler(RequestHandler):
+    max_keep_alive_requests = 2
+
+
+def get(path: str, extra: bytes = b"") -> bytes:
+    return b"GET " + path.encode() + b" HTTP/1.1\r\nHost: t\r\n" + extra + b"\r\n"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_connection_is_reused(engine, serve, connect):
+    connection = connect(serve(engine))
+    for id in (1, 2, 3):
+        connection.send(get(f"/item/{id}"))
+        status, headers, body = connection.read_response()
+        assert status == 200
+        assert headers["Connection"] == "keep-alive"
+        assert body == b'{"id":%d}' % id
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_pipelined_requests_are_answered_in_order(engine, serve, connect):
+    connection = connect(serve(engine))
+    connection.send(
+        get("/item/1")
+        + b"POST /item HTTP/1.1\r\nHost: t\r\nContent-Length: 3\r\n\r\nabc"
+        + get("/item/2")
+    )
+    responses = [connection.read_response()[::2] for _ in range(3)]
+    assert responses == [(200, b'{"id":1}'), (201, b'{"tamanho":3}'), (200, b'{"id":2}')]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_unread_body_does_not_corrupt_next_request(engine, serve, connect, isolated_router):
+    @isolated_router.route("/ignora", "POST")
+    def ignore(request):
+        return Response(HttpStatus.OK, {"ok": True})
+
+    connection = connect(serve(engine))
+    connection.send(b"POST /ignora HTTP/1.1\r\nHost: t\r\nContent-Length: 5\r\n\r\nhello" + get("/item/9"))
+    assert connection.read_response()[0] == 200
+    assert connection.read_response()[::2] == (200, b'{"id":9}')
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_connection_close_is_honoured(engine, serve, connect):
+    connection = connect(serve(engine))
+    connection.send(get("/item/1", b"Connection: close\r\n"))
+    status, headers, _ = connection.read_response()
+    assert (status, headers["Connection"]) == (200, "close")
+    assert connection.closed_by_server()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_http_1_0_closes_by_default(engine, serve, connect):
+    connection = connect(serve(engine))
+    connection.send(b"GET /item/1 HTTP/1.0\r\n\r\n")
+    assert connection.read_response()[0] == 200
+    assert connection.closed_by_server()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_max_requests_per_connection(engine, serve, connect):
+    connection = connect(serve(engine, handler_class=ShortLivedHandler))
+    connection.send(get("/item/1"))
+    assert connection.read_response()[1]["Connection"] == "keep-alive"
+    connection.send(get("/item/2"))
+    assert connection.read_response()[1]["Connection"] == "close"
+    assert connection.closed_by_server()
+
+
+def test_interim_response_is_not_counted(serve, connect):
+    connection = connect(serve("threading", handler_class=ShortLivedHandler))
+    connection.send(b"POST /item HTTP/1.1\r\nHost: t\r\nContent-Length: 2\r\nExpect: 100-continue\r\n\r\n")
+    status, headers, _ = connection.read_response()
+    assert status == 100 and "Connection" not in headers
+    connection.send(b"ok")
+    status, headers, _ = connection.read_response()
+    assert (status, headers["Connection"]) == (201, "keep-alive")
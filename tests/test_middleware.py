@@ -0,0 +1,209 @@
+import asyncio
+import http.client
+import io
+import time
+
+import pytest
+
+from arcforge.core.conn.async_server import AsyncRequestProxy
+from arcforge.core.conn.middleware import Pipeline
+from arcforge.core.conn.request import Request
+from arcforge.core.conn.response import Response, HttpStatus
+
+
+ENGINES = ("threading", "asyncio")
+
+
+@pytest.fixture(autouse=True)
+def pipeline():
+    """Cada teste registra os próprios middlewares e hooks sem afetar os globais."""
+    saved = Pipeline.middlewares, Pipeline.stage_hooks, Pipeline._has_async
+    Pipeline.middlewares, Pipeline.stage_hooks, Pipeline._has_async = [], [], False
+    yield Pipeline
+    Pipeline.middlewares, Pipeline.stage_hooks, Pipeline._has_async = saved
+
+
+def make_request(target: str = "/") -> Request:
+    headers = http.client.parse_headers(io.BytesIO(b"\r\n"))
+    return Request(AsyncRequestProxy("GET", target, "HTTP/1.1", headers, io.BytesIO()))
+
+
+def tracing(name, calls):
+    def middleware(request, call_next):
+        calls.append(f"{name}:antes")
+        response = call_next(request)
+        calls.append(f"{name}:depois")
+        return response
+    return middleware
+
+
+def endpoint(calls):
+    def run(request):
+        calls.append("rota")
+        return Response(HttpStatus.OK, {"ok": True})
+    return run
+
+
+# -----------------------------------------------------------------------------
+# Cadeia
+# -----------------------------------------------------------------------------
+
+def test_middlewares_run_in_registration_order(pipeline):
+    calls = []
+    pipeline.use(tracing("a", calls))
+    pipeline.use(tracing("b", calls))
+    pipeline.run(make_request(), endpoint(calls))
+    assert calls == ["a:antes", "b:antes", "rota", "b:depois", "a:depois"]
+    assert not pipeline.has_async()
+
+
+def test_middleware_short_circuits_the_chain(pipeline):
+    calls = []
+    pipeline.use(tracing("a", calls))
+
+    @pipeline.use
+    def bloqueio(request, call_next):
+        return Response(HttpStatus.UNAUTHORIZED, {"error": "Não autorizado"})
+
+    pipeline.use(tracing("c", calls))
+    response = pipeline.run(make_request(), endpoint(calls))
+    assert response.status == 401
+    assert calls == ["a:antes", "a:depois"]
+
+
+def test_middleware_can_replace_the_request(pipeline):
+    @pipeline.use
+    def reescrita(request, call_next):
+        return call_next(make_request("/reescrita"))
+
+    assert pipeline.run(make_request("/original"), lambda request: request.path) == "/reescrita"
+
+
+def test_run_async_mixes_sync_and_async_middlewares(pipeline):
+    calls = []
+    pipeline.use(tracing("sync", calls))
+
+    @pipeline.use
+    async def assincrono(request, call_next):
+        calls.append("async:antes")
+        response = await call_next(request)
+        response.headers["X-Async"] = "1"
+        return response
+
+    assert pipeline.has_async()
+
+    async def run_endpoint(request):
+        return endpoint(calls)(request)
+
+    response = asyncio.run(pipeline.run_async(make_request(), run_endpoint))
+    assert response.headers["X-Async"] == "1"
+    assert calls == ["sync:antes", "async:antes", "rota", "sync:depois"]
+
+
+def test_callable_object_with_async_call_is_async(pipeline):
+    class Middleware:
+        async def __call__(self, request, call_next):
+            return await call_next(request)
+
+    pipeline.use(Middleware())
+    assert pipeline.has_async()
+    pipeline.clear()
+    assert not pipeline.has_async()
+
+
+# -----------------------------------------------------------------------------
+# Instrumentação
+# -----------------------------------------------------------------------------
+
+def test_record_stores_timing_and_calls_hooks(pipeline):
+    events = []
+    pipeline.add_stage_hook(lambda stage, duration, request: events.append((stage, duration)))
+
+    @pipeline.add_stage_hook
+    def quebrado(stage, duration, request):
+        raise RuntimeError("hook com erro")
+
+    request = make_request()
+    started = time.perf_counter() - 0.01
+    pipeline.record("parse", started, request)
+    pipeline.record("serialize", time.perf_counter(), request, elapsed=0.5)
+
+    assert request.started == started
+    assert request.timings["parse"] >= 0.01
+    assert request.timings["serialize"] >= 0.5
+    assert [stage for stage, _ in events] == ["parse", "serialize"]
+
+
+# -----------------------------------------------------------------------------
+# Pela rede
+# -----------------------------------------------------------------------------
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_short_circuit_over_the_wire(engine, asynchronous, pipeline, isolated_router, serve, connect):
+    executed = []
+
+    @isolated_router.route("/privado", "GET")
+    def privado(request):
+        executed.append(1)
+        return Response(HttpStatus.OK, {"segredo": 42})
+
+    if asynchronous:
+        @pipeline.use
+        async def autenticacao(request, call_next):
+            if "Authorization" not in request.headers:
+                return Response(HttpStatus.UNAUTHORIZED, {"error": "Não autorizado"})
+            response = await call_next(request)
+            response.headers["X-Autenticado"] = "sim"
+            return response
+    else:
+        @pipeline.use
+        def autenticacao(request, call_next):
+            if "Authorization" not in request.headers:
+                return Response(HttpStatus.UNAUTHORIZED, {"error": "Não autorizado"})
+            response = call_next(request)
+            response.headers["X-Autenticado"] = "sim"
+            return response
+
+    connection = connect(serve(engine))
+    connection.send(b"GET /privado HTTP/1.1\r\nHost: t\r\n\r\n")
+    status, _, body = connection.read_response()
+    assert status == 401
+    assert executed == []
+
+    connection.send(b"GET /privado HTTP/1.1\r\nHost: t\r\nAuthorization: Bearer x\r\n\r\n")
+    status, headers, body = connection.read_response()
+    assert (status, body) == (200, b'{"segredo":42}')
+    assert headers["X-Autenticado"] == "sim"
+    assert executed == [1]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stage_hooks_over_the_wire(engine, pipeline, isolated_router, serve, connect):
+    stages = {}
+    pipeline.add_stage_hook(lambda stage, duration, request: stages.setdefault(request.path, []).append(stage))
+
+    @isolated_router.route("/anonimo", "GET")
+    def anonimo(request):
+        return Response(HttpStatus.OK, {"ok": True})
+
+    @isolated_router.route("/com-sessao", "GET")
+    def com_sessao(request):
+        return Response(HttpStatus.OK, {"visitas": request.session.get("visitas", 0)})
+
+    connection = connect(serve(engine))
+    for path in (b"/anonimo", b"/com-sessao"):
+        connection.send(b"GET %s HTTP/1.1\r\nHost: t\r\n\r\n" % path)
+        assert connection.read_response()[0] == 200
+
+    expected = ["parse", "route_match", "handler", "serialize", "write"]
+    assert wait_for(lambda: len(stages.get("/com-sessao", [])) == len(expected) + 1)
+    assert stages["/anonimo"] == expected
+    assert sorted(stages["/com-sessao"]) == sorted(expected + ["session"])
@@ -0,0 +1,136 @@
+import pytest
+
+from arcforge.core.conn.multipart import MultipartParser, MultipartError, UploadedFile
+from arcforge.core.conn.response import Response, HttpStatus
+
+
+BOUNDARY = "----arcforge7b1c"
+
+
+def form(*parts: bytes) -> bytes:
+    body = b"".join(b"--" + BOUNDARY.encode() + b"\r\n" + part + b"\r\n" for part in parts)
+    return body + b"--" + BOUNDARY.encode() + b"--\r\n"
+
+
+def field(name: str, value: bytes) -> bytes:
+    return b'Content-Disposition: form-data; name="%s"\r\n\r\n%s' % (name.encode(), value)
+
+
+def upload(name: str, filename: str, content: bytes, content_type=b"text/plain") -> bytes:
+    return (b'Content-Disposition: form-data; name="%s"; filename="%s"\r\nContent-Type: %s\r\n\r\n%s'
+            % (name.encode(), filename.encode(), content_type, content))
+
+
+def split(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def parse(body: bytes, chunk_size: int = None, **options):
+    chunks = split(body, chunk_size) if chunk_size else [body]
+    return MultipartParser(BOUNDARY, **options).parse(chunks)
+
+
+def test_boundary_from_content_type():
+    assert MultipartParser.boundary_from(f'multipart/form-data; boundary="{BOUNDARY}"') == BOUNDARY
+    assert MultipartParser.boundary_from(f"multipart/form-data; boundary={BOUNDARY}") == BOUNDARY
+    assert MultipartParser.boundary_from("multipart/form-data") == ""
+
+
+def test_missing_boundary():
+    with pytest.raises(MultipartError):
+        MultipartParser("")
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 2, 7, 13, 64])
+def test_fields_and_files_in_any_block_size(chunk_size):
+    content = b"linha 1\r\n--quase delimitador\r\n" + bytes(range(256))
+    body = form(field("nome", "Ana".encode()), field("vazio", b""), upload("doc", "a.bin", content))
+    fields, files = parse(body, chunk_size)
+
+    assert fields == {"nome": "Ana", "vazio": ""}
+    assert isinstance(files["doc"], UploadedFile)
+    assert files["doc"].filename == "a.bin"
+    assert files["doc"].content_type == "text/plain"
+    assert files["doc"].size == len(content)
+    assert files["doc"].read() == content
+
+
+def test_preamble_is_ignored():
+    fields, _ = parse(b"preambulo qualquer\r\n" + form(field("a", b"1")))
+    assert fields == {"a": "1"}
+
+
+def test_large_file_is_spooled_to_disk():
+    content = b"x" * 5000
+    _, files = parse(form(upload("doc", "grande.txt", content)), 512, memory_threshold=1024)
+    assert files["doc"].file._rolled
+    assert files["doc"].read() == content
+
+
+def test_unterminated_body():
+    body = form(field("a", b"1"))[:-len(BOUNDARY) - 6]
+    with pytest.raises(MultipartError):
+        parse(body)
+
+
+def test_missing_initial_delimiter():
+    with pytest.raises(MultipartError):
+        parse(b"nada aqui")
+
+
+def test_part_without_name():
+    with pytest.raises(MultipartError):
+        parse(form(b"Content-Disposition: form-data\r\n\r\nvalor"))
+
+
+def test_malformed_delimiter():
+    with pytest.raises(MultipartError):
+        parse(b"--" + BOUNDARY.encode() + b"xx\r\n")
+
+
+def test_text_field_is_capped(monkeypatch):
+    monkeypatch.setattr(MultipartParser, "max_field_size", 100)
+    assert parse(form(field("a", b"x" * 100)), 7)[0] == {"a": "x" * 100}
+    with pytest.raises(MultipartError):
+        parse(form(field("a", b"x" * 101)), 7)
+
+
+def test_file_is_not_capped_by_field_size(monkeypatch):
+    monkeypatch.setattr(MultipartParser, "max_field_size", 100)
+    _, files = parse(form(upload("doc", "a.txt", b"x" * 1000)), 64)
+    assert files["doc"].size == 1000
+
+
+@pytest.mark.parametrize("engine", ("threading", "asyncio"))
+def test_oversized_field_gets_400(engine, serve, connect, isolated_router, monkeypatch):
+    monkeypatch.setattr(MultipartParser, "max_field_size", 100)
+
+    @isolated_router.route("/form", "POST")
+    def submit(request):
+        return Response(HttpStatus.OK, {"campos": sorted(request.form)})
+
+    connection = connect(serve(engine))
+    for value, status in ((b"x" * 10, 200), (b"x" * 500, 400)):
+        body = form(field("a", value))
+        connection.send(
+            b"POST /form HTTP/1.1\r\nHost: t\r\nContent-Type: multipart/form-data; boundary=" + BOUNDARY.encode()
+            + b"\r\nContent-Length: %d\r\n\r\n" % len(body) + body
+        )
+        assert connection.read_response()[0] == status
+
+
+@pytest.mark.parametrize("engine", ("threading", "asyncio"))
+def test_connection_is_reused_after_multipart_body(engine, serve, connect, isolated_router):
+    @isolated_router.route("/form", "POST")
+    def submit(request):
+        return Response(HttpStatus.OK, {"arquivos": sorted(request.files)})
+
+    connection = connect(serve(engine))
+    body = form(field("a", b"1"), upload("doc", "a.txt", b"conteudo")) + b"epilogo ignorado"
+    for _ in range(2):
+        connection.send(
+            b"POST /form HTTP/1.1\r\nHost: t\r\nContent-Type: multipart/form-data; boundary=" + BOUNDARY.encode()
+            + b"\r\nContent-Length: %d\r\n\r\n" % len(body) + body
+        )
+        status, headers, payload = connection.read_response()
+        assert (status, headers["Connection"], payload) == (200, "keep-alive", b'{"arquivos":["doc"]}')
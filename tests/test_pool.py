@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from arcforge.core.conn.handler import RequestHandler
+from arcforge.core.conn.pool import PooledHTTPServer
+from arcforge.core.conn.response import Response, HttpStatus
+
+
+pytestmark = pytest.mark.usefixtures("isolated_router")
+
+
+@pytest.fixture(autouse=True)
+def routes(isolated_router):
+    @isolated_router.route("/ping", "GET")
+    def ping(request):
+        return Response(HttpStatus.OK, {"ok": True})
+
+
+class QuickIdleHandler(RequestHandler):
+    keep_alive_timeout = 0.3
+
+
+GET = b"GET /ping HTTP/1.1\r\nHost: t\r\n\r\n"
+
+
+def pooled(serve, **options):
+    options.setdefault("pool_size", 2)
+    options.setdefault("queue_size", 4)
+    return serve("threading", server_class=PooledHTTPServer, **options)
+
+
+def test_idle_keep_alive_connections_do_not_hold_threads(serve, connect):
+    port = pooled(serve)
+    idle = [connect(port) for _ in range(2)]
+    for connection in idle:
+        connection.send(GET)
+        assert connection.read_response()[0] == 200
+
+    # As duas threads do pool ficariam presas às conexões ociosas até o keep-alive expirar
+    started = time.monotonic()
+    connection = connect(port)
+    connection.send(GET)
+    assert connection.read_response()[0] == 200
+    assert time.monotonic() - started < 1.0
+
+    # As conexões ociosas continuam utilizáveis, com a contagem de requisições preservada
+    for connection in idle:
+        connection.send(GET)
+        status, headers, _ = connection.read_response()
+        assert status == 200
+        assert headers["Keep-Alive"].endswith(f"max={RequestHandler.max_keep_alive_requests - 2}")
+
+
+def test_connection_that_sends_nothing_does_not_hold_a_thread(serve, connect):
+    port = pooled(serve, pool_size=1)
+    silent = connect(port)
+    connection = connect(port)
+    connection.send(GET)
+    assert connection.read_response()[0] == 200
+    silent.send(GET)
+    assert silent.read_response()[0] == 200
+
+
+def test_idle_connection_is_closed_after_keep_alive_timeout(serve, connect):
+    port = pooled(serve, handler_class=QuickIdleHandler)
+    connection = connect(port)
+    connection.send(GET)
+    assert connection.read_response()[0] == 200
+    started = time.monotonic()
+    assert connection.closed_by_server()
+    assert 0.2 < time.monotonic() - started < 2.0
+
+
+def test_pipelined_requests_are_not_parked(serve, connect):
+    connection = connect(pooled(serve))
+    connection.send(GET * 3)
+    assert [connection.read_response()[0] for _ in range(3)] == [200, 200, 200]
+
+
+def test_client_closing_idle_connection_releases_it(serve, connect):
+    port = pooled(serve, pool_size=1)
+    for _ in range(5):
+        connection = connect(port)
+        connection.send(GET)
+        assert connection.read_response()[0] == 200
+        connection.close()
+    connection = connect(port)
+    connection.send(GET)
+    assert connection.read_response()[0] == 200
@@ -0,0 +1,53 @@
+import os
+import signal
+import threading
+
+import pytest
+
+from arcforge.core.conn.prefork import PreforkServer
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork requer os.fork")
+
+
+@pytest.fixture
+def prefork():
+    server = PreforkServer(lambda sock: None, ("127.0.0.1", 0), workers=1)
+    yield server
+    server.server_close()
+
+
+def test_sigterm_while_main_thread_holds_the_lock(prefork):
+    # O sinal pode chegar com a thread principal dentro de "with self._lock"
+    finished = threading.Event()
+
+    def run():
+        with prefork._lock:
+            prefork._handle_sigterm(signal.SIGTERM, None)
+        finished.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert finished.wait(timeout=2), "o handler de SIGTERM travou no lock"
+    assert prefork._stopping
+
+
+def test_sigterm_stops_workers_and_master():
+    from http.server import HTTPServer
+    from arcforge.core.conn.handler import RequestHandler
+
+    def factory(sock):
+        httpd = HTTPServer(sock.getsockname(), RequestHandler, bind_and_activate=False)
+        httpd.socket.close()
+        httpd.socket = sock
+        return httpd
+
+    server = PreforkServer(factory, ("127.0.0.1", 0), workers=2)
+    timer = threading.Timer(0.5, os.kill, (os.getpid(), signal.SIGTERM))
+    timer.start()
+    try:
+        server.serve_forever()  # retorna quando os workers encerram
+    finally:
+        timer.cancel()
+        server.server_close()
+    assert server._stopping
+    assert not server._children
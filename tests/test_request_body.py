@@ -0,0 +1,219 @@
+import asyncio
+import http.client
+import io
+import threading
+import time
+
+import pytest
+
+from arcforge.core.conn.async_server import AsyncHTTPServer, AsyncRequestProxy
+from arcforge.core.conn.handler import RequestHandler
+from arcforge.core.conn.request import Request, PayloadTooLarge, BadRequest
+from arcforge.core.conn.response import Response, HttpStatus
+
+
+ENGINES = ("threading", "asyncio")
+
+
+def chunked(*pieces: bytes) -> bytes:
+    return b"".join(b"%x\r\n%s\r\n" % (len(piece), piece) for piece in pieces) + b"0\r\n\r\n"
+
+
+def make_request(raw_headers: bytes, body: bytes) -> Request:
+    headers = http.client.parse_headers(io.BytesIO(raw_headers + b"\r\n"))
+    return Request(AsyncRequestProxy("POST", "/", "HTTP/1.1", headers, io.BytesIO(body)))
+
+
+# -----------------------------------------------------------------------------
+# Leitura do corpo pela Request
+# -----------------------------------------------------------------------------
+
+def test_reads_chunked_body_and_leaves_next_request():
+    rest = b"GET /proxima HTTP/1.1\r\n\r\n"
+    request = make_request(b"Transfer-Encoding: chunked\r\n", chunked(b"abc", b"defgh") + rest)
+    assert request.raw_body == b"abcdefgh"
+    assert request._rfile.read() == rest
+
+
+def test_skips_trailers():
+    rest = b"GET / HTTP/1.1\r\n\r\n"
+    request = make_request(b"Transfer-Encoding: chunked\r\n", b"3\r\nabc\r\n0\r\nX-Soma: 3\r\n\r\n" + rest)
+    assert request.raw_body == b"abc"
+    assert request._rfile.read() == rest
+
+
+def test_reads_only_content_length():
+    request = make_request(b"Content-Length: 3\r\n", b"abcGET")
+    assert request.raw_body == b"abc"
+    assert request._rfile.read() == b"GET"
+
+
+def test_streams_in_blocks():
+    request = make_request(b"Content-Length: 10\r\n", b"0123456789")
+    assert list(request.stream(chunk_size=4)) == [b"0123", b"4567", b"89"]
+
+
+def test_body_is_consumed_once():
+    request = make_request(b"Content-Length: 3\r\n", b"abc")
+    list(request.stream())
+    with pytest.raises(RuntimeError):
+        list(request.stream())
+
+
+def test_body_limit(monkeypatch):
+    monkeypatch.setattr(Request, "max_body_size", 4)
+    request = make_request(b"Transfer-Encoding: chunked\r\n", chunked(b"abc", b"de"))
+    with pytest.raises(PayloadTooLarge):
+        request.raw_body
+
+
+def test_finish_discards_unread_body():
+    request = make_request(b"Content-Length: 3\r\n", b"abcGET")
+    assert request.finish()
+    assert request._rfile.read() == b"GET"
+
+
+def test_finish_refuses_to_drain_unread_chunked_body():
+    request = make_request(b"Transfer-Encoding: chunked\r\n", chunked(b"abc"))
+    assert not request.finish()
+
+
+def test_invalid_chunk_size():
+    request = make_request(b"Transfer-Encoding: chunked\r\n", b"zz\r\nabc\r\n0\r\n\r\n")
+    with pytest.raises(BadRequest):
+        request.raw_body
+
+
+@pytest.mark.parametrize("value", [b"abc", b"-1", b"1.5"])
+def test_invalid_content_length(value):
+    request = make_request(b"Content-Length: " + value + b"\r\n", b"")
+    with pytest.raises(BadRequest):
+        request.content_length
+    with pytest.raises(BadRequest):
+        request.exceeds_max_body_size()
+
+
+# -----------------------------------------------------------------------------
+# Motores
+# -----------------------------------------------------------------------------
+
+@pytest.fixture
+def echo(isolated_router):
+    @isolated_router.route("/eco", "POST")
+    def eco(request):
+        return Response(HttpStatus.OK, {"tamanho": len(request.raw_body)})
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("expect", [b"", b"Expect: 100-continue\r\n"])
+def test_invalid_content_length_gets_400(engine, expect, serve, connect, echo):
+    connection = connect(serve(engine))
+    connection.send(b"POST /eco HTTP/1.1\r\nHost: t\r\nContent-Length: abc\r\n" + expect + b"\r\n")
+    status, headers, _ = connection.read_response()
+    assert status == 400
+    assert headers["Connection"] == "close"
+    assert connection.closed_by_server()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_declared_body_over_limit_gets_413(engine, serve, connect, echo, monkeypatch):
+    monkeypatch.setattr(Request, "max_body_size", 10)
+    connection = connect(serve(engine))
+    connection.send(b"POST /eco HTTP/1.1\r\nHost: t\r\nContent-Length: 11\r\n\r\nhello world")
+    assert connection.read_response()[0] == 413
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_chunked_body_over_limit_gets_413(engine, serve, connect, echo, monkeypatch):
+    monkeypatch.setattr(Request, "max_body_size", 10)
+    connection = connect(serve(engine))
+    connection.send(b"POST /eco HTTP/1.1\r\nHost: t\r\nTransfer-Encoding: chunked\r\n\r\n" + chunked(b"hello", b" world"))
+    assert connection.read_response()[0] == 413
+
+
+class QuickTimeoutHandler(RequestHandler):
+    timeout = 0.3
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_handler_starts_before_the_body_arrives(engine, serve, connect, isolated_router):
+    entered = threading.Event()
+
+    @isolated_router.route("/upload", "POST")
+    def upload(request):
+        entered.set()
+        return Response(HttpStatus.OK, {"tamanho": sum(len(chunk) for chunk in request.stream())})
+
+    connection = connect(serve(engine))
+    connection.send(b"POST /upload HTTP/1.1\r\nHost: t\r\nContent-Length: 10\r\n\r\n01234")
+    # Com o corpo lido antes do despacho, o handler só começaria após os 10 bytes
+    assert entered.wait(timeout=2)
+    connection.send(b"56789")
+    assert connection.read_response()[::2] == (200, b'{"tamanho":10}')
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_chunked_body_is_streamed(engine, serve, connect, isolated_router):
+    @isolated_router.route("/upload", "POST")
+    def upload(request):
+        return Response(HttpStatus.OK, {"corpo": b"".join(request.stream(chunk_size=3)).decode()})
+
+    connection = connect(serve(engine))
+    for _ in range(2):
+        connection.send(b"POST /upload HTTP/1.1\r\nHost: t\r\nTransfer-Encoding: chunked\r\n\r\n" + chunked(b"abc", b"defg"))
+        assert connection.read_response()[::2] == (200, b'{"corpo":"abcdefg"}')
+
+
+def test_coroutine_handler_reads_spooled_body(serve, connect, isolated_router, monkeypatch):
+    monkeypatch.setattr(AsyncHTTPServer, "body_memory_threshold", 1024)
+    seen = {}
+
+    @isolated_router.route("/upload", "POST")
+    async def upload(request):
+        await asyncio.sleep(0)
+        seen["em_disco"] = request._rfile._rolled
+        return Response(HttpStatus.OK, {"tamanho": len(request.raw_body)})
+
+    connection = connect(serve("asyncio"))
+    body = b"x" * 100_000
+    connection.send(b"POST /upload HTTP/1.1\r\nHost: t\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+    assert connection.read_response()[::2] == (200, b'{"tamanho":100000}')
+    assert seen["em_disco"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stalled_body_closes_the_connection(engine, serve, connect, isolated_router):
+    @isolated_router.route("/upload", "POST")
+    def upload(request):
+        return Response(HttpStatus.OK, {"tamanho": len(request.raw_body)})
+
+    connection = connect(serve(engine, handler_class=QuickTimeoutHandler))
+    connection.send(b"POST /upload HTTP/1.1\r\nHost: t\r\nContent-Length: 10\r\n\r\n01234")
+    status, _, _ = connection.read_response()
+    assert status in (None, 408, 500)
+    assert connection.closed_by_server()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_slow_but_steady_body_is_accepted(engine, serve, connect, isolated_router):
+    @isolated_router.route("/upload", "POST")
+    def upload(request):
+        return Response(HttpStatus.OK, {"tamanho": len(request.raw_body)})
+
+    connection = connect(serve(engine, handler_class=QuickTimeoutHandler))
+    connection.send(b"POST /upload HTTP/1.1\r\nHost: t\r\nContent-Length: 6\r\n\r\n")
+    for byte in b"abcdef":
+        time.sleep(0.1)
+        connection.send(bytes([byte]))
+    assert connection.read_response()[::2] == (200, b'{"tamanho":6}')
+
+
+def test_stalled_body_gets_408_on_asyncio(serve, connect, isolated_router):
+    @isolated_router.route("/upload", "POST")
+    def upload(request):
+        return Response(HttpStatus.OK, {"tamanho": len(request.raw_body)})
+
+    connection = connect(serve("asyncio", handler_class=QuickTimeoutHandler))
+    connection.send(b"POST /upload HTTP/1.1\r\nHost: t\r\nContent-Length: 10\r\n\r\n01234")
+    status, headers, _ = connection.read_response()
+    assert (status, headers["Connection"]) == (408, "close")
@@ -0,0 +1,191 @@
+import itertools
+import random
+import uuid
+
+import pytest
+
+from arcforge.core.conn.router import Router
+
+
+# -----------------------------------------------------------------------------
+# A tabela compilada (hash + trie) deve se comportar exatamente como a busca
+# linear original: vence a primeira rota registrada cujo padrão atende o
+# caminho, cujos parâmetros tipados convertem e que possui o método pedido.
+# -----------------------------------------------------------------------------
+
+
+pytestmark = pytest.mark.usefixtures("isolated_router")
+
+
+def handler(name):
+    def func(request, **params):
+        return name
+    func.__name__ = name
+    return func
+
+
+def linear_match(path, method):
+    """Referência: a busca linear sobre Router.routes, como antes da trie."""
+    for route in Router.routes:
+        match = route["pattern"].match(path)
+        if not match or method not in route["methods"]:
+            continue
+        params = Router._convert(route["converters"], match.groupdict())
+        if params is None:
+            continue
+        return True, route["methods"][method], params
+    return False, None, {}
+
+
+ROUTES = [
+    ("/", "GET"),
+    ("/usuarios", "GET"),
+    ("/usuarios", "POST"),
+    ("/usuarios/novo", "GET"),
+    ("/usuarios/{id:int}", "GET"),
+    ("/usuarios/{id:int}", "DELETE"),
+    ("/usuarios/{nome}", "GET"),
+    ("/usuarios/{id:int}/pedidos", "GET"),
+    ("/usuarios/{nome}/pedidos/{pedido:int}", "GET"),
+    ("/pedidos/{uid:uuid}", "GET"),
+    ("/precos/{valor:float}", "GET"),
+    ("/arquivos/{nome}.{ext}", "GET"),
+    ("/arquivos/leia-me.txt", "POST"),
+    ("/static/{path:path}", "GET"),
+    ("/static/favicon.ico", "GET"),
+    ("/{secao}/resumo", "GET"),
+    ("/v{versao:int}/status", "GET"),
+]
+
+SEGMENTS = [
+    "", "usuarios", "novo", "42", "007", "-1", "ana", "pedidos", "3", "x",
+    str(uuid.UUID(int=7)), "precos", "1.5", "1.", "arquivos",
+    "leia-me.txt", "foto.tar.gz", "static", "css", "app.css", "favicon.ico",
+    "resumo", "v2", "vx", "status", "..",
+]
+
+
+def register(routes):
+    for path, method in routes:
+        Router.route(path, method)(handler(f"{method} {path}"))
+
+
+def assert_same(path, method):
+    assert Router.match(path, method) == linear_match(path, method), (path, method)
+
+
+def test_matches_linear_scan_on_generated_paths():
+    register(ROUTES)
+    for depth in (1, 2):
+        for segments in itertools.product(SEGMENTS, repeat=depth):
+            path = "/" + "/".join(segments)
+            for method in ("GET", "POST", "DELETE", "PUT"):
+                assert_same(path, method)
+
+    rng = random.Random(5)
+    for _ in range(5000):
+        path = "/" + "/".join(rng.choice(SEGMENTS) for _ in range(rng.randint(1, 5)))
+        assert_same(path, rng.choice(("GET", "POST", "DELETE")))
+
+
+def test_matches_linear_scan_for_any_registration_order():
+    rng = random.Random(11)
+    paths = ["/usuarios/42", "/usuarios/novo", "/usuarios/ana", "/usuarios/42/pedidos",
+             "/usuarios/ana/pedidos/3", "/static/favicon.ico", "/static/css/app.css",
+             "/arquivos/leia-me.txt", "/usuarios/resumo", "/v2/status", "/vx/status"]
+    for _ in range(50):
+        routes = ROUTES[:]
+        rng.shuffle(routes)
+        Router.routes, Router._compiled = [], None
+        register(routes)
+        for path in paths:
+            for method in ("GET", "POST", "DELETE"):
+                assert_same(path, method)
+
+
+def test_first_registered_route_wins():
+    register([("/usuarios/{nome}", "GET"), ("/usuarios/novo", "GET")])
+    found, func, params = Router.match("/usuarios/novo", "GET")
+    assert found and func.__name__ == "GET /usuarios/{nome}"
+    assert params == {"nome": "novo"}
+
+
+def test_method_falls_through_to_later_route():
+    register([("/usuarios/{id:int}", "DELETE"), ("/usuarios/{nome}", "GET")])
+    found, func, params = Router.match("/usuarios/42", "GET")
+    assert found and func.__name__ == "GET /usuarios/{nome}"
+    assert params == {"nome": "42"}
+
+
+def test_resolve_returns_registered_route():
+    register([("/usuarios/{id:int}", "GET")])
+    func, params, route = Router.resolve("/usuarios/7", "GET")
+    assert (params, route) == ({"id": 7}, "/usuarios/{id:int}")
+
+
+def test_static_params_are_not_shared_between_requests():
+    register([("/{secao}", "GET")])
+    Router.route("/sobre", "POST")(handler("POST /sobre"))
+    _, _, params = Router.match("/sobre", "GET")
+    params["secao"] = "alterado"
+    assert Router.match("/sobre", "GET")[2] == {"secao": "sobre"}
+
+
+def test_routes_registered_after_compile_are_visible():
+    register([("/a", "GET")])
+    Router.compile()
+    register([("/b/{id:int}", "GET")])
+    assert Router.match("/b/1", "GET")[2] == {"id": 1}
+
+
+def test_typed_parameters_are_converted():
+    register([("/usuarios/{id:int}", "GET"), ("/pedidos/{uid:uuid}", "GET"),
+              ("/precos/{valor:float}", "GET"), ("/static/{path:path}", "GET")])
+    uid = uuid.uuid4()
+    assert Router.match("/usuarios/42", "GET")[2] == {"id": 42}
+    assert Router.match(f"/pedidos/{uid}", "GET")[2] == {"uid": uid}
+    assert Router.match("/precos/1.5", "GET")[2] == {"valor": 1.5}
+    assert Router.match("/static/css/app.css", "GET")[2] == {"path": "css/app.css"}
+
+
+def test_invalid_typed_value_does_not_match():
+    register([("/usuarios/{id:int}", "GET"), ("/pedidos/{uid:uuid}", "GET")])
+    assert Router.match("/usuarios/abc", "GET") == (False, None, {})
+    assert Router.match("/usuarios/-1", "GET") == (False, None, {})
+    assert Router.match("/pedidos/nao-e-uuid", "GET") == (False, None, {})
+    assert Router.match("/usuarios/", "GET") == (False, None, {})
+
+
+def test_custom_converter_rejecting_value_does_not_match():
+    converters = dict(Router.converters)
+    try:
+        def par(value):
+            number = int(value)
+            if number % 2:
+                raise ValueError(value)
+            return number
+
+        Router.register_converter("par", r"[0-9]+", par)
+        register([("/numeros/{n:par}", "GET"), ("/numeros/{n}", "GET")])
+        assert Router.match("/numeros/4", "GET")[2] == {"n": 4}
+        assert Router.match("/numeros/3", "GET")[2] == {"n": "3"}
+        assert_same("/numeros/3", "GET")
+    finally:
+        Router.converters = converters
+
+
+def test_path_parameter_only_in_last_segment():
+    with pytest.raises(ValueError):
+        Router.route("/static/{path:path}/fim", "GET")(handler("x"))
+
+
+def test_unknown_converter_is_rejected():
+    with pytest.raises(ValueError):
+        Router.route("/usuarios/{id:inteiro}", "GET")(handler("x"))
+
+
+def test_mixed_segment_with_typed_parameters():
+    register([("/arquivos/{nome}.v{versao:int}", "GET")])
+    assert Router.match("/arquivos/relatorio.v3", "GET")[2] == {"nome": "relatorio", "versao": 3}
+    assert Router.match("/arquivos/relatorio.vx", "GET") == (False, None, {})
+    assert_same("/arquivos/relatorio.v3", "GET")
@@ -0,0 +1,84 @@
+import datetime
+import decimal
+import enum
+import json
+import uuid
+
+import pytest
+
+from arcforge.core.conn import response as response_module
+from arcforge.core.conn.response import JsonSerializer, Response, HttpStatus
+from arcforge.core.model.model import ModelDTO
+
+
+class Cor(enum.Enum):
+    AZUL = "azul"
+
+
+class ClienteDTO(ModelDTO):
+    def __init__(self, nome):
+        self.nome = nome
+
+    def to_dict(self) -> dict:
+        return {"nome": self.nome}
+
+
+class Ponto:
+    def __init__(self):
+        self.x, self.y = 1, 2
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    """Executa o teste com orjson (se instalado) e com o módulo json da biblioteca padrão."""
+    if request.param == "orjson":
+        if response_module.orjson is None:
+            pytest.skip("orjson não instalado")
+    else:
+        monkeypatch.setattr(response_module, "orjson", None)
+    return request.param
+
+
+@pytest.mark.parametrize("value, expected", [
+    ({"a": 1, "b": [1, 2]}, b'{"a":1,"b":[1,2]}'),
+    ({"nome": "João"}, '{"nome":"João"}'.encode("utf-8")),
+    ({1: "um"}, b'{"1":"um"}'),
+    (datetime.datetime(2024, 1, 2, 3, 4, 5), b'"2024-01-02T03:04:05"'),
+    (datetime.datetime(2024, 1, 2, 3, 4, 5, 600, tzinfo=datetime.timezone.utc), b'"2024-01-02T03:04:05.000600+00:00"'),
+    (datetime.date(2024, 1, 2), b'"2024-01-02"'),
+    (datetime.time(3, 4, 5), b'"03:04:05"'),
+    (decimal.Decimal("10.50"), b'"10.50"'),
+    (uuid.UUID(int=1), b'"00000000-0000-0000-0000-000000000001"'),
+    ((1, 2), b"[1,2]"),
+    (frozenset([3]), b"[3]"),
+    (Cor.AZUL, b'"azul"'),
+    (ClienteDTO("Ana"), b'{"nome":"Ana"}'),
+    (Ponto(), b'{"x":1,"y":2}'),
+    (2 ** 70, b"1180591620717411303424"),
+    (None, b"null"),
+])
+def test_serialize_bytes(backend, value, expected):
+    assert JsonSerializer.serialize_bytes(value) == expected
+
+
+def test_unknown_type_raises(backend):
+    with pytest.raises(TypeError):
+        JsonSerializer.serialize_bytes({"x": object()})
+
+
+def test_indent_uses_json_module(monkeypatch):
+    monkeypatch.setattr(JsonSerializer, "indent", 2)
+    data = {"a": [1]}
+    assert JsonSerializer.serialize_bytes(data) == json.dumps(data, indent=2).encode("utf-8")
+
+
+def test_serialize_returns_text(backend):
+    assert JsonSerializer.serialize({"nome": "João"}) == '{"nome":"João"}'
+
+
+def test_response_encodes_payload_once(backend):
+    response = Response(HttpStatus.OK, {"nome": "João", "quando": datetime.date(2024, 1, 2)})
+    assert response.payload == '{"nome":"João","quando":"2024-01-02"}'.encode("utf-8")
+    assert response.headers["Content-Length"] == str(len(response.payload))
+    assert response.headers["Content-Type"] == "application/json; charset=utf-8"
+    assert response.body == response.payload.decode("utf-8")
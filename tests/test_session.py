@@ -0,0 +1,501 @@
+import http.client
+import io
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from arcforge.core.conn.async_server import AsyncRequestProxy
+from arcforge.core.conn.request import Request
+from arcforge.core.conn.response import Response, HttpStatus
+from arcforge.core.conn.session import (
+    MemorySessionStore, Session, SignedCookieSessionStore, SessionTooLarge, SQLiteSessionStore,
+)
+
+
+ENGINES = ("threading", "asyncio")
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Store vazio usado por Session durante o teste."""
+    store = MemorySessionStore(sweep_interval=0)
+    monkeypatch.setattr(Session, "store", store)
+    return store
+
+
+def make_request(cookie: str = None) -> Request:
+    raw_headers = b"Cookie: %s\r\n" % cookie.encode() if cookie else b""
+    headers = http.client.parse_headers(io.BytesIO(raw_headers + b"\r\n"))
+    return Request(AsyncRequestProxy("GET", "/", "HTTP/1.1", headers, io.BytesIO()))
+
+
+# -----------------------------------------------------------------------------
+# MemorySessionStore
+# -----------------------------------------------------------------------------
+
+def test_save_and_load():
+    store = MemorySessionStore(sweep_interval=0)
+    token = store.new_token()
+    assert store.save(token, {"usuario": 7}) == token
+    assert store.load(token) == {"usuario": 7}
+    assert store.load("desconhecido") is None
+    store.delete(token)
+    assert store.load(token) is None
+    assert len(store) == 0
+
+
+def test_tokens_are_unique_and_unguessable():
+    store = MemorySessionStore(sweep_interval=0)
+    tokens = {store.new_token() for _ in range(1000)}
+    assert len(tokens) == 1000
+    assert all(len(token) >= 40 for token in tokens)
+
+
+def test_idle_sessions_expire_and_access_renews_them():
+    store = MemorySessionStore(ttl=0.2, sweep_interval=0)
+    store.save("ativa", {"a": 1})
+    store.save("ociosa", {"b": 2})
+    for _ in range(3):
+        time.sleep(0.1)
+        assert store.load("ativa") == {"a": 1}
+    assert store.load("ociosa") is None
+    assert len(store) == 1
+
+
+def test_least_recently_used_session_is_evicted():
+    store = MemorySessionStore(max_entries=2, shards=1, sweep_interval=0)
+    store.save("a", {})
+    store.save("b", {})
+    store.load("a")
+    store.save("c", {})
+    assert store.load("b") is None
+    assert store.load("a") == {} and store.load("c") == {}
+
+
+def test_limit_is_split_between_shards():
+    store = MemorySessionStore(max_entries=64, shards=4, sweep_interval=0)
+    for index in range(1000):
+        store.save(f"token-{index}", {})
+    assert len(store) <= 64
+
+
+def test_purge_expired_and_clear():
+    store = MemorySessionStore(ttl=0.05, sweep_interval=0)
+    for index in range(10):
+        store.save(f"token-{index}", {})
+    time.sleep(0.1)
+    store.save("nova", {})
+    assert store.purge_expired() == 10
+    store.clear()
+    assert len(store) == 0
+
+
+def test_invalid_shards():
+    with pytest.raises(ValueError):
+        MemorySessionStore(shards=0)
+
+
+def test_sweeper_starts_on_first_save_and_removes_expired():
+    store = MemorySessionStore(ttl=0.05, sweep_interval=0.05)
+    names = lambda: {thread.name for thread in threading.enumerate()}
+    assert store._sweeper_pid is None
+
+    store.save("a", {})
+    assert "arcforge-session-sweeper" in names()
+    deadline = time.monotonic() + 5
+    while sum(len(entries) for _, entries in store._shards) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert sum(len(entries) for _, entries in store._shards) == 0
+    store._sweeper_pid = None  # encerra a thread de limpeza
+
+
+def test_concurrent_access():
+    store = MemorySessionStore(max_entries=10_000, sweep_interval=0)
+
+    def worker(prefix):
+        for index in range(500):
+            token = f"{prefix}-{index}"
+            store.save(token, {"n": index})
+            assert store.load(token) == {"n": index}
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in "abcdefgh"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(store) == 4000
+
+
+# -----------------------------------------------------------------------------
+# Session: criação preguiçosa e cookie só quando alterada
+# -----------------------------------------------------------------------------
+
+def test_unmodified_new_session_is_not_stored(store):
+    session = Session(make_request())
+    assert session.new
+    assert session.get("usuario") is None
+    assert session.save() is False
+    assert session.cookie_headers() == [] and session.get_cookies() == {}
+    assert len(store) == 0
+
+
+def test_modified_session_is_stored_and_sends_cookie(store):
+    session = Session(make_request())
+    session.set("usuario", 7)
+    assert session.save() is True
+    assert session.cookie_headers() == [f"session_id={session.session_id}; Path=/; HttpOnly"]
+    assert store.load(session.session_id) == {"usuario": 7}
+
+
+def test_existing_session_only_sends_cookie_when_changed(store):
+    token = store.save(store.new_token(), {"usuario": 7})
+
+    session = Session(make_request(f"session_id={token}"))
+    assert not session.new and session.get("usuario") == 7
+    assert session.save() is False
+    assert session.cookie_headers() == []
+
+    session = Session(make_request(f"session_id={token}"))
+    session.set("usuario", 8)
+    assert session.save() is True
+    assert store.load(token) == {"usuario": 8}
+
+
+def test_unknown_or_expired_cookie_starts_a_new_session(store):
+    session = Session(make_request("session_id=expirado"))
+    assert session.new
+    assert session.session_id != "expirado"
+
+
+def test_delete_expires_cookie_and_new_login_gets_new_id(store):
+    token = store.save(store.new_token(), {"usuario": 7})
+    session = Session(make_request(f"session_id={token}"))
+    session.delete()
+    assert store.load(token) is None
+    assert session.save() is True
+    assert session.cookie_headers() == ["session_id=; Max-Age=0; Path=/; HttpOnly"]
+
+    session.set("usuario", 9)
+    session.save()
+    assert session.session_id != token
+    assert session.get_cookies() == {"session_id": session.session_id}
+
+
+def test_deleting_a_new_session_sends_nothing(store):
+    session = Session(make_request())
+    session.delete()
+    assert session.save() is False
+    assert session.cookie_headers() == []
+
+
+def test_request_loads_session_only_on_access(store):
+    created = []
+    request = make_request()
+    request.session_factory = lambda r: created.append(1) or Session(r)
+    assert request.loaded_session is None
+    assert request.session is request.session
+    assert created == [1]
+    assert request.loaded_session is request.session
+
+
+def test_request_without_factory():
+    with pytest.raises(RuntimeError):
+        make_request().session
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_cookie_only_sent_when_session_changes(engine, store, isolated_router, serve, connect):
+    @isolated_router.route("/anonimo", "GET")
+    def anonimo(request):
+        return Response(HttpStatus.OK, {"ok": True})
+
+    @isolated_router.route("/leitura", "GET")
+    def leitura(request):
+        return Response(HttpStatus.OK, {"usuario": request.session.get("usuario")})
+
+    @isolated_router.route("/login", "POST")
+    def login(request):
+        request.session.set("usuario", "ana")
+        return Response(HttpStatus.OK, {"ok": True})
+
+    @isolated_router.route("/logout", "POST")
+    def logout(request):
+        request.session.delete()
+        return Response(HttpStatus.OK, {"ok": True})
+
+    connection = connect(serve(engine))
+
+    def send(request_line: bytes, cookie: str = None):
+        extra = b"Cookie: %s\r\n" % cookie.encode() if cookie else b""
+        connection.send(request_line + b" HTTP/1.1\r\nHost: t\r\nContent-Length: 0\r\n" + extra + b"\r\n")
+        status, headers, body = connection.read_response()
+        assert status == 200
+        return headers.get("Set-Cookie"), body
+
+    assert send(b"GET /anonimo") == (None, b'{"ok":true}')
+    assert send(b"GET /leitura") == (None, b'{"usuario":null}')
+    assert len(store) == 0
+
+    set_cookie, _ = send(b"POST /login")
+    cookie = set_cookie.split(";")[0]
+    assert len(store) == 1
+
+    assert send(b"GET /leitura", cookie) == (None, b'{"usuario":"ana"}')
+
+    set_cookie, _ = send(b"POST /logout", cookie)
+    assert set_cookie.startswith("session_id=; Max-Age=0")
+    assert len(store) == 0
+
+
+# -----------------------------------------------------------------------------
+# SignedCookieSessionStore
+# -----------------------------------------------------------------------------
+
+def test_signed_round_trip():
+    store = SignedCookieSessionStore("segredo")
+    data = {"usuario": 7, "nome": "Ana", "itens": [1, 2]}
+    assert store.load(store.save("", data)) == data
+
+
+def test_signed_token_format():
+    store = SignedCookieSessionStore("segredo")
+    payload, timestamp, signature = store.save("", {"a": 1}).split(".")
+    assert store._b64decode(payload) == b'{"a":1}'
+    assert abs(int(timestamp) - time.time()) < 5
+    assert signature == store._signature(b"segredo", f"{payload}.{timestamp}")
+
+
+def test_large_payload_is_compressed():
+    store = SignedCookieSessionStore("segredo", compress_min_size=64)
+    data = {"texto": "a" * 500}
+    token = store.save("", data)
+    assert token.startswith(".")
+    assert len(token) < 200
+    assert store.load(token) == data
+
+
+def test_tampered_token_is_rejected():
+    store = SignedCookieSessionStore("segredo")
+    token = store.save("", {"admin": False})
+    forged = store._b64encode(b'{"admin":true}') + token[token.index("."):]
+    assert store.load(forged) is None
+    assert store.load(token[:-1] + ("A" if token[-1] != "A" else "B")) is None
+    assert store.load("") is None
+    assert store.load("lixo") is None
+
+
+def test_other_key_is_rejected():
+    token = SignedCookieSessionStore("outra").save("", {"a": 1})
+    assert SignedCookieSessionStore("segredo").load(token) is None
+
+
+def test_key_rotation():
+    old = SignedCookieSessionStore("antiga")
+    rotated = SignedCookieSessionStore(["nova", "antiga"])
+    token = old.save("", {"a": 1})
+    assert rotated.load(token) == {"a": 1}
+    assert rotated.should_refresh(token)
+    assert not rotated.should_refresh(rotated.save("", {"a": 1}))
+
+
+def test_signed_token_expires(monkeypatch):
+    store = SignedCookieSessionStore("segredo", max_age=60)
+    token = store.save("", {"a": 1})
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 40)
+    assert store.load(token) == {"a": 1}
+    assert store.should_refresh(token)
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert store.load(token) is None
+
+
+def test_signed_session_too_large():
+    store = SignedCookieSessionStore("segredo", max_size=100, compress_min_size=10 ** 6)
+    with pytest.raises(SessionTooLarge):
+        store.save("", {"texto": "a" * 200})
+
+
+def test_signed_store_requires_a_key():
+    with pytest.raises(ValueError):
+        SignedCookieSessionStore([])
+    with pytest.raises(ValueError):
+        SignedCookieSessionStore("")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_signed_cookie_session_over_the_wire(engine, isolated_router, serve, connect, monkeypatch):
+    monkeypatch.setattr(Session, "store", SignedCookieSessionStore("segredo"))
+
+    @isolated_router.route("/contador", "POST")
+    def contador(request):
+        visitas = request.session.get("visitas", 0) + 1
+        request.session.set("visitas", visitas)
+        return Response(HttpStatus.OK, {"visitas": visitas})
+
+    port = serve(engine)
+    cookie = None
+    for expected in (1, 2, 3):
+        # Cada requisição em uma conexão nova: nada fica guardado no servidor
+        connection = connect(port)
+        extra = b"Cookie: %s\r\n" % cookie.encode() if cookie else b""
+        connection.send(b"POST /contador HTTP/1.1\r\nHost: t\r\nContent-Length: 0\r\n" + extra + b"\r\n")
+        status, headers, body = connection.read_response()
+        assert (status, body) == (200, b'{"visitas":%d}' % expected)
+        cookie = headers["Set-Cookie"].split(";")[0]
+
+    # Um cookie adulterado inicia uma sessão nova
+    name, _, token = cookie.partition("=")
+    payload = Session.store._b64encode(b'{"visitas":99}')
+    forged = f"{name}={payload}{token[token.index('.'):]}"
+    connection = connect(port)
+    connection.send(b"POST /contador HTTP/1.1\r\nHost: t\r\nContent-Length: 0\r\nCookie: %s\r\n\r\n" % forged.encode())
+    assert connection.read_response()[2] == b'{"visitas":1}'
+
+
+
+# -----------------------------------------------------------------------------
+# SQLiteSessionStore
+# -----------------------------------------------------------------------------
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def expires_at(path, token):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT expires_at FROM sessions WHERE token = ?", (token,)).fetchone()[0]
+
+
+def test_sqlite_round_trip_and_wal(db_path):
+    store = SQLiteSessionStore(db_path)
+    token = store.save(store.new_token(), {"usuario": 7, "nome": "João"})
+    assert store.load(token) == {"usuario": 7, "nome": "João"}
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.save(token, {"usuario": 8})
+    assert store.load(token) == {"usuario": 8}
+    assert len(store) == 1
+    store.delete(token)
+    assert store.load(token) is None
+
+
+def test_sqlite_is_shared_between_instances(db_path):
+    first, second = SQLiteSessionStore(db_path), SQLiteSessionStore(db_path)
+    token = first.save(first.new_token(), {"a": 1})
+    assert second.load(token) == {"a": 1}
+    second.delete(token)
+    assert first.load(token) is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requer fork")
+def test_sqlite_is_shared_with_forked_workers(db_path):
+    store = SQLiteSessionStore(db_path)
+    store.save("pai", {"origem": "pai"})
+
+    pid = os.fork()
+    if pid == 0:
+        # Processo filho: a conexão herdada é descartada e reaberta
+        try:
+            ok = store.load("pai") == {"origem": "pai"}
+            store.save("filho", {"origem": "filho"})
+        except BaseException:
+            ok = False
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert store.load("filho") == {"origem": "filho"}
+
+
+def test_sqlite_connection_per_thread(db_path):
+    store = SQLiteSessionStore(db_path)
+    errors = []
+
+    def worker(prefix):
+        try:
+            for index in range(50):
+                token = f"{prefix}-{index}"
+                store.save(token, {"n": index})
+                assert store.load(token) == {"n": index}
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(name,)) for name in "abcd"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(store) == 200
+
+
+def test_sqlite_expired_sessions(db_path):
+    store = SQLiteSessionStore(db_path, ttl=0.05)
+    store.save("a", {})
+    time.sleep(0.1)
+    assert store.load("a") is None
+    assert len(store) == 0
+    assert store.purge_expired() == 1
+
+
+def test_sqlite_touches_are_batched(db_path):
+    store = SQLiteSessionStore(db_path, ttl=60, touch_interval=3600)
+    store.save("a", {})
+    saved = expires_at(db_path, "a")
+    time.sleep(0.02)
+
+    # A leitura renova a validade só em memória...
+    assert store.load("a") == {}
+    assert expires_at(db_path, "a") == saved
+    # ...e flush grava as renovações acumuladas
+    store.flush()
+    assert expires_at(db_path, "a") > saved
+
+
+def test_sqlite_touch_never_shortens_validity(db_path):
+    store = SQLiteSessionStore(db_path, ttl=60, touch_interval=3600)
+    store.save("a", {})
+    store.load("a")
+    # Outro processo gravou a sessão com validade maior nesse meio tempo
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE sessions SET expires_at = ? WHERE token = 'a'", (time.time() + 7200,))
+    later = expires_at(db_path, "a")
+    store.flush()
+    assert expires_at(db_path, "a") == later
+
+
+def test_sqlite_save_sweeps_expired_sessions(db_path):
+    store = SQLiteSessionStore(db_path, ttl=0.05, sweep_interval=0)
+    store.save("velha", {})
+    time.sleep(0.1)
+    store.save("nova", {})
+    with sqlite3.connect(db_path) as conn:
+        assert [row[0] for row in conn.execute("SELECT token FROM sessions")] == ["nova"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_sqlite_session_over_the_wire(engine, db_path, isolated_router, serve, connect, monkeypatch):
+    monkeypatch.setattr(Session, "store", SQLiteSessionStore(db_path))
+
+    @isolated_router.route("/login", "POST")
+    def login(request):
+        request.session.set("usuario", "ana")
+        return Response(HttpStatus.OK, {"ok": True})
+
+    @isolated_router.route("/perfil", "GET")
+    def perfil(request):
+        return Response(HttpStatus.OK, {"usuario": request.session.get("usuario")})
+
+    connection = connect(serve(engine))
+    connection.send(b"POST /login HTTP/1.1\r\nHost: t\r\nContent-Length: 0\r\n\r\n")
+    cookie = connection.read_response()[1]["Set-Cookie"].split(";")[0]
+
+    # Outra instância (como outro worker) enxerga a mesma sessão
+    token = cookie.partition("=")[2]
+    assert SQLiteSessionStore(db_path).load(token) == {"usuario": "ana"}
+
+    connection.send(b"GET /perfil HTTP/1.1\r\nHost: t\r\nCookie: %s\r\n\r\n" % cookie.encode())
+    assert connection.read_response()[2] == b'{"usuario":"ana"}'
@@ -0,0 +1,171 @@
+import os
+from email.utils import formatdate
+
+import pytest
+
+from arcforge.core.conn.response import FileResponse
+from arcforge.core.conn.static import StaticFiles
+
+
+ENGINES = ("threading", "asyncio")
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def public(tmp_path):
+    directory = tmp_path / "public"
+    directory.mkdir()
+    (directory / "dados.bin").write_bytes(CONTENT)
+    (directory / "olá mundo.txt").write_text("conteúdo", encoding="utf-8")
+    (tmp_path / "segredo.txt").write_text("fora do diretório")
+    return directory
+
+
+def prepared(path, headers=None, method="GET") -> FileResponse:
+    return FileResponse(str(path)).prepare(headers or {}, method)
+
+
+# -----------------------------------------------------------------------------
+# FileResponse.prepare
+# -----------------------------------------------------------------------------
+
+def test_full_file_without_conditional_headers(public):
+    response = prepared(public / "dados.bin")
+    assert response.status == 200
+    assert (response.offset, response.length) == (0, len(CONTENT))
+    assert response.headers["Content-Length"] == str(len(CONTENT))
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.has_content
+
+
+@pytest.mark.parametrize("spec, offset, length", [
+    ("bytes=0-99", 0, 100),
+    ("bytes=100-", 100, len(CONTENT) - 100),
+    ("bytes=-10", len(CONTENT) - 10, 10),
+    ("bytes=10000-99999", 10000, len(CONTENT) - 10000),
+    ("bytes=-99999", 0, len(CONTENT)),
+])
+def test_single_range_is_partial_content(public, spec, offset, length):
+    response = prepared(public / "dados.bin", {"Range": spec})
+    assert response.status == 206
+    assert (response.offset, response.length) == (offset, length)
+    assert response.headers["Content-Range"] == f"bytes {offset}-{offset + length - 1}/{len(CONTENT)}"
+    assert response.headers["Content-Length"] == str(length)
+
+
+@pytest.mark.parametrize("spec", ["bytes=10240-", "bytes=-0"])
+def test_unsatisfiable_range_is_416(public, spec):
+    response = prepared(public / "dados.bin", {"Range": spec})
+    assert response.status == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
+    assert not response.has_content
+
+
+@pytest.mark.parametrize("spec", ["bytes=0-1,5-6", "bytes=9-3", "bytes=a-b", "items=0-1"])
+def test_ignored_range_sends_the_whole_file(public, spec):
+    response = prepared(public / "dados.bin", {"Range": spec})
+    assert response.status == 200
+    assert response.length == len(CONTENT)
+
+
+def test_if_range_with_stale_validator_ignores_range(public):
+    response = prepared(public / "dados.bin", {"Range": "bytes=0-9", "If-Range": '"antiga"'})
+    assert response.status == 200
+
+    etag = FileResponse(str(public / "dados.bin")).etag
+    response = prepared(public / "dados.bin", {"Range": "bytes=0-9", "If-Range": etag})
+    assert response.status == 206
+
+
+def test_matching_etag_is_not_modified(public):
+    etag = FileResponse(str(public / "dados.bin")).etag
+    for if_none_match in (etag, f"W/{etag}", f'"outra", {etag}', "*", etag[:-1] + '-gzip"'):
+        response = prepared(public / "dados.bin", {"If-None-Match": if_none_match})
+        assert response.status == 304, if_none_match
+        assert "Content-Length" not in response.headers
+        assert response.headers["ETag"] == etag
+        assert not response.has_content
+
+    assert prepared(public / "dados.bin", {"If-None-Match": '"outra"'}).status == 200
+
+
+def test_if_modified_since(public):
+    path = public / "dados.bin"
+    mtime = os.stat(path).st_mtime
+    assert prepared(path, {"If-Modified-Since": formatdate(mtime + 60, usegmt=True)}).status == 304
+    assert prepared(path, {"If-Modified-Since": formatdate(mtime - 60, usegmt=True)}).status == 200
+    assert prepared(path, {"If-Modified-Since": "data inválida"}).status == 200
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since(public):
+    path = public / "dados.bin"
+    response = prepared(path, {
+        "If-None-Match": '"outra"',
+        "If-Modified-Since": formatdate(os.stat(path).st_mtime + 60, usegmt=True),
+    })
+    assert response.status == 200
+
+
+def test_conditional_headers_only_apply_to_get_and_head(public):
+    etag = FileResponse(str(public / "dados.bin")).etag
+    assert prepared(public / "dados.bin", {"If-None-Match": etag}, method="POST").status == 200
+    assert prepared(public / "dados.bin", {"If-None-Match": etag}, method="HEAD").status == 304
+
+
+# -----------------------------------------------------------------------------
+# StaticFiles
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("path", ["../segredo.txt", "%2e%2e/segredo.txt", "dados.bin%00.txt", "inexistente", ""])
+def test_resolve_refuses_paths_outside_or_missing(public, path):
+    assert StaticFiles(str(public)).resolve(path) is None
+
+
+def test_resolve_decodes_the_path(public):
+    resolved = StaticFiles(str(public)).resolve("ol%C3%A1%20mundo.txt")
+    assert resolved == str(public / "olá mundo.txt")
+
+
+def test_resolve_serves_index_of_directory(public):
+    (public / "index.html").write_text("<p>início</p>")
+    assert StaticFiles(str(public), index="index.html").resolve("") == str(public / "index.html")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_static_files_over_the_wire(engine, public, isolated_router, serve, connect):
+    StaticFiles.mount("/static", str(public))
+    connection = connect(serve(engine))
+
+    connection.send(b"GET /static/dados.bin HTTP/1.1\r\nHost: t\r\n\r\n")
+    status, headers, body = connection.read_response()
+    assert status == 200
+    assert body == CONTENT
+    assert headers["Cache-Control"] == "public, max-age=3600"
+    etag = headers["ETag"]
+
+    connection.send(b"GET /static/dados.bin HTTP/1.1\r\nHost: t\r\nRange: bytes=256-511\r\n\r\n")
+    status, headers, body = connection.read_response()
+    assert status == 206
+    assert body == CONTENT[256:512]
+    assert headers["Content-Range"] == f"bytes 256-511/{len(CONTENT)}"
+
+    connection.send(b"GET /static/dados.bin HTTP/1.1\r\nHost: t\r\nIf-None-Match: %s\r\n\r\n" % etag.encode())
+    status, headers, body = connection.read_response()
+    assert status == 304
+    assert body == b""
+
+    connection.send(b"GET /static/ol%C3%A1%20mundo.txt HTTP/1.1\r\nHost: t\r\n\r\n")
+    status, headers, body = connection.read_response()
+    assert status == 200
+    assert body == "conteúdo".encode("utf-8")
+    assert headers["Content-Type"] == "text/plain; charset=utf-8"
+
+    connection.send(b"GET /static/%2e%2e/segredo.txt HTTP/1.1\r\nHost: t\r\n\r\n")
+    status, _, _ = connection.read_response()
+    assert status == 404
+
+    # A conexão continua utilizável após as respostas parciais e 304
+    connection.send(b"GET /static/dados.bin HTTP/1.1\r\nHost: t\r\nRange: bytes=-4\r\n\r\n")
+    status, _, body = connection.read_response()
+    assert status == 206
+    assert body == CONTENT[-4:]
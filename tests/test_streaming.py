@@ -0,0 +1,193 @@
+import asyncio
+import http.client
+import json
+import threading
+
+import pytest
+
+from arcforge.core.conn.async_server import HttpParser
+from arcforge.core.conn.response import StreamingResponse, HttpStatus
+
+
+ENGINES = ("threading", "asyncio")
+
+
+def chunked(*pieces: bytes) -> bytes:
+    return b"".join(StreamingResponse.frame(piece) for piece in pieces) + StreamingResponse.LAST_CHUNK
+
+
+def collect_async(response: StreamingResponse) -> list:
+    async def run():
+        return [chunk async for chunk in response]
+    return asyncio.run(run())
+
+
+# -----------------------------------------------------------------------------
+# Codificação chunked
+# -----------------------------------------------------------------------------
+
+def test_frame_uses_hexadecimal_size():
+    assert StreamingResponse.frame(b"a" * 26) == b"1a\r\n" + b"a" * 26 + b"\r\n"
+    assert StreamingResponse.LAST_CHUNK == b"0\r\n\r\n"
+
+
+def test_frames_round_trip_through_parser():
+    pieces = [b"x" * size for size in (1, 15, 16, 255, 4096, 70000)]
+    data = b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n" + chunked(*pieces)
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        parser = HttpParser(reader)
+        headers = (await parser.read_request())[3]
+        return await parser.read_body(headers)
+
+    assert asyncio.run(run()) == b"".join(pieces)
+
+
+def test_headers():
+    response = StreamingResponse(iter([]), headers={"Content-Length": "10"}, cookies={"tema": "escuro"})
+    assert response.headers["Transfer-Encoding"] == "chunked"
+    assert "Content-Length" not in response.headers
+    assert response.headers["Content-Type"] == "text/plain; charset=utf-8"
+    assert "tema=escuro" in response.headers["Set-Cookie"]
+    assert StreamingResponse.html(iter([])).headers["Content-Type"] == "text/html; charset=utf-8"
+
+
+# -----------------------------------------------------------------------------
+# Iteradores síncronos e assíncronos
+# -----------------------------------------------------------------------------
+
+async def pieces():
+    yield "a"
+    yield b"b"
+    yield bytearray(b"c")
+
+
+def test_sync_iterator_yields_bytes():
+    response = StreamingResponse(iter(["olá", b" mundo"]))
+    assert not response.is_async
+    assert list(response) == ["olá".encode(), b" mundo"]
+    assert collect_async(StreamingResponse(iter(["olá", b" mundo"]))) == ["olá".encode(), b" mundo"]
+
+
+def test_async_iterator_yields_bytes():
+    assert StreamingResponse(pieces()).is_async
+    assert list(StreamingResponse(pieces())) == [b"a", b"b", b"c"]
+    assert collect_async(StreamingResponse(pieces())) == [b"a", b"b", b"c"]
+
+
+def test_async_iterator_is_closed_when_consumer_stops():
+    closed = []
+
+    async def endless():
+        try:
+            while True:
+                yield b"x"
+        finally:
+            closed.append(True)
+
+    iterator = iter(StreamingResponse(endless()))
+    assert next(iterator) == b"x"
+    iterator.close()
+    assert closed == [True]
+
+
+def test_json_array_batches():
+    response = StreamingResponse.json_array(range(5), batch_size=2)
+    chunks = list(response)
+    assert len(chunks) > 1
+    assert json.loads(b"".join(chunks)) == [0, 1, 2, 3, 4]
+    assert response.headers["Content-Type"] == "application/json; charset=utf-8"
+
+
+def test_json_array_empty_and_async():
+    assert b"".join(StreamingResponse.json_array([])) == b"[]"
+
+    async def items():
+        for item in ({"id": 1}, {"id": 2}):
+            yield item
+
+    assert json.loads(b"".join(StreamingResponse.json_array(items()))) == [{"id": 1}, {"id": 2}]
+
+
+# -----------------------------------------------------------------------------
+# Pela rede
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_first_chunk_is_sent_before_the_last_is_produced(engine, isolated_router, serve, connect):
+    release = threading.Event()
+
+    @isolated_router.route("/eventos", "GET")
+    def eventos(request):
+        def gerar():
+            yield "primeiro"
+            release.wait(5)
+            yield "segundo"
+        return StreamingResponse(gerar())
+
+    connection = connect(serve(engine))
+    connection.send(b"GET /eventos HTTP/1.1\r\nHost: t\r\n\r\n")
+    assert connection.file.readline().startswith(b"HTTP/1.1 200")
+    headers = http.client.parse_headers(connection.file)
+    assert headers["Transfer-Encoding"] == "chunked"
+    assert headers["Content-Length"] is None
+    assert connection.file.readline() == b"8\r\n"
+    assert connection.file.readline() == b"primeiro\r\n"
+
+    release.set()
+    assert connection.file.readline() == b"7\r\n"
+    assert connection.file.readline() == b"segundo\r\n"
+    assert connection.file.read(5) == StreamingResponse.LAST_CHUNK
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_connection_stays_open_after_stream(engine, isolated_router, serve, connect):
+    @isolated_router.route("/async", "GET")
+    async def assincrona(request):
+        return StreamingResponse.json_array(range(250))
+
+    @isolated_router.route("/sync", "GET")
+    def sincrona(request):
+        return StreamingResponse.html(iter(["<p>", "", "ok", "</p>"]))
+
+    connection = connect(serve(engine))
+    connection.send(b"GET /async HTTP/1.1\r\nHost: t\r\n\r\nGET /sync HTTP/1.1\r\nHost: t\r\n\r\n")
+    status, headers, body = connection.read_response()
+    assert status == 200
+    assert json.loads(body) == list(range(250))
+    status, headers, body = connection.read_response()
+    assert (status, body) == (200, b"<p>ok</p>")
+    assert headers["Connection"] == "keep-alive"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_http_10_gets_raw_body_and_close(engine, isolated_router, serve, connect):
+    @isolated_router.route("/texto", "GET")
+    def texto(request):
+        return StreamingResponse(iter(["um ", "dois"]))
+
+    connection = connect(serve(engine))
+    connection.send(b"GET /texto HTTP/1.0\r\n\r\n")
+    status, headers, body = connection.read_response()
+    assert status == 200
+    assert "Transfer-Encoding" not in headers
+    assert body == b"um dois"
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_error_mid_stream_closes_without_last_chunk(engine, isolated_router, serve, connect):
+    @isolated_router.route("/quebra", "GET")
+    def quebra(request):
+        def gerar():
+            yield "parcial"
+            raise RuntimeError("falha no meio")
+        return StreamingResponse(gerar(), status=HttpStatus.OK)
+
+    connection = connect(serve(engine))
+    connection.send(b"GET /quebra HTTP/1.1\r\nHost: t\r\n\r\n")
+    assert connection.file.readline().startswith(b"HTTP/1.1 200")
+    http.client.parse_headers(connection.file)
+    assert connection.file.read() == StreamingResponse.frame(b"parcial")
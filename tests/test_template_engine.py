@@ -0,0 +1,429 @@
+import asyncio
+import http.client
+import os
+import threading
+import time
+
+import pytest
+
+from arcforge.core.conn.response import HtmlResponse, HttpStatus, StreamingResponse
+from arcforge.factory_template_engine import TemplateEngineFactory
+from arcforge.template_engine import TemplateEngine
+
+
+@pytest.fixture
+def templates(tmp_path):
+    """Duas pastas de templates: a do projeto e uma compartilhada, consultada depois."""
+    project, shared = tmp_path / "templates", tmp_path / "compartilhados"
+    project.mkdir()
+    shared.mkdir()
+    (project / "base.html").write_text("<title>{% block titulo %}{% endblock %}</title>")
+    (project / "pagina.html").write_text('{% extends "base.html" %}{% block titulo %}Olá {{ nome }}{% endblock %}')
+    (project / "rodape.html").write_text("projeto")
+    (shared / "rodape.html").write_text("compartilhado")
+    (shared / "menu.html").write_text("{% for item in itens %}[{{ item }}]{% endfor %}")
+    return project, shared
+
+
+def write(path, text):
+    path.write_text(text)
+    # Garante uma data de modificação diferente mesmo em sistemas de arquivos com baixa resolução
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+# -----------------------------------------------------------------------------
+# Pastas, bytecode e pré-compilação
+# -----------------------------------------------------------------------------
+
+def test_search_paths_are_consulted_in_order(templates):
+    engine = TemplateEngine(list(templates))
+    assert engine.render_template("pagina.html", nome="Ana") == "<title>Olá Ana</title>"
+    assert engine.render_template("rodape.html") == "projeto"
+    assert engine.render_template("menu.html", itens=[1, 2]) == "[1][2]"
+
+
+def test_single_directory_and_missing_template(templates):
+    engine = TemplateEngine(str(templates[1]))
+    assert engine.template_dirs == [str(templates[1])]
+    assert engine.render_template("rodape.html") == "compartilhado"
+    with pytest.raises(FileNotFoundError):
+        engine.render_template("inexistente.html")
+
+
+def test_bytecode_cache_is_written_and_reused(templates, tmp_path):
+    cache_dir = tmp_path / "bytecode"
+    TemplateEngine(list(templates), bytecode_cache_dir=str(cache_dir)).render_template("pagina.html", nome="a")
+    files = set(os.listdir(cache_dir))
+    assert len(files) == 2  # pagina.html e base.html
+
+    # Um novo processo (outra instância) carrega o código do cache em vez de recompilar
+    engine = TemplateEngine(list(templates), bytecode_cache_dir=str(cache_dir))
+    compiled = []
+    original = engine.env.compile
+    engine.env.compile = lambda *args, **kwargs: compiled.append(args) or original(*args, **kwargs)
+    assert engine.render_template("pagina.html", nome="b") == "<title>Olá b</title>"
+    assert compiled == []
+    assert set(os.listdir(cache_dir)) == files
+
+
+def test_precompile_loads_every_template(templates):
+    engine = TemplateEngine(list(templates))
+    # rodape.html existe nas duas pastas, mas é um único template
+    assert engine.precompile() == 4
+    assert len(engine.env.cache) == 4
+
+
+def test_precompile_skips_binary_files(templates):
+    project, _ = templates
+    (project / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\xff\xfe\x00\x00")
+    (project / "img").mkdir()
+    (project / "img" / "icone.ico").write_bytes(bytes(range(256)))
+    engine = TemplateEngine(list(templates))
+    assert engine.precompile() == 4
+
+
+@pytest.mark.parametrize("zip", [None, "deflated"])
+def test_compiled_templates_are_used_before_sources(templates, tmp_path, zip):
+    project, _ = templates
+    (project / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\xff\xfe\x00\x00")
+    target = str(tmp_path / ("compilados.zip" if zip else "compilados"))
+    TemplateEngine(list(templates)).compile_templates(target, zip=zip)
+
+    write(project / "rodape.html", "alterado depois do build")
+    (project / "novo.html").write_text("fora do build")
+    engine = TemplateEngine(list(templates), precompiled_dir=target)
+    assert engine.render_template("rodape.html") == "projeto"
+    assert engine.render_template("pagina.html", nome="Ana") == "<title>Olá Ana</title>"
+    # Templates ausentes do build continuam sendo lidos das pastas
+    assert engine.render_template("novo.html") == "fora do build"
+    assert engine.precompile() == 5
+
+
+# -----------------------------------------------------------------------------
+# Modo de produção: reload explícito e observador de arquivos
+# -----------------------------------------------------------------------------
+
+def test_development_mode_sees_changes(templates):
+    project, _ = templates
+    engine = TemplateEngine(list(templates))
+    assert engine.render_template("rodape.html") == "projeto"
+    write(project / "rodape.html", "novo")
+    assert engine.render_template("rodape.html") == "novo"
+
+
+def test_production_mode_keeps_templates_until_reload(templates):
+    project, _ = templates
+    engine = TemplateEngine(list(templates), auto_reload=False)
+    assert engine.render_template("pagina.html", nome="Ana") == "<title>Olá Ana</title>"
+    assert engine.render_template("rodape.html") == "projeto"
+
+    write(project / "base.html", "<h1>{% block titulo %}{% endblock %}</h1>")
+    write(project / "rodape.html", "novo")
+    assert engine.render_template("rodape.html") == "projeto"
+    assert engine.render_template("pagina.html", nome="Ana") == "<title>Olá Ana</title>"
+
+    # Recarregar o template pai basta para as páginas que o estendem
+    engine.reload("base.html")
+    assert engine.render_template("pagina.html", nome="Ana") == "<h1>Olá Ana</h1>"
+    assert engine.render_template("rodape.html") == "projeto"
+
+    engine.reload()
+    assert engine.render_template("rodape.html") == "novo"
+
+
+def test_reload_discards_rendered_pages(templates):
+    project, _ = templates
+    engine = TemplateEngine(list(templates), auto_reload=False)
+    assert engine.render_template("rodape.html", cache_key="rodape") == "projeto"
+    write(project / "rodape.html", "novo")
+    engine.reload("rodape.html")
+    assert engine.render_template("rodape.html", cache_key="rodape") == "novo"
+
+
+def test_reload_without_template_cache(templates):
+    engine = TemplateEngine(list(templates), auto_reload=False, cache_size=0)
+    engine.render_template("rodape.html")
+    engine.reload("rodape.html")
+    engine.reload()
+
+
+def test_watcher_reloads_changed_templates(templates):
+    project, shared = templates
+    engine = TemplateEngine(list(templates), auto_reload=False, watch_interval=0.05)
+    try:
+        assert engine.render_template("rodape.html") == "projeto"
+        assert engine.render_template("menu.html", itens=[1]) == "[1]"
+        write(project / "rodape.html", "observado")
+        write(shared / "menu.html", "menu novo")
+
+        deadline = time.monotonic() + 5
+        while engine.render_template("rodape.html") != "observado" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert engine.render_template("rodape.html") == "observado"
+        while engine.render_template("menu.html") != "menu novo" and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert engine.render_template("menu.html") == "menu novo"
+    finally:
+        engine._watcher_pid = None  # encerra a thread de observação
+
+
+def test_watcher_is_not_started_without_interval(templates):
+    engine = TemplateEngine(list(templates), auto_reload=False)
+    engine.render_template("rodape.html")
+    assert engine._watcher_pid is None
+
+
+def test_factory_passes_production_options(templates):
+    engine = TemplateEngineFactory(template_dir=list(templates), auto_reload=False, cache_size=10).create_template_engine()
+    assert engine.env.auto_reload is False
+    assert engine.template_dirs == [str(path) for path in templates]
+    assert engine.render_template("rodape.html") == "projeto"
+
+
+# -----------------------------------------------------------------------------
+# Cache de fragmentos ({% cache %}) e de páginas inteiras
+# -----------------------------------------------------------------------------
+
+class Counter:
+    """Valor do contexto que conta quantas vezes o template o avaliou."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+@pytest.fixture
+def fragments(tmp_path):
+    (tmp_path / "menu.html").write_text('{% cache "menu" %}menu {{ contar() }}{% endcache %} fora {{ contar() }}')
+    (tmp_path / "cliente.html").write_text(
+        '{% cache "cliente", cliente, ttl=0.05 %}{{ cliente }}:{{ contar() }}{% endcache %}'
+    )
+    (tmp_path / "invalido.html").write_text("{% cache %}x{% endcache %}")
+    return TemplateEngine(str(tmp_path))
+
+
+def test_fragment_is_rendered_once(fragments):
+    contar = Counter()
+    assert fragments.render_template("menu.html", contar=contar) == "menu 1 fora 2"
+    assert fragments.render_template("menu.html", contar=contar) == "menu 1 fora 3"
+    assert fragments.invalidate_cache("menu") == 1
+    assert fragments.render_template("menu.html", contar=contar) == "menu 4 fora 5"
+
+
+def test_fragment_key_and_ttl(fragments):
+    contar = Counter()
+    assert fragments.render_template("cliente.html", cliente=1, contar=contar) == "1:1"
+    assert fragments.render_template("cliente.html", cliente=2, contar=contar) == "2:2"
+    assert fragments.render_template("cliente.html", cliente=1, contar=contar) == "1:1"
+    time.sleep(0.1)
+    assert fragments.render_template("cliente.html", cliente=1, contar=contar) == "1:3"
+
+
+def test_fragment_without_name_is_a_syntax_error(fragments):
+    with pytest.raises(RuntimeError, match="nome do fragmento"):
+        fragments.render_template("invalido.html")
+
+
+def test_cached_page(fragments):
+    contar = Counter()
+    first = fragments.render_template("menu.html", cache_key="home", contar=contar)
+    assert fragments.render_template("menu.html", cache_key="home", contar=contar) == first
+    assert contar.calls == 2
+    # Outra chave renderiza de novo (o fragmento continua em cache)
+    assert fragments.render_template("menu.html", cache_key="outra", contar=contar) == "menu 1 fora 3"
+
+    assert fragments.invalidate_cache("menu.html") == 2
+    assert fragments.render_template("menu.html", cache_key="home", contar=contar) == "menu 1 fora 4"
+    assert fragments.invalidate_cache() == 2
+    assert len(fragments.render_cache) == 0
+
+
+def test_cached_page_ttl(fragments):
+    contar = Counter()
+    fragments.render_template("menu.html", cache_key="home", ttl=0.05, contar=contar)
+    time.sleep(0.1)
+    assert fragments.render_template("menu.html", cache_key="home", ttl=0.05, contar=contar) == "menu 1 fora 3"
+
+
+def test_render_cache_limits(tmp_path):
+    (tmp_path / "pagina.html").write_text("{{ texto }}")
+    engine = TemplateEngine(str(tmp_path), render_cache_entries=2, render_cache_bytes=100)
+    for key in ("a", "b", "c"):
+        engine.render_template("pagina.html", cache_key=key, texto=key * 10)
+    assert len(engine.render_cache) == 2
+    engine.render_template("pagina.html", cache_key="grande", texto="x" * 200)
+    assert ("render", "pagina.html", "grande") not in engine.render_cache
+
+
+# -----------------------------------------------------------------------------
+# Renderização em blocos (stream_template)
+# -----------------------------------------------------------------------------
+
+@pytest.fixture
+def pages(tmp_path):
+    (tmp_path / "lista.html").write_text("<ul>{% for item in itens %}<li>{{ item }}</li>{% endfor %}</ul>")
+    (tmp_path / "erro.html").write_text("inicio {{ falhar() }}")
+    (tmp_path / "sintaxe.html").write_text("{% for %}")
+    (tmp_path / "lenta.html").write_text("<header>cabecalho</header>{{ lento() }}<footer></footer>")
+    return TemplateEngine(str(tmp_path))
+
+
+def test_stream_matches_full_render(pages):
+    itens = list(range(200))
+    chunks = list(pages.stream_template("lista.html", buffer_size=64, itens=itens))
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 64 for chunk in chunks[:-1])
+    assert "".join(chunks) == pages.render_template("lista.html", itens=itens)
+
+
+def test_stream_without_buffer_yields_every_piece(pages):
+    assert list(pages.stream_template("lista.html", buffer_size=0, itens=[1, 2])) == [
+        "<ul>", "<li>", "1", "</li>", "<li>", "2", "</li>", "</ul>",
+    ]
+
+
+def test_stream_errors_before_the_response_starts(pages):
+    with pytest.raises(FileNotFoundError):
+        pages.stream_template("inexistente.html")
+    with pytest.raises(RuntimeError):
+        pages.stream_template("sintaxe.html")
+
+
+def test_stream_error_while_rendering(pages):
+    def falhar():
+        raise ValueError("dado inválido")
+
+    chunks = pages.stream_template("erro.html", buffer_size=0, falhar=falhar)
+    assert next(chunks) == "inicio "
+    with pytest.raises(RuntimeError, match="dado inválido"):
+        next(chunks)
+
+
+@pytest.mark.parametrize("engine", ("threading", "asyncio"))
+def test_page_head_reaches_client_before_slow_part(engine, pages, isolated_router, serve, connect):
+    release = threading.Event()
+
+    @isolated_router.route("/lenta", "GET")
+    def lenta(request):
+        return StreamingResponse.html(pages.stream_template("lenta.html", buffer_size=16,
+                                                            lento=lambda: release.wait(5) and "corpo"))
+
+    connection = connect(serve(engine))
+    connection.send(b"GET /lenta HTTP/1.1\r\nHost: t\r\n\r\n")
+    assert connection.file.readline().startswith(b"HTTP/1.1 200")
+    headers = http.client.parse_headers(connection.file)
+    assert headers["Content-Type"] == "text/html; charset=utf-8"
+    assert headers["Transfer-Encoding"] == "chunked"
+    size = int(connection.file.readline(), 16)
+    assert connection.file.read(size) == b"<header>cabecalho</header>"
+
+    release.set()
+    connection.file.readline()
+    rest = connection._read_chunked()
+    assert rest == b"corpo<footer></footer>"
+
+
+# -----------------------------------------------------------------------------
+# Renderização assíncrona
+# -----------------------------------------------------------------------------
+
+@pytest.fixture
+def async_pages(tmp_path):
+    (tmp_path / "painel.html").write_text("{{ usuario }}|{% for pedido in pedidos %}[{{ pedido }}]{% endfor %}|{{ total() }}")
+    (tmp_path / "menu.html").write_text('{% cache "menu" %}{{ contar() }}{% endcache %}')
+    return TemplateEngine(str(tmp_path))
+
+
+async def fetch(value, delay=0.1):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def pedidos():
+    for pedido in ("a", "b"):
+        await asyncio.sleep(0)
+        yield pedido
+
+
+def test_render_async_awaits_context_in_parallel(async_pages):
+    async def run():
+        started = time.perf_counter()
+        output = await async_pages.render_template_async(
+            "painel.html", usuario=fetch("ana"), permissoes=fetch(["admin"]), pedidos=pedidos(),
+            total=lambda: fetch(2, 0),
+        )
+        return output, time.perf_counter() - started
+
+    output, elapsed = asyncio.run(run())
+    assert output == "ana|[a][b]|2"
+    assert elapsed < 0.18  # usuario e permissoes (0,1 s cada) são aguardados ao mesmo tempo
+
+
+def test_render_async_cache_key_and_fragments(async_pages):
+    contar = Counter()
+
+    async def run():
+        first = await async_pages.render_template_async("menu.html", contar=contar)
+        second = await async_pages.render_template_async("menu.html", contar=contar)
+        page = await async_pages.render_template_async("menu.html", cache_key="home", contar=contar)
+        return first, second, page
+
+    assert asyncio.run(run()) == ("1", "1", "1")
+    # O fragmento é compartilhado com a renderização síncrona
+    assert async_pages.render_template("menu.html", contar=contar) == "1"
+    assert contar.calls == 1
+
+
+def test_render_async_missing_template(async_pages):
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(async_pages.render_template_async("inexistente.html"))
+
+
+def test_stream_async(async_pages):
+    async def run():
+        chunks = async_pages.stream_template_async(
+            "painel.html", buffer_size=0, usuario=fetch("ana", 0), pedidos=pedidos(), total=lambda: fetch(3, 0),
+        )
+        return [chunk async for chunk in chunks]
+
+    chunks = asyncio.run(run())
+    assert len(chunks) > 1
+    assert "".join(chunks) == "ana|[a][b]|3"
+
+    with pytest.raises(FileNotFoundError):
+        async_pages.stream_template_async("inexistente.html")
+
+
+def test_async_bytecode_is_cached_separately(async_pages, tmp_path):
+    cache_dir = tmp_path / "bytecode"
+    engine = TemplateEngine(async_pages.template_dirs, bytecode_cache_dir=str(cache_dir))
+    engine.render_template("menu.html", contar=Counter())
+    asyncio.run(engine.render_template_async("menu.html", contar=Counter()))
+    files = os.listdir(cache_dir)
+    assert len(files) == 2
+    assert sum(name.startswith("__jinja2_async_") for name in files) == 1
+
+
+@pytest.mark.parametrize("engine", ("threading", "asyncio"))
+def test_coroutine_handler_renders_async_template(engine, async_pages, isolated_router, serve, connect):
+    @isolated_router.route("/painel", "GET")
+    async def painel(request):
+        html = await async_pages.render_template_async(
+            "painel.html", usuario=fetch("ana", 0), pedidos=pedidos(), total=lambda: fetch(1, 0),
+        )
+        return HtmlResponse(HttpStatus.OK, html)
+
+    @isolated_router.route("/painel/stream", "GET")
+    async def painel_stream(request):
+        return StreamingResponse.html(async_pages.stream_template_async(
+            "painel.html", usuario=fetch("bia", 0), pedidos=pedidos(), total=lambda: fetch(2, 0),
+        ))
+
+    connection = connect(serve(engine))
+    connection.send(b"GET /painel HTTP/1.1\r\nHost: t\r\n\r\nGET /painel/stream HTTP/1.1\r\nHost: t\r\n\r\n")
+    assert connection.read_response()[::2] == (200, b"ana|[a][b]|1")
+    assert connection.read_response()[::2] == (200, b"bia|[a][b]|2")